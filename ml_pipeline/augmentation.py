@@ -0,0 +1,145 @@
+import numpy as np
+
+# Configuration
+AUGMENTATIONS = ('rotate', 'scale', 'mirror', 'warp', 'dropout')
+SEQUENCE_ONLY = ('warp', 'dropout')
+ROTATE_DEG = 15.0     # max rotation about each axis, around the wrist
+SCALE_JITTER = 0.1    # per-axis factor in [1 - s, 1 + s]
+MIRROR_P = 0.5        # chance a sample is mirrored into the other hand
+WARP = 0.2            # playback speed in [1 - w, 1 + w]
+FRAME_DROPOUT = 0.1   # chance a frame is lost and the previous one held
+NUM_LANDMARKS = 21
+
+
+def rotation_matrices(angles):
+    """(B, 3, 3) rotations Rz @ Ry @ Rx from (B, 3) angles in radians."""
+    cx, cy, cz = np.cos(angles).T
+    sx, sy, sz = np.sin(angles).T
+    R = np.empty((len(angles), 3, 3), dtype=np.float64)
+    R[:, 0, 0] = cy * cz
+    R[:, 0, 1] = sx * sy * cz - cx * sz
+    R[:, 0, 2] = cx * sy * cz + sx * sz
+    R[:, 1, 0] = cy * sz
+    R[:, 1, 1] = sx * sy * sz + cx * cz
+    R[:, 1, 2] = cx * sy * sz - sx * cz
+    R[:, 2, 0] = -sy
+    R[:, 2, 1] = sx * cy
+    R[:, 2, 2] = cx * cy
+    return R
+
+
+class LandmarkAugmenter:
+    """
+    Batch augmentation of normalized landmark vectors, applied on the fly
+    while training instead of storing augmented copies.
+
+    Works on (B, 63) static batches and (B, T, 63) sequence batches. Every
+    sample draws one rotation, scale and mirror decision that applies to
+    all its frames, folded into one 3x3 matrix per sample so the batch
+    takes a single matmul; sequences are additionally time warped and get
+    frame dropout. Each op is vectorized over the whole batch.
+
+    Features are wrist-centred with the wrist to middle MCP distance scaled
+    to 1 (utils_landmarks), so rotation is about the wrist and scale jitter
+    is per axis (a uniform scale would be normalized away). Mirroring
+    negates x, turning a right hand into a left one; the features carry no
+    handedness, so the label is unchanged.
+    """
+
+    def __init__(self, ops=AUGMENTATIONS, rotate_deg=ROTATE_DEG, scale=SCALE_JITTER, mirror_p=MIRROR_P,
+                 warp=WARP, frame_dropout=FRAME_DROPOUT, seed=None):
+        unknown = set(ops) - set(AUGMENTATIONS)
+        if unknown:
+            raise ValueError(f"Unknown augmentations {sorted(unknown)}; choose from {AUGMENTATIONS}")
+        self.ops = tuple(ops)
+        self.rotate_deg = rotate_deg
+        self.scale = scale
+        self.mirror_p = mirror_p
+        self.warp = warp
+        self.frame_dropout = frame_dropout
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, X):
+        """Augmented float32 copy of a (B, 63) or (B, T, 63) batch."""
+        X = np.array(X, dtype=np.float32)
+        if len(X) == 0:
+            return X
+        if {'rotate', 'scale', 'mirror'} & set(self.ops):
+            points = X.reshape(len(X), -1, NUM_LANDMARKS, 3)
+            X = (points @ self.transforms(len(X))[:, np.newaxis]).reshape(X.shape)
+        if X.ndim == 3:
+            if 'warp' in self.ops:
+                X = self.time_warp(X)
+            if 'dropout' in self.ops:
+                X = self.drop_frames(X)
+        return X
+
+    def transforms(self, count):
+        """
+        (count, 3, 3) matrices M for row-vector points (p @ M): rotate,
+        then scale each axis, then mirror x.
+        """
+        M = np.tile(np.eye(3), (count, 1, 1))
+        if 'rotate' in self.ops:
+            angles = np.radians(self.rng.uniform(-self.rotate_deg, self.rotate_deg, (count, 3)))
+            M = rotation_matrices(angles).transpose(0, 2, 1)
+        if 'scale' in self.ops:
+            M = M * self.rng.uniform(1 - self.scale, 1 + self.scale, (count, 1, 3))
+        if 'mirror' in self.ops:
+            flip = self.rng.random(count) < self.mirror_p
+            M[flip, :, 0] *= -1
+        return M.astype(np.float32)
+
+    def time_warp(self, X):
+        """
+        Resample each sequence at a random speed around its centre, with
+        linear interpolation between frames; the ends are held.
+        """
+        B, T = X.shape[:2]
+        speed = self.rng.uniform(1 - self.warp, 1 + self.warp, (B, 1))
+        centre = (T - 1) / 2
+        pos = np.clip((np.arange(T) - centre) * speed + centre, 0, T - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, T - 1)
+        frac = (pos - lo)[..., np.newaxis].astype(np.float32)
+        rows = np.arange(B)[:, np.newaxis]
+        return X[rows, lo] * (1 - frac) + X[rows, hi] * frac
+
+    def drop_frames(self, X):
+        """Lost frames repeat the last kept one, like a tracker holding its last detection."""
+        B, T = X.shape[:2]
+        keep = self.rng.random((B, T)) >= self.frame_dropout
+        keep[:, 0] = True
+        source = np.maximum.accumulate(np.where(keep, np.arange(T), 0), axis=1)
+        return X[np.arange(B)[:, np.newaxis], source]
+
+
+def augmented_batches(X, y, batch_size, augment, seed=None):
+    """
+    Endless shuffled (x, y) batches with augment applied to every x batch,
+    for model.fit(..., steps_per_epoch=ceil(len(X) / batch_size)).
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    while True:
+        order = rng.permutation(len(X))
+        for lo in range(0, len(X), batch_size):
+            idx = order[lo:lo + batch_size]
+            yield augment(X[idx]), y[idx]
+
+
+def add_augment_args(parser):
+    """The augmentation options shared by train_static.py and train_dynamic.py."""
+    parser.add_argument('--augment', type=str, nargs='?', const=','.join(AUGMENTATIONS), default=None,
+                        help=f"Augment training batches on the fly; optional comma separated subset of {','.join(AUGMENTATIONS)} "
+                             f"({','.join(SEQUENCE_ONLY)} only affect sequences)")
+    parser.add_argument('--augment_seed', type=int, default=None, help='Seed for reproducible augmentation')
+
+
+def augmenter_from_args(args):
+    """A LandmarkAugmenter, or None when --augment was not given."""
+    if not args.augment:
+        return None
+    ops = [op.strip() for op in args.augment.split(',') if op.strip()]
+    return LandmarkAugmenter(ops, seed=args.augment_seed)
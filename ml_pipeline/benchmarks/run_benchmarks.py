@@ -0,0 +1,255 @@
+import json
+import os
+import sys
+import argparse
+import contextlib
+import io
+import platform
+import shutil
+import tempfile
+import timeit
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+# Add parent dir to path to import the pipeline modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate_dummy_data import class_prototypes, plan_samples, write_json, iter_chunks
+
+# Configuration
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+DEFAULT_THRESHOLD = 2.0      # current / baseline time; absolute timings are noisy
+DEFAULT_MAX_EXPONENT = 1.4   # growth of time with input size (1.0 = linear)
+REPEATS = 5
+
+
+def landmark_dicts(num_frames, seed=0):
+    """Realistic raw landmarks (list of 21 dicts per frame) from the synthetic generator."""
+    rng = np.random.default_rng(seed)
+    protos = class_prototypes(rng, 5)
+    labels, dynamic, lengths = plan_samples(rng, 5, max(1, num_frames // 50), 10, 0, 'mixed')
+    frames = np.concatenate([lm for _, lm, _, _ in iter_chunks(rng, protos, labels, dynamic, lengths)])
+    frames = np.resize(frames, (num_frames, 21, 3)).tolist()
+    return [[{'x': p[0], 'y': p[1], 'z': p[2]} for p in frame] for frame in frames]
+
+
+def write_fixture(tmp_dir, num_samples, frames, sample_type, seed=0):
+    path = os.path.join(tmp_dir, f"{sample_type}_{num_samples}.json")
+    if not os.path.exists(path):
+        rng = np.random.default_rng(seed)
+        num_classes = 10
+        protos = class_prototypes(rng, num_classes)
+        labels, dynamic, lengths = plan_samples(rng, num_classes, num_samples // num_classes,
+                                                frames, 0, sample_type)
+        classes = [f"CLASS_{i:03d}" for i in range(num_classes)]
+        write_json(path, rng, protos, classes, labels, dynamic, lengths, {"dataset": "bench"})
+    return path
+
+
+# Each case: (setup(size, tmp_dir) -> zero-arg callable, sizes).
+# setup may import the module under test; a missing dependency skips the case.
+
+def _normalize(size, tmp_dir):
+    from utils_landmarks import normalize_landmarks
+    frames = landmark_dicts(size)
+    return lambda: [normalize_landmarks(f) for f in frames]
+
+
+def _hand_features(size, tmp_dir):
+    from hand_features import extract_features
+    frames = np.array([[[p['x'], p['y'], p['z']] for p in f] for f in landmark_dicts(size)], dtype=np.float32)
+    return lambda: extract_features(frames)
+
+
+def _yolo(size, tmp_dir):
+    from utils_yolo import convert_to_yolo_format
+    frames = landmark_dicts(size)
+    return lambda: [convert_to_yolo_format(f, 3) for f in frames]
+
+
+def _rank_signs(size, tmp_dir):
+    from analyze_msasl import filter_and_rank_signs
+    rng = np.random.default_rng(0)
+    # Zipf-like label distribution over a vocabulary that grows with the input
+    vocab = max(10, size // 20)
+    labels = rng.zipf(1.3, size) % vocab
+    samples = [{'clean_text': f"sign{l}"} for l in labels]
+    exclude = ["Hello", "A", "B", "C", "D", "E", "1", "2", "3"]
+    return lambda: filter_and_rank_signs(samples, exclude, top_n=100)
+
+
+def _pad_sequence(size, tmp_dir):
+    from train_dynamic import pad_sequence, WINDOW_SIZE, VECTOR_SIZE
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(5, 60, size)
+    seqs = [[[0.0] * VECTOR_SIZE for _ in range(n)] for n in lengths]
+    return lambda: [pad_sequence(s, WINDOW_SIZE) for s in seqs]
+
+
+def _validate(size, tmp_dir):
+    from validate_dataset import validate_arrays
+    rng = np.random.default_rng(0)
+    protos = class_prototypes(rng, 5)
+    labels, dynamic, lengths = plan_samples(rng, 5, max(1, size // 150), 30, 0, 'mixed')
+    chunks = list(iter_chunks(rng, protos, labels, dynamic, lengths))
+    landmarks = np.resize(np.concatenate([lm for _, lm, _, _ in chunks]), (size, 21, 3))
+    t = np.resize(np.concatenate([t for _, _, t, _ in chunks]), size)
+    score = np.resize(np.concatenate([s for _, _, _, s in chunks]), size)
+    offsets = np.arange(0, size + 1, 30)
+    num_samples = len(offsets) - 1
+    sample_labels = [f"CLASS_{i % 5}" for i in range(num_samples)]
+    types = ['dynamic'] * num_samples
+    ids = [str(i) for i in range(num_samples)]
+    return lambda: validate_arrays(landmarks, t, score, offsets, sample_labels, types, ids)
+
+
+def _augment(size, tmp_dir):
+    from augmentation import LandmarkAugmenter
+    rng = np.random.default_rng(0)
+    batch = rng.normal(size=(size, 30, 63)).astype(np.float32)
+    augmenter = LandmarkAugmenter(seed=0)
+    return lambda: augmenter(batch)
+
+
+def _quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def _load_static(size, tmp_dir):
+    from train_static import load_data
+    path = write_fixture(tmp_dir, size, 5, 'static')
+    return lambda: _quiet(load_data, path)
+
+
+def _load_dynamic(size, tmp_dir):
+    from train_dynamic import load_data
+    path = write_fixture(tmp_dir, size, 30, 'dynamic')
+    return lambda: _quiet(load_data, path)
+
+
+CASES = {
+    'normalize_landmarks': (_normalize, [1000, 4000, 16000]),
+    'hand_features.extract_features': (_hand_features, [4000, 16000, 64000]),
+    'convert_to_yolo_format': (_yolo, [1000, 4000, 16000]),
+    'filter_and_rank_signs': (_rank_signs, [5000, 20000, 80000]),
+    'pad_sequence': (_pad_sequence, [500, 2000, 8000]),
+    'validate_dataset.validate_arrays': (_validate, [30000, 120000, 480000]),
+    'augmentation.LandmarkAugmenter': (_augment, [64, 256, 1024]),
+    'train_static.load_data': (_load_static, [100, 400, 1600]),
+    'train_dynamic.load_data': (_load_dynamic, [30, 120, 480]),
+}
+
+
+def time_call(fn, repeats=REPEATS, min_time=0.05):
+    """
+    Best-of-N wall time per call in seconds; the minimum is the least noisy
+    estimate. Fast cases are looped until one measurement takes min_time.
+    """
+    timer = timeit.Timer(fn)
+    single = timer.timeit(number=1)  # also warms caches and lazy imports
+    number = max(1, int(min_time / max(single, 1e-6)))
+    return min(timer.repeat(number=number, repeat=repeats)) / number
+
+
+def fit_exponent(sizes, times):
+    """Slope of log(time) against log(size): ~1 for linear, ~2 for quadratic."""
+    x = np.log(np.asarray(sizes, dtype=np.float64))
+    y = np.log(np.maximum(np.asarray(times, dtype=np.float64), 1e-9))
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def compare(results, baselines, threshold, max_exponent):
+    """
+    Returns a list of failure messages: per-size slowdowns against the stored
+    baseline and super-linear growth across sizes within this run.
+    """
+    failures = []
+    for case, timings in results.items():
+        base = baselines.get(case, {})
+        for size, seconds in timings.items():
+            ref = base.get(str(size))
+            if ref and seconds / ref > threshold:
+                failures.append(f"{case}[{size}]: {seconds*1000:.2f}ms vs baseline "
+                                f"{ref*1000:.2f}ms ({seconds/ref:.2f}x > {threshold}x)")
+        if len(timings) >= 2:
+            exponent = fit_exponent(list(timings.keys()), list(timings.values()))
+            if exponent > max_exponent:
+                failures.append(f"{case}: time grows as size^{exponent:.2f} (max {max_exponent})")
+    return failures
+
+
+def run_cases(names, tmp_dir, repeats=REPEATS):
+    results = {}
+    for name in names:
+        setup, sizes = CASES[name]
+        timings = {}
+        for size in sizes:
+            try:
+                fn = setup(size, tmp_dir)
+            except ImportError as e:
+                print(f"  {name}: skipped ({e})")
+                break
+            timings[size] = time_call(fn, repeats)
+            per_item = timings[size] / size * 1e6
+            print(f"  {name}[{size}]: {timings[size]*1000:.2f}ms ({per_item:.2f}us/item)")
+        if timings:
+            results[name] = timings
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for ml_pipeline hot paths')
+    parser.add_argument('--cases', type=str, default=None, help=f"Comma separated subset of: {', '.join(CASES)}")
+    parser.add_argument('--baseline', type=str, default=BASELINE_FILE, help='Baseline timings JSON')
+    parser.add_argument('--update', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Max allowed slowdown vs baseline')
+    parser.add_argument('--max_exponent', type=float, default=DEFAULT_MAX_EXPONENT, help='Max allowed size scaling exponent')
+    parser.add_argument('--repeats', type=int, default=REPEATS, help='Timing repeats per case')
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.cases.split(',')] if args.cases else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        print(f"Unknown cases: {unknown}")
+        sys.exit(2)
+
+    tmp_dir = tempfile.mkdtemp(prefix='holosign_bench_')
+    try:
+        print("Running benchmarks...")
+        results = run_cases(names, tmp_dir, args.repeats)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if args.update:
+        baselines = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baselines = json.load(f)
+        baselines.setdefault('cases', {})
+        for case, timings in results.items():
+            baselines['cases'][case] = {str(size): seconds for size, seconds in timings.items()}
+        baselines['machine'] = f"{platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baselines = json.load(f).get('cases', {})
+    else:
+        print(f"No baseline at {args.baseline}; only checking scaling.")
+
+    failures = compare(results, baselines, args.threshold, args.max_exponent)
+    if failures:
+        print(f"\n{len(failures)} regression(s):")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nAll benchmarks within thresholds.")
+
+
+if __name__ == '__main__':
+    main()
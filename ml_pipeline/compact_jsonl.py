@@ -0,0 +1,22 @@
+import os
+import argparse
+from dataset_io import compact_jsonl
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact a streaming JSONL dataset into Dataset JSON for the web app')
+    parser.add_argument('input', type=str, help='Path to the .jsonl dataset')
+    parser.add_argument('--output', type=str, default=None, help='Output JSON path (default: input with .json)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Input file not found: {args.input}")
+        return
+
+    output = args.output or os.path.splitext(args.input)[0] + '.json'
+    count = compact_jsonl(args.input, output)
+    print(f"Saved {count} samples to {output}")
+
+
+if __name__ == '__main__':
+    main()
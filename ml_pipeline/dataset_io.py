@@ -0,0 +1,172 @@
+import json
+import os
+import numpy as np
+
+# Dataset files shared by the pipeline scripts.
+#
+# JSONL layout: the first line is {"meta": {...}} and every following line
+# is one Sample from src/capture/DatasetTypes.ts. Each line is flushed as
+# soon as the sample is complete, so a crashed run keeps everything up to
+# the last finished sample and memory stays constant.
+
+
+class JsonlSampleWriter:
+    """
+    Append-only JSONL writer for capture samples. With append, a line left
+    half-written by a crash is cut off first, so the next sample starts on
+    a line of its own.
+    """
+
+    def __init__(self, path, meta, append=False, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.count = 0
+        if append and os.path.exists(path):
+            _drop_partial_line(path)
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, 'a' if append else 'w')
+        if not exists:
+            self._write_line({"meta": meta})
+
+    def write(self, sample):
+        self._write_line(sample)
+        self.count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write_line(self, obj):
+        self._file.write(json.dumps(obj, separators=(',', ':')) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+
+def _drop_partial_line(path):
+    """Truncate path after its last newline."""
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        end = pos = f.tell()
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        if pos < end:
+            f.truncate(pos)
+
+
+def iter_jsonl(path):
+    """
+    Yield (meta, sample) pairs from a JSONL dataset, one sample at a time.
+
+    A truncated final line (the run crashed mid-write) is skipped; so is
+    any other line that does not parse, with a warning.
+    """
+    meta = None
+    with open(path, 'r') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping unreadable line {line_no} in {path}")
+                continue
+            if 'meta' in obj and 'frames' not in obj:
+                meta = obj['meta']
+                continue
+            yield meta, obj
+
+
+def read_jsonl_meta(path):
+    with open(path, 'r') as f:
+        first = f.readline().strip()
+    if not first:
+        return None
+    try:
+        return json.loads(first).get('meta')
+    except json.JSONDecodeError:
+        return None
+
+
+def compact_jsonl(jsonl_path, output_path, meta=None):
+    """
+    Convert a JSONL dataset into the Dataset JSON shape the web app loads.
+
+    Samples are streamed through one by one, so memory stays flat no matter
+    how large the run was. The output is written to a temporary file and
+    renamed into place. Returns the number of samples written.
+    """
+    if meta is None:
+        meta = read_jsonl_meta(jsonl_path) or {}
+
+    tmp_path = output_path + '.tmp'
+    count = 0
+    with open(tmp_path, 'w') as out:
+        out.write('{"meta":' + json.dumps(meta, separators=(',', ':')) + ',"samples":[')
+        for _, sample in iter_jsonl(jsonl_path):
+            if count:
+                out.write(',')
+            out.write(json.dumps(sample, separators=(',', ':')))
+            count += 1
+        out.write(']}\n')
+    os.replace(tmp_path, output_path)
+    return count
+
+
+# Binary layout (.npz): all frames of all samples concatenated.
+#   landmarks      float32 (F, 21, 3)   raw landmarks
+#   t              int32   (F,)         ms since sample start
+#   score          float32 (F,)
+#   sample_offsets int64   (S + 1,)     frames of sample i are [off[i], off[i+1])
+#   labels         int32   (S,)         index into classes
+#   sample_types   uint8   (S,)         index into SAMPLE_TYPES
+#   classes        str     (C,)
+#   meta_json      str     ()           the Dataset meta object
+SAMPLE_TYPES = ('static', 'dynamic')
+BINARY_FORMAT_VERSION = 1
+
+
+def write_binary_dataset(path, landmarks, t, score, sample_offsets, labels,
+                         sample_types, classes, meta):
+    """
+    Write a dataset in the binary .npz layout (uncompressed for load speed).
+    """
+    np.savez(path,
+             format_version=np.int32(BINARY_FORMAT_VERSION),
+             landmarks=np.asarray(landmarks, dtype=np.float32),
+             t=np.asarray(t, dtype=np.int32),
+             score=np.asarray(score, dtype=np.float32),
+             sample_offsets=np.asarray(sample_offsets, dtype=np.int64),
+             labels=np.asarray(labels, dtype=np.int32),
+             sample_types=np.asarray(sample_types, dtype=np.uint8),
+             classes=np.asarray(classes, dtype=str),
+             meta_json=np.asarray(json.dumps(meta)))
+
+
+def read_binary_dataset(path):
+    """
+    Load a binary dataset into a dict of arrays plus 'meta' and 'classes' lists.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data['format_version'])
+        if version != BINARY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary dataset version {version} in {path}")
+        dataset = {key: data[key] for key in data.files
+                   if key not in ('format_version', 'meta_json', 'classes')}
+        dataset['classes'] = [str(c) for c in data['classes']]
+        dataset['meta'] = json.loads(str(data['meta_json']))
+    return dataset
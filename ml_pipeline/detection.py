@@ -0,0 +1,167 @@
+import os
+import argparse
+import glob
+import time
+import cv2
+import numpy as np
+import tracing
+from tracing import NULL_TRACER
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), 'hand_landmarker.task')
+VALIDATION_DIMS = [960, 640, 480, 320]
+
+
+def create_detector(num_hands=1):
+    """
+    HandLandmarker with the settings shared by all extractors.
+    mediapipe is imported here so importing this module stays cheap.
+    """
+    from mediapipe.tasks import python
+    from mediapipe.tasks.python import vision
+
+    base_options = python.BaseOptions(model_asset_path=MODEL_PATH)
+    options = vision.HandLandmarkerOptions(
+        base_options=base_options,
+        num_hands=num_hands,
+        min_hand_detection_confidence=0.5,
+        min_hand_presence_confidence=0.5,
+        min_tracking_confidence=0.5)
+    return vision.HandLandmarker.create_from_options(options)
+
+
+def resize_for_detection(image, max_dim):
+    """
+    Downscale so the longer side is at most max_dim, keeping the aspect ratio.
+    Landmarks are normalized to the image size, so they need no mapping back.
+    """
+    if not max_dim:
+        return image
+    h, w = image.shape[:2]
+    scale = max_dim / max(h, w)
+    if scale >= 1:
+        return image
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def detect_hand(detector, image, max_dim=None, tracer=NULL_TRACER):
+    """
+    Run the detector on a BGR frame, optionally downscaled first.
+    Returns the first hand as a list of {'x','y','z'} dicts, or None.
+    """
+    import mediapipe as mp
+
+    with tracer.span(tracing.COLOR):
+        # Resize before the color conversion so both run on the small frame
+        small = resize_for_detection(image, max_dim)
+        image_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+    with tracer.span(tracing.DETECT):
+        detection_result = detector.detect(mp_image)
+    tracer.count(tracing.FRAMES_DETECTED)
+
+    if not detection_result.hand_landmarks:
+        return None
+    tracer.count(tracing.HANDS_FOUND)
+    return [{'x': lm.x, 'y': lm.y, 'z': lm.z} for lm in detection_result.hand_landmarks[0]]
+
+
+def landmark_error(reference, candidate, width, height):
+    """
+    Per-landmark error between two detections of the same frame, in
+    normalized units and in pixels of the full-resolution frame.
+    """
+    ref = np.array([[lm['x'], lm['y']] for lm in reference])
+    cand = np.array([[lm['x'], lm['y']] for lm in candidate])
+    norm_err = np.linalg.norm(ref - cand, axis=1)
+    pixel_err = np.linalg.norm((ref - cand) * [width, height], axis=1)
+    return norm_err, pixel_err
+
+
+def sample_frames(video_path, count):
+    """Evenly spaced frames from a local clip."""
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+    wanted = set(np.linspace(0, max(total - 1, 0), num=min(count, total)).astype(int).tolist())
+    frames = []
+    idx = 0
+    while cap.isOpened() and len(frames) < len(wanted):
+        success, image = cap.read()
+        if not success:
+            break
+        if idx in wanted:
+            frames.append(image)
+        idx += 1
+    cap.release()
+    return frames
+
+
+def validate(video_paths, dims, frames_per_clip):
+    """
+    Detect each sampled frame at full resolution and at every reduced size
+    and report landmark error and detection time per size.
+    """
+    detector = create_detector()
+    stats = {dim: {'norm': [], 'pixel': [], 'ms': [], 'missed': 0, 'extra': 0} for dim in [None] + dims}
+
+    for path in video_paths:
+        for image in sample_frames(path, frames_per_clip):
+            h, w = image.shape[:2]
+            results = {}
+            for dim in stats:
+                start = time.perf_counter()
+                results[dim] = detect_hand(detector, image, dim)
+                stats[dim]['ms'].append((time.perf_counter() - start) * 1000)
+
+            reference = results[None]
+            for dim in dims:
+                if reference is None and results[dim] is not None:
+                    stats[dim]['extra'] += 1
+                elif reference is not None and results[dim] is None:
+                    stats[dim]['missed'] += 1
+                elif reference is not None:
+                    norm_err, pixel_err = landmark_error(reference, results[dim], w, h)
+                    stats[dim]['norm'].extend(norm_err.tolist())
+                    stats[dim]['pixel'].extend(pixel_err.tolist())
+    detector.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare hand landmarks at full and reduced detection resolution')
+    parser.add_argument('videos', type=str, help='Directory of local clips (or a single video file)')
+    parser.add_argument('--dims', type=str, default=','.join(map(str, VALIDATION_DIMS)), help='Max dimensions to test')
+    parser.add_argument('--clips', type=int, default=10, help='Number of clips to sample')
+    parser.add_argument('--frames', type=int, default=20, help='Frames sampled per clip')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.videos):
+        paths = sorted(p for ext in ('*.mp4', '*.webm', '*.mkv', '*.avi', '*.mov')
+                       for p in glob.glob(os.path.join(args.videos, ext)))[:args.clips]
+    else:
+        paths = [args.videos]
+    if not paths:
+        print(f"No videos found in {args.videos}")
+        return
+
+    dims = [int(d) for d in args.dims.split(',') if d.strip()]
+    print(f"Validating {len(paths)} clips at full resolution vs {dims}...")
+    stats = validate(paths, dims, args.frames)
+
+    full_ms = np.mean(stats[None]['ms']) if stats[None]['ms'] else 0.0
+    print(f"\n{'max dim':>8}{'ms/frame':>10}{'speedup':>9}{'mean err':>10}{'p95 err':>9}{'max px':>8}{'missed':>8}{'extra':>7}")
+    print(f"{'full':>8}{full_ms:>10.2f}{1.0:>9.2f}{'-':>10}{'-':>9}{'-':>8}{'-':>8}{'-':>7}")
+    for dim in dims:
+        s = stats[dim]
+        ms = np.mean(s['ms']) if s['ms'] else 0.0
+        speedup = full_ms / ms if ms else 0.0
+        if s['norm']:
+            mean_err, p95_err, max_px = np.mean(s['norm']), np.percentile(s['norm'], 95), np.max(s['pixel'])
+            print(f"{dim:>8}{ms:>10.2f}{speedup:>9.2f}{mean_err:>10.4f}{p95_err:>9.4f}{max_px:>8.1f}{s['missed']:>8}{s['extra']:>7}")
+        else:
+            print(f"{dim:>8}{ms:>10.2f}{speedup:>9.2f}{'-':>10}{'-':>9}{'-':>8}{s['missed']:>8}{s['extra']:>7}")
+    print("\nErrors are normalized image units (1.0 = full width/height); max px is in full-resolution pixels.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,8 @@
 import numpy as np
-import tensorflow as tf
 import json
 import os
-from sklearn.metrics import classification_report, confusion_matrix
-try:
-    import seaborn as sns
-    import matplotlib.pyplot as plt
-    HAS_PLOT = True
-except ImportError:
-    HAS_PLOT = False
-
 import argparse
+from smoothing import smoothed_norm_samples
 
 # Config
 DEFAULT_DATASET_PATH = '../capture_data.json'
@@ -32,22 +24,78 @@ def load_dataset(path):
     with open(path, 'r') as f:
         return json.load(f)
 
-def evaluate_static(data):
-    if not os.path.exists(STATIC_MODEL_PATH):
+def load_static_model(engine='auto'):
+    """
+    The static model's predict function. 'auto' uses the NumPy export
+    (numpy_mlp.py) when it is at least as new as model.h5, so no
+    TensorFlow is loaded; otherwise Keras.
+    """
+    import numpy_mlp
+    model_dir = os.path.dirname(STATIC_MODEL_PATH)
+    if engine == 'numpy' or (engine == 'auto' and numpy_mlp.is_current(model_dir)):
+        print(f"Using the NumPy engine ({numpy_mlp.weights_path(model_dir)})")
+        return numpy_mlp.NumpyMLP.load(numpy_mlp.weights_path(model_dir)).predict
+    import tensorflow as tf
+    return tf.keras.models.load_model(STATIC_MODEL_PATH).predict
+
+def load_classes(model_path):
+    """
+    The model's class names in output order: classes.json beside it, else
+    the classes stored in its model.npz export, else None.
+    """
+    model_dir = os.path.dirname(model_path)
+    classes_path = os.path.join(model_dir, 'classes.json')
+    if os.path.exists(classes_path):
+        with open(classes_path, 'r') as f:
+            return [str(c) for c in json.load(f)]
+    import numpy_mlp
+    if os.path.exists(numpy_mlp.weights_path(model_dir)):
+        return numpy_mlp.NumpyMLP.load(numpy_mlp.weights_path(model_dir)).classes
+    return None
+
+def label_ids(y_true, y_pred, classes):
+    """
+    y_true as model output ids, with the matching y_pred. Incremental training
+    (train_static.py --incremental) appends new classes, so the ids follow
+    the saved class list rather than sorted label order; samples of labels the
+    model does not know are dropped. Returns (y_true_ids, y_pred, classes).
+    """
+    if classes is None:
+        classes = sorted(set(y_true))
+    class_to_int = {c: i for i, c in enumerate(classes)}
+    known = np.array([label in class_to_int for label in y_true], dtype=bool)
+    unknown = sorted(set(label for label in y_true if label not in class_to_int))
+    if unknown:
+        print(f"Skipping {int((~known).sum())} samples of labels the model was not trained on: {unknown}")
+    y_true_int = np.array([class_to_int[label] for label in y_true if label in class_to_int], dtype=int)
+    return y_true_int, np.asarray(y_pred)[known], classes
+
+def evaluate_static(data, smooth=False, engine='auto'):
+    import numpy_mlp
+    npz_path = numpy_mlp.weights_path(os.path.dirname(STATIC_MODEL_PATH))
+    if not os.path.exists(STATIC_MODEL_PATH) and (engine == 'keras' or not os.path.exists(npz_path)):
         print("Static model not found at", STATIC_MODEL_PATH)
         return
 
     print("\n--- Evaluating Static Model ---")
-    model = tf.keras.models.load_model(STATIC_MODEL_PATH)
+    from sklearn.metrics import classification_report, confusion_matrix
+    predict = load_static_model(engine)
     
     X = []
     y_true = []
     
-    for sample in data['samples']:
-        if sample['type'] != 'static': continue
-        
+    samples = [s for s in data['samples'] if s['type'] == 'static']
+    smoothed = smoothed_norm_samples(samples) if smooth else None
+    
+    for i, sample in enumerate(samples):
         # Eval on every frame? Or average?
         # Let's eval on every 5th frame to speed up
+        if smooth:
+            # Smoothed over every frame, then sampled the same way
+            norm = smoothed[i][::5]
+            X.extend(norm.reshape(-1, VECTOR_SIZE).tolist())
+            y_true.extend([sample['label']] * len(norm))
+            continue
         for frame in sample['frames'][::5]:
              landmarks = frame['features']['norm']
              vector = []
@@ -62,47 +110,64 @@ def evaluate_static(data):
         return
 
     X = np.array(X)
-    y_pred_probs = model.predict(X)
+    y_pred_probs = predict(X)
     y_pred = np.argmax(y_pred_probs, axis=1)
+    y_true_int, y_pred, classes = label_ids(y_true, y_pred, load_classes(STATIC_MODEL_PATH))
+    labels = list(range(len(classes)))
     
-    unique_labels = sorted(list(set(y_true)))
-    label_to_int = {l: i for i, l in enumerate(unique_labels)}
-    y_true_int = [label_to_int[l] for l in y_true]
-    
-    print(classification_report(y_true_int, y_pred, target_names=unique_labels))
+    print(classification_report(y_true_int, y_pred, labels=labels, target_names=classes, zero_division=0))
     
-    if HAS_PLOT:
-        cm = confusion_matrix(y_true_int, y_pred)
-        plt.figure(figsize=(10,8))
-        sns.heatmap(cm, annot=True, fmt='d', xticklabels=unique_labels, yticklabels=unique_labels)
-        plt.title('Static Confusion Matrix')
-        plt.ylabel('Actual')
-        plt.xlabel('Predicted')
-        plt.savefig('static_confusion_matrix.png')
-        print("Saved static_confusion_matrix.png")
-
-def evaluate_dynamic(data):
+    try:
+        import seaborn as sns
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return
+    cm = confusion_matrix(y_true_int, y_pred, labels=labels)
+    plt.figure(figsize=(10,8))
+    sns.heatmap(cm, annot=True, fmt='d', xticklabels=classes, yticklabels=classes)
+    plt.title('Static Confusion Matrix')
+    plt.ylabel('Actual')
+    plt.xlabel('Predicted')
+    plt.savefig('static_confusion_matrix.png')
+    print("Saved static_confusion_matrix.png")
+
+def evaluate_dynamic(data, smooth=False, max_len=None):
     if not os.path.exists(DYNAMIC_MODEL_PATH):
         print("Dynamic model not found at", DYNAMIC_MODEL_PATH)
         return
 
     print("\n--- Evaluating Dynamic Model ---")
+    import tensorflow as tf
+    from sklearn.metrics import classification_report
     model = tf.keras.models.load_model(DYNAMIC_MODEL_PATH)
+    # Models from train_dynamic.py --bucketed take sequences of any length
+    variable_length = model.input_shape[1] is None
     
     X = []
     y_true = []
     
-    for sample in data['samples']:
-        if sample['type'] != 'dynamic': continue
-        
-        sequence = []
-        for frame in sample['frames']:
-            landmarks = frame['features']['norm']
-            vector = []
-            for lm in landmarks:
-                vector.extend([lm['x'], lm['y'], lm['z']])
-            sequence.append(vector)
+    samples = [s for s in data['samples'] if s['type'] == 'dynamic']
+    smoothed = smoothed_norm_samples(samples) if smooth else None
+    
+    for i, sample in enumerate(samples):
+        if smooth:
+            sequence = smoothed[i].reshape(-1, VECTOR_SIZE).tolist()
+        else:
+            sequence = []
+            for frame in sample['frames']:
+                landmarks = frame['features']['norm']
+                vector = []
+                for lm in landmarks:
+                    vector.extend([lm['x'], lm['y'], lm['z']])
+                sequence.append(vector)
             
+        if variable_length:
+            if sequence:
+                # Cut like train_dynamic.py --max_len did in training
+                X.append(np.asarray(sequence[:max_len], dtype=np.float32))
+                y_true.append(sample['label'])
+            continue
+
         # Pad using the same logic as training
         padded_seq = pad_sequence(sequence, WINDOW_SIZE)
             
@@ -114,19 +179,27 @@ def evaluate_dynamic(data):
         print("No dynamic data samples found in dataset.")
         return
 
-    X = np.array(X)
-    y_pred_probs = model.predict(X)
+    if variable_length:
+        # Sequences at their training length, masked and batched by length like in training
+        from train_dynamic import predict_bucketed
+        y_pred_probs = predict_bucketed(model, X)
+    else:
+        X = np.array(X)
+        y_pred_probs = model.predict(X)
     y_pred = np.argmax(y_pred_probs, axis=1)
+    y_true_int, y_pred, classes = label_ids(y_true, y_pred, load_classes(DYNAMIC_MODEL_PATH))
     
-    unique_labels = sorted(list(set(y_true)))
-    label_to_int = {l: i for i, l in enumerate(unique_labels)}
-    y_true_int = [label_to_int[l] for l in y_true]
-    
-    print(classification_report(y_true_int, y_pred, target_names=unique_labels))
+    print(classification_report(y_true_int, y_pred, labels=list(range(len(classes))), target_names=classes,
+                                zero_division=0))
 
 def main():
     parser = argparse.ArgumentParser(description='Evaluate ASL models')
     parser.add_argument('--data', type=str, default=DEFAULT_DATASET_PATH, help='Path to dataset JSON')
+    parser.add_argument('--smooth', action='store_true', help='Evaluate on One Euro smoothed landmarks (for models trained with --smooth)')
+    parser.add_argument('--engine', type=str, default='auto', choices=['auto', 'numpy', 'keras'],
+                        help='Static model engine; auto prefers an up-to-date model.npz from numpy_mlp.py')
+    parser.add_argument('--max_len', type=int, default=None,
+                        help='Cut sequences to this many frames for a bucketed model (the --max_len it was trained with)')
     args = parser.parse_args()
 
     data = load_dataset(args.data)
@@ -134,8 +207,8 @@ def main():
         print(f"Dataset not found at {args.data}")
         return
         
-    evaluate_static(data)
-    evaluate_dynamic(data)
+    evaluate_static(data, args.smooth, args.engine)
+    evaluate_dynamic(data, args.smooth, args.max_len)
 
 if __name__ == '__main__':
     main()
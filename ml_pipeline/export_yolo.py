@@ -1,11 +1,15 @@
-from ultralytics import YOLO
 import os
+import argparse
 import shutil
 import json
 
 def main():
+    parser = argparse.ArgumentParser(description='Export the trained YOLO model to TensorFlow.js for the web app')
+    parser.add_argument('--model', type=str, default='yolo_model/best.pt', help='Trained weights to export')
+    args = parser.parse_args()
+
     # Paths
-    model_path = 'yolo_model/best.pt'
+    model_path = args.model
     if not os.path.exists(model_path):
         # Try finding it in runs directory if it hasn't been moved yet
         alt_path = os.path.join('..', 'runs', 'detect', 'train', 'weights', 'best.pt')
@@ -15,6 +19,7 @@ def main():
             print(f"Error: Trained model not found at {model_path} or {alt_path}")
             return
 
+    from ultralytics import YOLO
     print(f"Loading model from {model_path}...")
     model = YOLO(model_path)
 
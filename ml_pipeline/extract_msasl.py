@@ -0,0 +1,191 @@
+import json
+import os
+import argparse
+import shutil
+from contextlib import closing
+from extraction_sinks import (CaptureJsonSink, LandmarkShardSink, YoloSink,
+                              detection_stride, load_class_ids, safe_label)
+
+from process_msasl_mass import sample_jobs
+from shard_writer import ShardWriter
+from tracing import NULL_TRACER, tracer_from_args
+from detection import create_detector
+from parallel_detect import add_parallel_args, decoded_frames, detect_serial, parallel_detector_from_args
+from frame_dedupe import add_dedupe_args, deduper_from_args
+from fetch_scheduler import add_fetch_args, open_clip, scheduler_from_args
+
+# Configuration
+MSASL_DIR = 'MS-ASL'
+SHARDED_DIR = 'sharded_data'
+YOLO_DATA_DIR = 'yolo_dataset'
+CAPTURE_OUTPUT_FILE = '../msasl_processed_data.json'
+TEMP_DIR = 'temp_videos_extract'
+SINK_NAMES = ('shard', 'yolo', 'capture')
+
+
+def extract_clip(video_path, clip, sinks, detector, tracer=NULL_TRACER, max_detect_dim=None, segment=None,
+                 parallel=None):
+    """
+    Decode a clip once, run the detector once per wanted frame and fan the
+    result out to every sink. Returns {sink_name: frames_kept}.
+    Sinks always receive the full-resolution frame, even when detection
+    runs on a copy downscaled to max_detect_dim. segment (start_time,
+    end_time) limits extraction to that part of video_path. With parallel
+    (a ParallelDetector) the frames are detected in its worker processes
+    and detector is not used.
+    """
+    wants_frame = detection_stride(sinks.values())
+    for sink in sinks.values():
+        sink.begin_clip(clip)
+
+    cap = open_clip(video_path, segment)
+    # Frames no sink wants are grabbed but never converted to BGR
+    frames = decoded_frames(cap, wants_frame, tracer)
+    if parallel is not None:
+        detections = parallel.detect(frames)
+    else:
+        detections = detect_serial(detector, frames, max_detect_dim, tracer)
+
+    for frame_idx, image, landmarks in detections:
+        if not landmarks:
+            continue
+        if parallel is not None:
+            # The ring slot is reused, but sinks may queue the frame for a background writer
+            image = image.copy()
+        for sink in sinks.values():
+            if frame_idx % sink.frame_stride == 0:
+                sink.add_frame(frame_idx, image, landmarks)
+
+    cap.release()
+    return {name: sink.end_clip() for name, sink in sinks.items()}
+
+
+def build_sinks(names, classes, args, writer=None):
+    sinks = {}
+    if 'shard' in names:
+        sinks['shard'] = LandmarkShardSink(SHARDED_DIR, save_images=args.shard_images, writer=writer)
+    if 'yolo' in names:
+        sinks['yolo'] = YoloSink(YOLO_DATA_DIR, classes, writer=writer, deduper=deduper_from_args(args))
+    if 'capture' in names:
+        sinks['capture'] = CaptureJsonSink(CAPTURE_OUTPUT_FILE,
+                                           notes=f"Processed from MSASL_{args.subset}.json")
+    return sinks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='One-pass MS-ASL extraction into shard, YOLO and capture outputs')
+    parser.add_argument('--limit_signs', type=int, default=5, help='Limit number of signs to process')
+    parser.add_argument('--samples_per_sign', type=int, default=10, help='Limit samples per sign')
+    parser.add_argument('--subset', type=str, default='train', choices=['train', 'val', 'test'], help='Subset to process')
+    parser.add_argument('--sinks', type=str, default='shard,yolo', help=f"Comma separated outputs: {','.join(SINK_NAMES)}")
+    parser.add_argument('--shard_images', action='store_true', help='Also save JPEGs inside the shards')
+    parser.add_argument('--jpeg_workers', type=int, default=4, help='Threads encoding JPEGs in the background')
+    parser.add_argument('--precision', type=int, default=None, help='Round landmark floats to this many decimals')
+    parser.add_argument('--max_detect_dim', type=int, default=None, help='Downscale frames so the longer side is at most this before detection')
+    add_dedupe_args(parser)
+    add_fetch_args(parser)
+    add_parallel_args(parser)
+    parser.add_argument('--trace', type=str, default=None, help='Write a Chrome trace-event JSON of all stages here')
+    args = parser.parse_args()
+
+    # Checked here rather than at import so --help and the unified CLI stay fast
+    try:
+        import mediapipe
+    except ImportError:
+        print("Error: mediapipe not found. Please run: pip install -r requirements.txt")
+        exit(1)
+    if not args.local_videos:
+        try:
+            import yt_dlp
+        except ImportError:
+            print("Error: yt-dlp not found. Please run: pip install -r requirements.txt")
+            exit(1)
+    tracer = tracer_from_args(args.trace)
+
+    names = [n.strip() for n in args.sinks.split(',') if n.strip()]
+    unknown = [n for n in names if n not in SINK_NAMES]
+    if unknown or not names:
+        print(f"Unknown sinks: {unknown}. Choose from {SINK_NAMES}")
+        return
+
+    # Global class ids come from the top-100 list so every sink agrees
+    signs_path = os.path.join(os.path.dirname(__file__), 'top_100_signs.json')
+    classes, class_to_id = load_class_ids(signs_path)
+    target_signs = classes[:args.limit_signs]
+
+    msasl_path = os.path.join(os.path.dirname(__file__), MSASL_DIR, f'MSASL_{args.subset}.json')
+    if not os.path.exists(msasl_path):
+        print(f"Input file not found: {msasl_path}")
+        return
+    with open(msasl_path, 'r') as f:
+        all_samples = json.load(f)
+
+    writer = ShardWriter(jpeg_workers=args.jpeg_workers, precision=args.precision, tracer=tracer)
+    sinks = build_sinks(names, classes, args, writer)
+    parallel = parallel_detector_from_args(args, tracer)
+    detector = create_detector() if parallel is None else None
+    scheduler = scheduler_from_args(args, tracer)
+    os.makedirs(TEMP_DIR, exist_ok=True)
+
+    print(f"Extracting {len(target_signs)} signs into: {', '.join(sinks)}")
+
+    for sign in target_signs:
+        print(f"\n--- Sign: {sign} (ID: {class_to_id[sign]}) ---")
+        sign_samples = [s for s in all_samples if s['clean_text'] == sign]
+
+        count = 0
+        prefetch = min(args.samples_per_sign, 2 * args.fetch_workers)
+        with closing(scheduler.fetch_iter(sample_jobs(sign_samples, TEMP_DIR), prefetch)) as results:
+            for job, result in results:
+                if count >= args.samples_per_sign:
+                    break
+
+                sample_id = job['sample_id']
+                url = job['url']
+                temp_vid = result.path
+                if not result.ok:
+                    print(f"  [{count+1}] Failed to download {url}: {result.error}")
+                    continue
+
+                clip_start = tracer.snapshot()
+                clip = {
+                    'sample_id': sample_id,
+                    'label': sign,
+                    'class_id': class_to_id[sign],
+                    'url': url,
+                }
+                kept = extract_clip(temp_vid, clip, sinks, detector, tracer, args.max_detect_dim, result.segment,
+                                    parallel)
+                if any(kept.values()):
+                    count += 1
+                    summary = ', '.join(f"{name}={n}" for name, n in kept.items())
+                    print(f"  [{count}] Processed {sample_id}: {summary} | {tracer.format_summary(clip_start)}")
+                else:
+                    print(f"  [{count+1}] No hands in {sample_id}")
+
+                scheduler.release(result)
+
+        if 'shard' in sinks:
+            writer.sync_shard(os.path.join(SHARDED_DIR, safe_label(sign)))
+
+    for sink in sinks.values():
+        sink.close()
+    if 'yolo' in sinks and sinks['yolo'].deduper is not None:
+        print(sinks['yolo'].deduper.report())
+    scheduler.close()
+    writer.close()
+    if parallel is not None:
+        parallel.close()
+    else:
+        detector.close()
+    shutil.rmtree(TEMP_DIR, ignore_errors=True)
+    print("\nExtraction complete.")
+    print(scheduler.report())
+    tracer.print_report()
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
+
+
+if __name__ == '__main__':
+    main()
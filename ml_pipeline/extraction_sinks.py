@@ -0,0 +1,242 @@
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+import cv2
+from dataset_io import JsonlSampleWriter, compact_jsonl
+from utils_landmarks import normalize_landmarks
+from utils_yolo import convert_to_yolo_format
+
+
+def safe_label(label):
+    """
+    Filesystem-safe folder name for a sign label (same rule as the shard layout).
+    """
+    return "".join([c for c in label if c.isalnum() or c in (' ', '_')]).strip().replace(' ', '_')
+
+
+def load_class_ids(classes_file):
+    """
+    Load the global class list (top_100_signs.json) and map each sign to its YOLO id.
+    """
+    with open(classes_file, 'r') as f:
+        classes = json.load(f)
+    return classes, {name: i for i, name in enumerate(classes)}
+
+
+def write_dataset_yaml(yolo_dir, classes, note='Placeholder'):
+    yaml_content = f"""
+path: {os.path.abspath(yolo_dir)}
+train: images/train
+val: images/train # {note}
+
+names:
+"""
+    for i, name in enumerate(classes):
+        yaml_content += f"  {i}: {name}\n"
+
+    with open(os.path.join(yolo_dir, 'dataset.yaml'), 'w') as f:
+        f.write(yaml_content)
+
+
+class FrameSink(ABC):
+    """
+    Receives the detections of one decoded clip.
+
+    The extractor calls begin_clip() once per clip, add_frame() for every
+    frame index that is a multiple of frame_stride and has a detected hand,
+    then end_clip(). close() runs once after the last clip. Subclasses must
+    implement add_frame().
+    """
+    frame_stride = 1
+    writer = None
+
+    def begin_clip(self, clip):
+        self.clip = clip
+
+    @abstractmethod
+    def add_frame(self, frame_idx, image, landmarks):
+        """Called for each kept frame with a detected hand."""
+
+    def end_clip(self):
+        """Returns the number of frames this sink kept for the clip."""
+        return 0
+
+    def close(self):
+        pass
+
+    def _save_image(self, path, image):
+        if self.writer is not None:
+            self.writer.write_image(path, image)
+        else:
+            cv2.imwrite(path, image)
+
+    def _save_text(self, path, text):
+        if self.writer is not None:
+            self.writer.write_text(path, text)
+        else:
+            with open(path, 'w') as f:
+                f.write(text)
+
+    def _save_record(self, path, record):
+        if self.writer is not None:
+            self.writer.write_record(path, record)
+        else:
+            with open(path, 'w') as f:
+                json.dump(record, f, separators=(',', ':'))
+
+
+class LandmarkShardSink(FrameSink):
+    """
+    Writes sharded_data/<label>/<sample_id>.json in the process_msasl_mass.py layout,
+    with YOLO labels that carry the global class id instead of a mock 0.
+    """
+
+    def __init__(self, sharded_dir, frame_stride=3, save_images=False, writer=None):
+        self.sharded_dir = sharded_dir
+        self.frame_stride = frame_stride
+        self.save_images = save_images
+        self.writer = writer
+
+    def begin_clip(self, clip):
+        super().begin_clip(clip)
+        self.frames_data = []
+        self.yolo_labels = []
+        self.shard_dir = os.path.join(self.sharded_dir, safe_label(clip['label']))
+        os.makedirs(self.shard_dir, exist_ok=True)
+
+    def add_frame(self, frame_idx, image, landmarks):
+        self.frames_data.append({
+            "t": frame_idx * 33,
+            "landmarks": landmarks
+        })
+        yolo_label = convert_to_yolo_format(landmarks, self.clip['class_id'])
+        if yolo_label:
+            if self.save_images:
+                img_dir = os.path.join(self.shard_dir, 'images')
+                os.makedirs(img_dir, exist_ok=True)
+                img_name = f"{self.clip['sample_id']}_{len(self.yolo_labels)}.jpg"
+                self._save_image(os.path.join(img_dir, img_name), image)
+            self.yolo_labels.append(yolo_label)
+
+    def end_clip(self):
+        if not self.frames_data:
+            return 0
+        sample_json = {
+            "id": self.clip['sample_id'],
+            "label": self.clip['label'],
+            "frames": self.frames_data,
+            "yolo_labels": self.yolo_labels
+        }
+        sample_path = os.path.join(self.shard_dir, f"{self.clip['sample_id']}.json")
+        self._save_record(sample_path, sample_json)
+        return len(self.frames_data)
+
+
+class YoloSink(FrameSink):
+    """
+    Writes images and labels straight into the YOLO training layout, so
+    prepare_mass_yolo.py no longer has to re-read shards and copy images.
+    Near-duplicate frames are skipped when a FrameDeduper is given.
+    """
+
+    def __init__(self, yolo_dir, classes, frame_stride=5, writer=None, deduper=None):
+        self.yolo_dir = yolo_dir
+        self.writer = writer
+        self.deduper = deduper
+        self.classes = classes
+        self.frame_stride = frame_stride
+        self.images_dir = os.path.join(yolo_dir, 'images', 'train')
+        self.labels_dir = os.path.join(yolo_dir, 'labels', 'train')
+        os.makedirs(self.images_dir, exist_ok=True)
+        os.makedirs(self.labels_dir, exist_ok=True)
+
+    def begin_clip(self, clip):
+        super().begin_clip(clip)
+        self.saved_frames = 0
+        if self.deduper is not None:
+            self.deduper.begin_clip()
+
+    def add_frame(self, frame_idx, image, landmarks):
+        yolo_label = convert_to_yolo_format(landmarks, self.clip['class_id'])
+        if not yolo_label:
+            return
+        if self.deduper is not None and not self.deduper.keep(landmarks, image):
+            return
+        frame_name = f"{self.clip['sample_id']}_{self.saved_frames}"
+        self._save_image(os.path.join(self.images_dir, f"{frame_name}.jpg"), image)
+        self._save_text(os.path.join(self.labels_dir, f"{frame_name}.txt"), yolo_label)
+        self.saved_frames += 1
+
+    def end_clip(self):
+        return self.saved_frames
+
+    def close(self):
+        write_dataset_yaml(self.yolo_dir, self.classes)
+
+
+class CaptureJsonSink(FrameSink):
+    """
+    Streams samples in the capture Dataset shape (src/capture/DatasetTypes.ts)
+    to a JSONL file as each clip ends and compacts it into one JSON file on
+    close(), like process_msasl.py.
+    """
+
+    def __init__(self, output_file, notes='', frame_stride=1):
+        self.output_file = output_file
+        self.frame_stride = frame_stride
+        self.jsonl_path = output_file + '.partial.jsonl'
+        meta = {
+            "dataset": "msasl-processed",
+            "version": "1.0",
+            "createdAt": time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+            "fps": 30,
+            "notes": notes
+        }
+        self.sample_writer = JsonlSampleWriter(self.jsonl_path, meta)
+
+    def begin_clip(self, clip):
+        super().begin_clip(clip)
+        self.frames_data = []
+        self.last_frame_idx = 0
+
+    def add_frame(self, frame_idx, image, landmarks):
+        self.frames_data.append({
+            "t": frame_idx * 33,
+            "landmarks": landmarks,
+            "features": {
+                "norm": normalize_landmarks(landmarks)
+            }
+        })
+        self.last_frame_idx = frame_idx
+
+    def end_clip(self):
+        if not self.frames_data:
+            return 0
+        self.sample_writer.write({
+            "id": str(uuid.uuid4()),
+            "label": self.clip['label'],
+            "type": "dynamic",
+            "handedness": "Unknown",
+            "frames": self.frames_data,
+            "summary": {
+                "durationMs": (self.last_frame_idx + 1) * 33
+            },
+            "timestamp": int(time.time() * 1000)
+        })
+        return len(self.frames_data)
+
+    def close(self):
+        self.sample_writer.close()
+        compact_jsonl(self.jsonl_path, self.output_file)
+        os.remove(self.jsonl_path)
+
+
+def detection_stride(sinks):
+    """
+    Returns a predicate telling whether any sink wants frame frame_idx,
+    so each frame is detected at most once for all sinks.
+    """
+    strides = sorted({sink.frame_stride for sink in sinks})
+    return lambda frame_idx: any(frame_idx % s == 0 for s in strides)
@@ -0,0 +1,370 @@
+import glob
+import json
+import os
+import random
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+import cv2
+import tracing
+from tracing import NULL_TRACER
+
+# Defaults; network latency, not CPU, bounds small extraction runs
+FETCH_WORKERS = 4
+PER_HOST = 4
+RETRIES = 3
+BACKOFF_S = 1.0       # first retry delay, doubled per attempt
+MAX_BACKOFF_S = 30.0
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.avi', '.mov')
+
+# yt-dlp errors that no retry will fix
+PERMANENT_MESSAGES = ('video unavailable', 'private video', 'has been removed', 'is not available',
+                      'account associated with this video has been terminated', 'copyright',
+                      'sign in to confirm your age', 'members-only')
+
+
+def clean_url(url):
+    """MS-ASL urls are sometimes bare video ids or lack the scheme."""
+    if 'youtube.com' not in url and 'youtu.be' not in url:
+        url = f"https://www.youtube.com/watch?v={url}" if 'www' not in url else f"https://{url}"
+    return url
+
+
+def _parse(url):
+    # urlparse only finds the host after '//'
+    return urlparse(url if '//' in url else '//' + url)
+
+
+def video_id(url):
+    """YouTube id from a watch/short url, else the last path segment."""
+    parsed = _parse(clean_url(url))
+    query = parse_qs(parsed.query)
+    if 'v' in query:
+        return query['v'][0]
+    return parsed.path.rstrip('/').rsplit('/', 1)[-1]
+
+
+class YtDlpBackend:
+    """Downloads the [start_time, end_time] segment of a YouTube video with yt-dlp."""
+
+    name = 'yt-dlp'
+
+    def fetch(self, url, start_time, end_time, output_path):
+        """The whole video when start_time is None."""
+        import yt_dlp
+        ydl_opts = {
+            'format': 'best[ext=mp4]',
+            'outtmpl': output_path,
+            'quiet': True,
+        }
+        if start_time is not None:
+            ydl_opts['download_ranges'] = lambda info, ydl: [{'start_time': start_time, 'end_time': end_time}]
+            ydl_opts['force_keyframes_at_cuts'] = True  # Re-encode to ensure precise cuts
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([url])
+        if not os.path.exists(output_path):
+            raise IOError(f"yt-dlp produced no file for {url}")
+
+    def permanent(self, error):
+        message = str(error).lower()
+        return any(m in message for m in PERMANENT_MESSAGES)
+
+
+class LocalDirectoryBackend:
+    """
+    Stand-in for yt-dlp: copies <directory>/<video id>.<ext> to the output
+    path, optionally after a fixed delay to mimic network latency. A local
+    file stands for the clip itself, or for its whole source video when
+    the scheduler runs with whole_sources.
+    """
+
+    name = 'local'
+
+    def __init__(self, directory, delay_s=0.0):
+        self.directory = directory
+        self.delay_s = delay_s
+
+    def find(self, url):
+        vid = video_id(url)
+        for ext in VIDEO_EXTENSIONS:
+            matches = glob.glob(os.path.join(glob.escape(self.directory), glob.escape(vid) + ext))
+            if matches:
+                return matches[0]
+        return None
+
+    def fetch(self, url, start_time, end_time, output_path):
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        source = self.find(url)
+        if source is None:
+            raise FileNotFoundError(f"No local video for {video_id(url)} in {self.directory}")
+        shutil.copyfile(source, output_path)
+
+    def permanent(self, error):
+        return isinstance(error, FileNotFoundError)
+
+
+class FetchResult:
+    """segment is (start_time, end_time) when path is a whole source video, else None."""
+
+    def __init__(self, ok, path, attempts, seconds, error=None, segment=None):
+        self.ok = ok
+        self.path = path
+        self.attempts = attempts
+        self.seconds = seconds
+        self.error = error
+        self.segment = segment
+
+
+class SegmentCapture:
+    """
+    cv2.VideoCapture over the [start_time, end_time) seconds of a video.
+    Seeks straight to the first frame and reports end of stream after the
+    last one, so a clip is read out of its source without re-encoding.
+    """
+
+    def __init__(self, path, start_time, end_time):
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.pos = int(round(start_time * fps)) if start_time else 0
+        self.end = int(round(end_time * fps)) if end_time is not None else None
+        if self.pos:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.pos)
+
+    def _done(self):
+        return self.end is not None and self.pos >= self.end
+
+    def isOpened(self):
+        return self.cap.isOpened() and not self._done()
+
+    def read(self):
+        if self._done():
+            return False, None
+        self.pos += 1
+        return self.cap.read()
+
+    def grab(self):
+        if self._done():
+            return False
+        self.pos += 1
+        return self.cap.grab()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+
+def open_clip(path, segment=None):
+    """A capture over the whole file, or only over segment (start_time, end_time) of it."""
+    if segment is None:
+        return cv2.VideoCapture(path)
+    return SegmentCapture(path, *segment)
+
+
+class FetchScheduler:
+    """
+    Runs clip downloads on a thread pool.
+
+    At most `workers` downloads run at once, and at most `per_host` of
+    them against any one host. A failed attempt is retried up to `retries`
+    times with exponential backoff and jitter, unless the backend says
+    the error is permanent. Final failures are appended to failure_log
+    (JSON lines). fetch_iter() keeps a bounded number of downloads ahead
+    of the consumer and yields results in job order.
+
+    With whole_sources, fetch_iter() downloads each source url once, in
+    full, and hands out every clip of it as the shared file plus its
+    segment; read it with open_clip() and hand it back with release().
+    """
+
+    def __init__(self, backend, workers=FETCH_WORKERS, per_host=PER_HOST, retries=RETRIES,
+                 backoff_s=BACKOFF_S, max_backoff_s=MAX_BACKOFF_S, failure_log=None,
+                 whole_sources=False, tracer=NULL_TRACER, sleep=time.sleep):
+        self.backend = backend
+        self.workers = workers
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.failure_log = failure_log
+        self.whole_sources = whole_sources
+        self.tracer = tracer
+        self._sleep = sleep
+        self._random = random.Random()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch')
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._refs = {}  # source path -> clips not yet released
+        self.clips = 0
+        self.sources = 0
+        self.ok = 0
+        self.failed = 0
+        self.retried = 0
+        self.bytes = 0
+
+    def _host_slot(self, url):
+        host = _parse(url).hostname or ''
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host or self.workers)
+            return self._hosts[host]
+
+    def backoff(self, attempt):
+        """Delay before retry number attempt (1-based): doubling, capped, with up to 25% jitter."""
+        delay = min(self.backoff_s * 2 ** (attempt - 1), self.max_backoff_s)
+        return delay * (1 + 0.25 * self._random.random())
+
+    def fetch(self, url, start_time, end_time, output_path):
+        """Blocking fetch with retries; returns a FetchResult."""
+        slot = self._host_slot(url)
+        start = time.perf_counter()
+        error = None
+        attempt = 0
+        while attempt <= self.retries:
+            attempt += 1
+            try:
+                with slot, self.tracer.span(tracing.FETCH, url=url, attempt=attempt):
+                    self.backend.fetch(url, start_time, end_time, output_path)
+                size = os.path.getsize(output_path)
+                with self._lock:
+                    self.ok += 1
+                    self.bytes += size
+                self.tracer.count(tracing.BYTES_FETCHED, size)
+                return FetchResult(True, output_path, attempt, time.perf_counter() - start)
+            except Exception as e:
+                error = e
+                if self.backend.permanent(e) or attempt > self.retries:
+                    break
+                with self._lock:
+                    self.retried += 1
+                self.tracer.count(tracing.FETCH_RETRIES)
+                self._sleep(self.backoff(attempt))
+
+        with self._lock:
+            self.failed += 1
+        self._log_failure(url, start_time, end_time, attempt, error)
+        return FetchResult(False, None, attempt, time.perf_counter() - start, str(error))
+
+    def submit(self, job):
+        return self._executor.submit(self.fetch, job['url'], job.get('start_time'), job.get('end_time'),
+                                     job['output_path'])
+
+    def fetch_iter(self, jobs, prefetch=None):
+        """
+        Yield (job, FetchResult) for job dicts (url, start_time, end_time,
+        output_path, plus any caller keys), with up to prefetch (default
+        2 x workers) downloads in flight. Clips come in job order, or
+        grouped by source url with whole_sources. Closing the generator
+        early cancels the downloads that have not started.
+        """
+        prefetch = prefetch or 2 * self.workers
+        if self.whole_sources:
+            return self._iter_sources(jobs, prefetch)
+        return self._iter_clips(jobs, prefetch)
+
+    def _iter_clips(self, jobs, prefetch):
+        jobs = iter(jobs)
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < prefetch:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    pending.append((job, self.submit(job)))
+                if not pending:
+                    return
+                job, future = pending.popleft()
+                self.clips += 1
+                yield job, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _iter_sources(self, jobs, prefetch):
+        # Sources go in order of their first clip; all their clips follow
+        groups = {}
+        for job in jobs:
+            groups.setdefault(job['url'], []).append(job)
+        groups = iter(groups.values())
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < prefetch:
+                    group = next(groups, None)
+                    if group is None:
+                        break
+                    first = group[0]
+                    with self._lock:
+                        self.sources += 1
+                        # Numbered so a source fetched again later never shares a file
+                        name = f"source{self.sources}_{video_id(first['url'])}.mp4"
+                        path = os.path.join(os.path.dirname(first['output_path']), name)
+                        self._refs[path] = len(group)
+                    pending.append((group, self._executor.submit(self.fetch, first['url'], None, None, path)))
+                if not pending:
+                    return
+                group, future = pending.popleft()
+                source = future.result()
+                for job in group:
+                    self.clips += 1
+                    yield job, FetchResult(source.ok, source.path, source.attempts, source.seconds, source.error,
+                                           segment=(job.get('start_time'), job.get('end_time')))
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def release(self, result):
+        """Delete a fetched clip, or its source once every clip of the source is released."""
+        if result.path is None:
+            return
+        if result.segment is not None:
+            with self._lock:
+                self._refs[result.path] -= 1
+                if self._refs[result.path] > 0:
+                    return
+                del self._refs[result.path]
+        if os.path.exists(result.path):
+            os.remove(result.path)
+
+    def _log_failure(self, url, start_time, end_time, attempts, error):
+        if not self.failure_log:
+            return
+        entry = {'url': url, 'start_time': start_time, 'end_time': end_time, 'attempts': attempts,
+                 'error': str(error), 'backend': self.backend.name, 'time': time.time()}
+        with self._lock:
+            with open(self.failure_log, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def report(self):
+        fetched = f"{self.clips} clips from {self.sources} sources: " if self.whole_sources else ''
+        return (f"Fetch ({self.backend.name}, {self.workers} workers): {fetched}{self.ok} ok, {self.failed} failed, "
+                f"{self.retried} retries, {self.bytes / 1e6:.1f}MB")
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def add_fetch_args(parser):
+    """The download options shared by the MS-ASL extractors."""
+    parser.add_argument('--fetch_workers', type=int, default=FETCH_WORKERS, help='Concurrent downloads')
+    parser.add_argument('--per_host', type=int, default=PER_HOST, help='Max concurrent downloads per host')
+    parser.add_argument('--retries', type=int, default=RETRIES, help='Retries per clip after the first attempt')
+    parser.add_argument('--backoff', type=float, default=BACKOFF_S, help='First retry delay in seconds (doubles per retry)')
+    parser.add_argument('--failure_log', type=str, default=None, help='Append failed downloads here as JSON lines')
+    parser.add_argument('--whole_sources', action='store_true',
+                        help='Download each source video once and cut its clips locally instead of per-clip re-encoded ranges')
+    parser.add_argument('--local_videos', type=str, default=None,
+                        help='Copy <video id>.mp4 from this directory instead of downloading (testing)')
+
+
+def scheduler_from_args(args, tracer=NULL_TRACER):
+    backend = LocalDirectoryBackend(args.local_videos) if args.local_videos else YtDlpBackend()
+    return FetchScheduler(backend, workers=args.fetch_workers, per_host=args.per_host, retries=args.retries,
+                          backoff_s=args.backoff, failure_log=args.failure_log, whole_sources=args.whole_sources,
+                          tracer=tracer)
@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+from utils_landmarks import normalize_landmarks_array
+from utils_yolo import landmarks_to_box
+
+# Defaults, in the units of each signature
+LANDMARK_THRESHOLD = 0.1   # largest single-landmark move, wrist-to-middle-MCP = 1
+BOX_THRESHOLD = 0.02       # max change of any normalized box coordinate
+HASH_THRESHOLD = 6         # differing bits out of 64 in the dHash
+
+
+def landmark_signature(landmarks):
+    """Wrist-centered, scale-normalized (21, 3) array, so pose is compared independent of position."""
+    points = np.array([[lm['x'], lm['y'], lm['z']] for lm in landmarks], dtype=np.float32)
+    return normalize_landmarks_array(points)
+
+
+def dhash(image, hash_size=8):
+    """Difference hash of a frame: signs of the horizontal gradients of a tiny grayscale copy, as an int."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class FrameDeduper:
+    """
+    Drops frames that repeat an already-kept frame of the same clip.
+
+    A frame is a duplicate when, for some kept frame, the normalized hand
+    pose is within landmark_threshold AND the YOLO box is within
+    box_threshold (AND, if hash_threshold is set, the image dHash is within
+    that many bits). Call begin_clip() between clips; the counters
+    accumulate over the whole run for report().
+    """
+
+    def __init__(self, landmark_threshold=LANDMARK_THRESHOLD, box_threshold=BOX_THRESHOLD,
+                 hash_threshold=None):
+        self.landmark_threshold = landmark_threshold
+        self.box_threshold = box_threshold
+        self.hash_threshold = hash_threshold
+        self.seen = 0
+        self.dropped = 0
+        self.clips = 0
+        self.begin_clip()
+
+    def begin_clip(self):
+        self._poses = []
+        self._boxes = []
+        self._hashes = []
+
+    def keep(self, landmarks, image=None):
+        """
+        True if the frame should be written; it is then remembered for
+        comparison with later frames of the clip.
+        """
+        self.seen += 1
+        pose = landmark_signature(landmarks)
+        box = np.array(landmarks_to_box(landmarks), dtype=np.float32)
+        frame_hash = dhash(image) if self.hash_threshold is not None and image is not None else None
+
+        if self._poses:
+            # Max over landmarks so one moved fingertip is enough to count as new
+            pose_dist = np.linalg.norm(np.stack(self._poses) - pose, axis=-1).max(axis=-1)
+            box_dist = np.abs(np.stack(self._boxes) - box).max(axis=-1)
+            similar = (pose_dist <= self.landmark_threshold) & (box_dist <= self.box_threshold)
+            if frame_hash is not None:
+                similar &= np.array([h is None or hamming(h, frame_hash) <= self.hash_threshold
+                                     for h in self._hashes])
+            if similar.any():
+                self.dropped += 1
+                return False
+
+        if not self._poses:
+            self.clips += 1
+        self._poses.append(pose)
+        self._boxes.append(box)
+        self._hashes.append(frame_hash)
+        return True
+
+    @property
+    def kept(self):
+        return self.seen - self.dropped
+
+    def report(self):
+        removed = self.dropped / self.seen * 100 if self.seen else 0.0
+        mode = 'landmarks+box' + ('+dhash' if self.hash_threshold is not None else '')
+        return (f"Dedupe ({mode}): kept {self.kept} of {self.seen} frames from {self.clips} clips, "
+                f"removed {self.dropped} ({removed:.1f}%)")
+
+
+def add_dedupe_args(parser):
+    """The dedupe options shared by the YOLO dataset writers."""
+    parser.add_argument('--dedupe', action='store_true', help='Drop near-duplicate frames within each clip')
+    parser.add_argument('--dedupe_landmarks', type=float, default=LANDMARK_THRESHOLD, help='Max normalized distance any landmark may move for a duplicate')
+    parser.add_argument('--dedupe_box', type=float, default=BOX_THRESHOLD, help='Max box coordinate change for a duplicate')
+    parser.add_argument('--dedupe_hash', type=int, nargs='?', const=HASH_THRESHOLD, default=None,
+                        help=f"Also require the image dHash to be within this many bits (default {HASH_THRESHOLD} when given)")
+
+
+def deduper_from_args(args):
+    if not args.dedupe:
+        return None
+    return FrameDeduper(args.dedupe_landmarks, args.dedupe_box, args.dedupe_hash)
@@ -1,85 +1,262 @@
 import json
-import random
-import time
 import uuid
-import os
+import argparse
+import numpy as np
+from augmentation import rotation_matrices
+from dataset_io import SAMPLE_TYPES, write_binary_dataset
+from hand_features import capture_angles, capture_finger_states, extract_features
 
 # Configuration
 OUTPUT_FILE = 'capture_data.json'
 SAMPLES_PER_CLASS = 10
 CLASSES = ['A', 'B', 'C', 'D', 'E']
 FRAMES_PER_SAMPLE = 5  # Keeping it small for dummy data
+FRAME_MS = 33  # ~30fps
+CREATED_AT = "2026-01-14T00:00:00.000Z"
+TIMESTAMP = 1768348800000  # CREATED_AT in ms, keeps seeded output byte-identical
+CHUNK_SAMPLES = 2000
 
-def generate_random_landmark():
-    return {
-        "x": random.random(),
-        "y": random.random(),
-        "z": random.random()
-    }
+# Canonical right hand, palm towards the camera, fingers pointing up (-y).
+# Units are hand scale: wrist (0) to middle MCP (9) is exactly 1.
+# Per finger: base joint (thumb CMC / finger MCP), base direction in degrees
+# from straight up (+ towards the thumb), and the three bone lengths after it.
+FINGER_BASES = np.array([
+    [0.30, -0.20, 0.0],   # Thumb CMC (1)
+    [0.30, -0.95, 0.0],   # Index MCP (5)
+    [0.00, -1.00, 0.0],   # Middle MCP (9)
+    [-0.25, -0.92, 0.0],  # Ring MCP (13)
+    [-0.48, -0.80, 0.0],  # Pinky MCP (17)
+], dtype=np.float32)
+FINGER_DIRECTIONS = np.radians([50.0, 8.0, 0.0, -8.0, -16.0]).astype(np.float32)
+BONE_LENGTHS = np.array([
+    [0.45, 0.35, 0.30],
+    [0.45, 0.27, 0.22],
+    [0.50, 0.30, 0.24],
+    [0.46, 0.28, 0.22],
+    [0.36, 0.22, 0.20],
+], dtype=np.float32)
+# Fingers curl towards the camera (-z); the thumb also folds across the palm (-x).
+FLEX_NORMALS = np.array([
+    [-0.7, 0.0, -0.7],
+    [0.0, 0.0, -1.0],
+    [0.0, 0.0, -1.0],
+    [0.0, 0.0, -1.0],
+    [0.0, 0.0, -1.0],
+], dtype=np.float32)
+FLEX_NORMALS /= np.linalg.norm(FLEX_NORMALS, axis=1, keepdims=True)
+
+
+def hand_skeleton(flex, spread):
+    """
+    Forward kinematics for N hand poses.
+
+    flex: (N, 5, 3) joint flexion in radians, spread: (N, 5) abduction.
+    Returns (N, 21, 3) landmarks in hand units. Each bone is a fixed-length
+    step, so bone lengths are preserved whatever the pose.
+    """
+    n = flex.shape[0]
+    angle = FINGER_DIRECTIONS[None, :] + spread
+    # In-plane finger direction (N, 5, 3)
+    u = np.stack([np.sin(angle), -np.cos(angle), np.zeros_like(angle)], axis=-1)
+    # Flex direction orthogonal to u so every step has unit length
+    v = FLEX_NORMALS[None] - np.sum(FLEX_NORMALS[None] * u, axis=-1, keepdims=True) * u
+    v /= np.linalg.norm(v, axis=-1, keepdims=True)
+    cum = np.cumsum(flex, axis=2)[..., None]                    # (N, 5, 3, 1)
+    steps = np.cos(cum) * u[:, :, None, :] + np.sin(cum) * v[:, :, None, :]
+    joints = FINGER_BASES[None, :, None, :] + np.cumsum(BONE_LENGTHS[None, :, :, None] * steps, axis=2)
 
-def generate_sample(label):
-    sample_id = str(uuid.uuid4())
-    now = int(time.time() * 1000)
-    
-    frames = []
-    for i in range(FRAMES_PER_SAMPLE):
-        # Generate 21 landmarks
-        landmarks = [generate_random_landmark() for _ in range(21)]
-        
-        frame = {
-            "t": i * 33, # ~30fps
-            "score": 0.9 + random.random() * 0.1,
-            "landmarks": landmarks,
-            "features": {
-                "norm": landmarks, # In real app these are normalized, but for dummy data raw is fine
-                "angles": {}, # Optional
-                "fingerState": {} # Optional
-            }
-        }
-        frames.append(frame)
+    hands = np.zeros((n, 21, 3), dtype=np.float32)
+    fingers = np.concatenate([np.broadcast_to(FINGER_BASES[None, :, None, :], (n, 5, 1, 3)), joints], axis=2)
+    hands[:, 1:] = fingers.reshape(n, 20, 3)
+    return hands
 
+
+def pose_to_image(flex, spread, rotation, scale, translation):
+    """Place N skeletons in normalized image coordinates like MediaPipe output."""
+    hands = hand_skeleton(flex, spread)
+    rotated = hands @ rotation_matrices(rotation).astype(np.float32).transpose(0, 2, 1)
+    return (rotated * scale[:, None, None] + translation[:, None, :]).astype(np.float32)
+
+
+def class_prototypes(rng, num_classes):
+    """
+    Per-class handshape (and for dynamic signs, a second keypose and a motion
+    path), so samples of one class look alike and classes are separable.
+    """
     return {
-        "id": sample_id,
-        "label": label,
-        "type": "static",
-        "handedness": "Right",
-        "frames": frames,
-        "summary": {
-            "durationMs": FRAMES_PER_SAMPLE * 33
-        },
-        "timestamp": now
+        'flex_a': rng.uniform(0.0, 1.5, (num_classes, 5, 3)),
+        'flex_b': rng.uniform(0.0, 1.5, (num_classes, 5, 3)),
+        'spread_a': rng.uniform(-0.15, 0.15, (num_classes, 5)),
+        'spread_b': rng.uniform(-0.15, 0.15, (num_classes, 5)),
+        'rotation': rng.uniform(-0.4, 0.4, (num_classes, 3)),
+        'motion_amp': rng.uniform(0.02, 0.12, (num_classes, 2)),
+        'motion_freq': rng.uniform(0.5, 2.0, (num_classes, 2)),
     }
 
+
+def generate_chunk(rng, protos, labels, dynamic, lengths, noise=0.002):
+    """
+    Generate landmarks for a chunk of samples in one vectorized pass.
+
+    Static samples hold a jittered class pose; dynamic samples blend from the
+    class's first keypose to its second with a smoothstep while the wrist
+    follows a smooth sinusoidal path. Returns (landmarks (F, 21, 3), t (F,)).
+    """
+    s = len(labels)
+    # Per-sample variation around the class prototype
+    flex_a = protos['flex_a'][labels] + rng.normal(0, 0.08, (s, 5, 3))
+    flex_b = protos['flex_b'][labels] + rng.normal(0, 0.08, (s, 5, 3))
+    spread_a = protos['spread_a'][labels] + rng.normal(0, 0.03, (s, 5))
+    spread_b = protos['spread_b'][labels] + rng.normal(0, 0.03, (s, 5))
+    rotation = protos['rotation'][labels] + rng.normal(0, 0.15, (s, 3))
+    scale = rng.uniform(0.10, 0.20, s)
+    origin = np.stack([rng.uniform(0.3, 0.7, s), rng.uniform(0.55, 0.85, s), np.zeros(s)], axis=-1)
+    phase = rng.uniform(0, 2 * np.pi, (s, 2))
+
+    # Expand to frames
+    sample_idx = np.repeat(np.arange(s), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    frame_idx = np.arange(sample_idx.size) - starts
+    progress = frame_idx / np.maximum(lengths[sample_idx] - 1, 1)
+    w = np.where(dynamic[sample_idx], progress * progress * (3 - 2 * progress), 0.0)
+
+    flex = (1 - w)[:, None, None] * flex_a[sample_idx] + w[:, None, None] * flex_b[sample_idx]
+    spread = (1 - w)[:, None] * spread_a[sample_idx] + w[:, None] * spread_b[sample_idx]
+
+    lab = labels[sample_idx]
+    wave = np.sin(2 * np.pi * protos['motion_freq'][lab] * progress[:, None] + phase[sample_idx])
+    path = np.where(dynamic[sample_idx][:, None], protos['motion_amp'][lab] * wave, 0.0)
+    translation = origin[sample_idx] + np.concatenate([path, np.zeros((path.shape[0], 1))], axis=1)
+
+    landmarks = pose_to_image(flex, spread, rotation[sample_idx], scale[sample_idx], translation)
+    landmarks += rng.normal(0, noise, landmarks.shape).astype(np.float32)
+    return landmarks, (frame_idx * FRAME_MS).astype(np.int32)
+
+
+def plan_samples(rng, num_classes, samples_per_class, frames, frames_jitter, sample_type):
+    labels = np.repeat(np.arange(num_classes, dtype=np.int32), samples_per_class)
+    if sample_type == 'mixed':
+        dynamic = rng.random(labels.size) < 0.5
+    else:
+        dynamic = np.full(labels.size, sample_type == 'dynamic')
+    lengths = frames + rng.integers(-frames_jitter, frames_jitter + 1, labels.size)
+    return labels, dynamic, np.maximum(lengths, 1)
+
+
+def iter_chunks(rng, protos, labels, dynamic, lengths, chunk_samples=CHUNK_SAMPLES):
+    for start in range(0, labels.size, chunk_samples):
+        sl = slice(start, start + chunk_samples)
+        landmarks, t = generate_chunk(rng, protos, labels[sl], dynamic[sl], lengths[sl])
+        score = (0.9 + rng.random(t.size) * 0.1).astype(np.float32)
+        yield sl, landmarks, t, score
+
+
+def _points(arr):
+    return [{"x": p[0], "y": p[1], "z": p[2]} for p in arr]
+
+
+def write_json(path, rng, protos, classes, labels, dynamic, lengths, meta):
+    """
+    Stream samples into the capture Dataset JSON one chunk at a time, so
+    memory stays bounded by the chunk size rather than the dataset size.
+    """
+    with open(path, 'w') as f:
+        f.write('{"meta":' + json.dumps(meta) + ',"samples":[')
+        first = True
+        for sl, landmarks, t, score in iter_chunks(rng, protos, labels, dynamic, lengths):
+            raw = np.round(landmarks, 6).tolist()
+            features = extract_features(landmarks)
+            norm = np.round(features['norm'], 6).tolist()
+            angles = capture_angles(features['angles'])
+            finger_state = capture_finger_states(features['extended'])
+            t, score = t.tolist(), np.round(score, 4).tolist()
+            offset = 0
+            for label, is_dynamic, length in zip(labels[sl], dynamic[sl], lengths[sl]):
+                frames = []
+                for i in range(offset, offset + length):
+                    frames.append({
+                        "t": t[i],
+                        "score": score[i],
+                        "landmarks": _points(raw[i]),
+                        "features": {
+                            "norm": _points(norm[i]),
+                            "angles": angles[i],
+                            "fingerState": finger_state[i]
+                        }
+                    })
+                offset += length
+                sample = {
+                    "id": str(uuid.UUID(bytes=rng.bytes(16), version=4)),
+                    "label": classes[label],
+                    "type": SAMPLE_TYPES[int(is_dynamic)],
+                    "handedness": "Right",
+                    "frames": frames,
+                    "summary": {
+                        "durationMs": int(length) * FRAME_MS
+                    },
+                    "timestamp": TIMESTAMP
+                }
+                f.write(('' if first else ',') + json.dumps(sample, separators=(',', ':')))
+                first = False
+        f.write(']}\n')
+
+
+def write_npz(path, rng, protos, classes, labels, dynamic, lengths, meta):
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    all_landmarks = np.empty((offsets[-1], 21, 3), dtype=np.float32)
+    all_t = np.empty(offsets[-1], dtype=np.int32)
+    all_score = np.empty(offsets[-1], dtype=np.float32)
+    for sl, landmarks, t, score in iter_chunks(rng, protos, labels, dynamic, lengths):
+        frames = slice(offsets[sl.start], offsets[min(sl.stop, labels.size)])
+        all_landmarks[frames], all_t[frames], all_score[frames] = landmarks, t, score
+    write_binary_dataset(path, all_landmarks, all_t, all_score, offsets, labels,
+                         dynamic.astype(np.uint8), classes, meta)
+
+
 def main():
-    print(f"Generating dummy data for classes: {CLASSES}")
-    samples = []
-    
-    for label in CLASSES:
-        for _ in range(SAMPLES_PER_CLASS):
-            samples.append(generate_sample(label))
-            
-    dataset = {
-        "meta": {
-            "dataset": "dummy-validation-set",
-            "version": "1.0",
-            "createdAt": "2026-01-14T00:00:00.000Z",
-            "fps": 30,
-            "notes": "Generated by generate_dummy_data.py"
-        },
-        "samples": samples
+    parser = argparse.ArgumentParser(description='Generate synthetic hand landmark datasets')
+    parser.add_argument('--output', type=str, default=OUTPUT_FILE, help='Output path (.json or .npz)')
+    parser.add_argument('--format', type=str, default=None, choices=['json', 'npz'], help='Output format (default from extension)')
+    parser.add_argument('--classes', type=str, default=','.join(CLASSES), help='Comma separated class names')
+    parser.add_argument('--num_classes', type=int, default=None, help='Generate CLASS_000.. names instead of --classes')
+    parser.add_argument('--samples_per_class', type=int, default=SAMPLES_PER_CLASS, help='Samples per class')
+    parser.add_argument('--frames', type=int, default=FRAMES_PER_SAMPLE, help='Frames per sample')
+    parser.add_argument('--frames_jitter', type=int, default=0, help='Vary sample length by up to +/- this many frames')
+    parser.add_argument('--type', type=str, default='static', choices=['static', 'dynamic', 'mixed'], help='Sample type')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    if args.num_classes:
+        classes = [f"CLASS_{i:03d}" for i in range(args.num_classes)]
+    else:
+        classes = [c.strip() for c in args.classes.split(',') if c.strip()]
+    fmt = args.format or ('npz' if args.output.endswith('.npz') else 'json')
+
+    rng = np.random.default_rng(args.seed)
+    protos = class_prototypes(rng, len(classes))
+    labels, dynamic, lengths = plan_samples(rng, len(classes), args.samples_per_class,
+                                            args.frames, args.frames_jitter, args.type)
+
+    print(f"Generating {labels.size} {args.type} samples ({int(lengths.sum())} frames) "
+          f"for {len(classes)} classes: {classes[:5]}{'...' if len(classes) > 5 else ''}")
+
+    meta = {
+        "dataset": "dummy-validation-set",
+        "version": "1.0",
+        "createdAt": CREATED_AT,
+        "fps": 30,
+        "notes": f"Generated by generate_dummy_data.py (seed={args.seed})"
     }
-    
-    # Save to root (where app expects it or where training script expects it?)
+
     # train_static.py expects '../capture_data.json' relative to its location in ml_pipeline/
-    # effectively matching the project root.
-    
-    output_path = OUTPUT_FILE
-    # If running from root, it goes to capture_data.json
-    
-    with open(output_path, 'w') as f:
-        json.dump(dataset, f, indent=2)
-        
-    print(f"Successfully generated {len(samples)} samples to {output_path}")
+    # effectively matching the project root. If running from root, it goes to capture_data.json
+    if fmt == 'npz':
+        write_npz(args.output, rng, protos, classes, labels, dynamic, lengths, meta)
+    else:
+        write_json(args.output, rng, protos, classes, labels, dynamic, lengths, meta)
+
+    print(f"Successfully generated {labels.size} samples to {args.output}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,112 @@
+import numpy as np
+from utils_landmarks import normalize_landmarks_array
+
+# Landmark indices, as in src/features/HandFeatures.ts
+WRIST = 0
+THUMB_MCP, THUMB_IP, THUMB_TIP = 2, 3, 4
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+PINKY_MCP = 17
+
+FINGER_NAMES = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
+# Wrist plus the four points of each finger; angles are taken at the three inner joints
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20],
+])
+# (mcp, pip, tip) used for the curl score of the four fingers
+FINGER_CURL_POINTS = np.array([
+    [5, 6, 8],
+    [9, 10, 12],
+    [13, 14, 16],
+    [17, 18, 20],
+])
+
+THUMB_EXTENDED_ANGLE = 150
+CURL_RANGE = 130  # PIP angle 180 (straight) -> 0, 50 -> 1
+CURL_CURLED = 0.4
+CURL_EXTENDED = 0.3
+
+
+def joint_angles(a, b, c):
+    """
+    Angle at b in degrees between b->a and b->c, broadcast over leading axes.
+    Zero-length vectors count as fully folded (0 degrees) instead of NaN.
+    """
+    v1 = a - b
+    v2 = c - b
+    dot = np.sum(v1 * v2, axis=-1)
+    mags = np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1)
+    cos = np.divide(dot, mags, out=np.ones_like(dot), where=mags > 0)
+    return np.degrees(np.arccos(np.clip(cos, -1, 1)))
+
+
+def palm_normals(norm):
+    """Unit normal of the wrist / index MCP / pinky MCP plane, zero for degenerate hands."""
+    v1 = norm[..., INDEX_MCP, :] - norm[..., WRIST, :]
+    v2 = norm[..., PINKY_MCP, :] - norm[..., WRIST, :]
+    n = np.cross(v1, v2)
+    mag = np.linalg.norm(n, axis=-1, keepdims=True)
+    return np.divide(n, mag, out=np.zeros_like(n), where=mag > 0)
+
+
+def finger_states(norm):
+    """
+    (extended, curl) for the five fingers, each shaped (..., 5), with the
+    same heuristics as HandFeatures.computeFingerStates.
+    """
+    thumb_angle = joint_angles(norm[..., THUMB_MCP, :], norm[..., THUMB_IP, :], norm[..., THUMB_TIP, :])
+    thumb_curl = 1 - np.minimum(thumb_angle, 180) / 180
+    thumb_extended = thumb_angle > THUMB_EXTENDED_ANGLE
+
+    mcp, pip, tip = (norm[..., FINGER_CURL_POINTS[:, i], :] for i in range(3))
+    angle = joint_angles(mcp, pip, tip)
+    curl = np.clip((180 - angle) / CURL_RANGE, 0, 1)
+    # Tip further from the wrist than the PIP, overridden by a clear curl score
+    extended = np.linalg.norm(tip, axis=-1) > np.linalg.norm(pip, axis=-1)
+    extended = np.where(curl > CURL_CURLED, False, np.where(curl < CURL_EXTENDED, True, extended))
+
+    curl = np.concatenate([thumb_curl[..., None], curl], axis=-1)
+    extended = np.concatenate([thumb_extended[..., None], extended], axis=-1)
+    return extended, curl
+
+
+def extract_features(landmarks):
+    """
+    HandFeatures.extract over a (..., 21, 3) array in one call.
+
+    Returns a dict of arrays: norm (..., 21, 3), hand_scale (...),
+    angles (..., 5, 3) in degrees at the three joints of each finger,
+    curl (..., 5), extended (..., 5) and palm_normal (..., 3).
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    norm = normalize_landmarks_array(landmarks)
+    hand_scale = np.linalg.norm(landmarks[..., MIDDLE_MCP, :] - landmarks[..., WRIST, :], axis=-1)
+
+    chains = norm[..., FINGER_CHAINS, :]  # (..., 5, 5, 3)
+    angles = joint_angles(chains[..., :-2, :], chains[..., 1:-1, :], chains[..., 2:, :])
+    extended, curl = finger_states(norm)
+
+    return {
+        'norm': norm,
+        'hand_scale': hand_scale,
+        'angles': angles,
+        'curl': curl,
+        'extended': extended,
+        'palm_normal': palm_normals(norm),
+    }
+
+
+def capture_angles(angles, ndigits=2):
+    """Per-frame 'angles' records for the capture format: {finger: [mcp, pip, dip]}."""
+    rounded = np.round(np.asarray(angles, dtype=np.float64), ndigits).tolist()
+    return [dict(zip(FINGER_NAMES, frame)) for frame in rounded]
+
+
+def capture_finger_states(extended):
+    """Per-frame 'fingerState' records, as written by CaptureController.serializeFeatures."""
+    words = np.where(extended, 'extended', 'curled').tolist()
+    return [dict(zip(FINGER_NAMES, frame)) for frame in words]
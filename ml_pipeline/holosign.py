@@ -0,0 +1,143 @@
+import builtins
+import importlib
+import os
+import sys
+import time
+
+# Subcommand -> (module whose main() runs it, summary). Modules are only
+# imported once their command is chosen, so `holosign --help` and the light
+# commands never load TensorFlow, mediapipe, ultralytics or yt_dlp.
+COMMANDS = {
+    'analyze': ('analyze_msasl', 'Rank MS-ASL signs into top_100_signs.json'),
+    'extract': ('extract_msasl', 'One-pass MS-ASL extraction into shard, YOLO and capture outputs'),
+    'prepare-yolo': ('prepare_mass_yolo', 'Build the YOLO dataset from sharded MS-ASL data'),
+    'train': {
+        'static': ('train_static', 'Train the static (single frame) model'),
+        'dynamic': ('train_dynamic', 'Train the dynamic (30 frame window) model'),
+        'yolo': ('train_yolo', 'Train the YOLOv8 detector'),
+    },
+    'validate': ('validate_dataset', 'Check a dataset for broken frames and samples'),
+    'evaluate': ('evaluate', 'Evaluate the static and dynamic models'),
+    'export': ('export_yolo', 'Export the YOLO model to TensorFlow.js'),
+    'export-static': ('numpy_mlp', 'Export the static model to NumPy for TensorFlow-free inference'),
+    'merge-shards': ('work_shards', 'Merge the sharded_data roots of a multi-machine extraction'),
+    'sweep': ('sweep', 'Parallel hyperparameter sweep'),
+    'serve': ('inference_server', 'Local micro-batching inference server'),
+    'stream': ('streaming_recognizer', 'Recognize dynamic signs in a continuous landmark stream'),
+    'detect-videos': ('yolo_infer', 'Batched YOLO detection over local videos'),
+    'validate-detection': ('detection', 'Compare landmarks at full and reduced detection resolution'),
+    'generate': ('generate_dummy_data', 'Generate synthetic hand landmark datasets'),
+    'compact': ('compact_jsonl', 'Compact a JSONL dataset into Dataset JSON'),
+}
+
+# Packages worth reporting in --import-times
+HEAVY_PACKAGES = ('tensorflow', 'keras', 'sklearn', 'mediapipe', 'ultralytics', 'torch', 'yt_dlp',
+                  'cv2', 'matplotlib', 'seaborn')
+
+
+class ImportTimer:
+    """
+    Times the first import of each watched top-level package while active,
+    by wrapping builtins.__import__. Imports that happen inside another
+    watched import are recorded with that parent (their time is included
+    in the parent's).
+    """
+
+    def __init__(self, packages=HEAVY_PACKAGES):
+        self.packages = set(packages)
+        self.times = {}  # package -> (seconds, parent or None), in import order
+        self._stack = []
+        self._original = None
+
+    def __enter__(self):
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        builtins.__import__ = self._original
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        top = name.partition('.')[0]
+        if level or top not in self.packages or top in sys.modules or top in self.times:
+            return self._original(name, globals, locals, fromlist, level)
+        parent = self._stack[-1] if self._stack else None
+        self._stack.append(top)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            self._stack.pop()
+            self.times[top] = (time.perf_counter() - start, parent)
+
+    def report(self, timings):
+        """Print (label, seconds) pairs followed by the watched packages."""
+        print("\nImport times:", file=sys.stderr)
+        for label, seconds in timings:
+            print(f"  {label:<24}{seconds * 1000:>10.1f} ms", file=sys.stderr)
+        for package, (seconds, parent) in self.times.items():
+            note = f"  (inside {parent})" if parent else ''
+            print(f"  {package:<24}{seconds * 1000:>10.1f} ms{note}", file=sys.stderr)
+        if not self.times:
+            print("  no heavy packages imported", file=sys.stderr)
+
+
+def print_usage(group=None, prefix='holosign'):
+    commands = COMMANDS if group is None else COMMANDS[group]
+    usage = f"{prefix} [--import-times] <command> [args...]" if group is None else f"{prefix} <kind> [args...]"
+    print(f"usage: {usage}\n\ncommands:")
+    for name, entry in commands.items():
+        summary = entry[1] if isinstance(entry, tuple) else ' | '.join(entry)
+        print(f"  {name:<20}{summary}")
+    print(f"\nRun '{prefix} <command> --help' for the options of a command.")
+
+
+def resolve(argv):
+    """(module name, program name for its help, remaining args), or None with usage printed."""
+    words = ['holosign']
+    commands = COMMANDS
+    group = None
+    while argv and argv[0] in commands:
+        entry = commands[argv[0]]
+        words.append(argv[0])
+        argv = argv[1:]
+        if isinstance(entry, tuple):
+            return entry[0], ' '.join(words), argv
+        group, commands = words[-1], entry
+    if argv and not argv[0].startswith('-'):
+        print(f"holosign: unknown command '{' '.join(words[1:] + argv[:1])}'\n", file=sys.stderr)
+    print_usage(group, ' '.join(words))
+    return None
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    show_imports = '--import-times' in argv[:1] or bool(os.environ.get('HOLOSIGN_IMPORT_TIMES'))
+    if argv[:1] == ['--import-times']:
+        argv = argv[1:]
+
+    resolved = resolve(argv)
+    if resolved is None:
+        return 0 if argv[-1:] in (['-h'], ['--help']) else 2
+    module_name, prog, args = resolved
+
+    timer = ImportTimer()
+    timings = []
+    # Script-relative imports (from utils_landmarks import ...) resolve here
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.argv = [prog] + args
+    try:
+        with timer:
+            start = time.perf_counter()
+            module = importlib.import_module(module_name)
+            timings.append((f"{module_name} (module)", time.perf_counter() - start))
+            module.main()
+    finally:
+        timings.append(('total run', time.perf_counter() - start))
+        if show_imports:
+            timer.report(timings)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
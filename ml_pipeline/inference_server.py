@@ -0,0 +1,363 @@
+import asyncio
+import json
+import os
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils_landmarks import normalize_landmarks_array
+import numpy_mlp
+
+# Configuration
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+STATIC_MODEL_DIR = 'static_model'
+DYNAMIC_MODEL_DIR = 'dynamic_model'
+VECTOR_SIZE = 63
+WINDOW_SIZE = 30  # Must match train_dynamic.py
+MAX_BATCH = 64
+MAX_WAIT_MS = 5.0
+LATENCY_WINDOW = 2048  # recent requests kept for percentiles
+MAX_BODY_BYTES = 1 << 20  # largest request body accepted
+TOP_K = 3
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests for one model into batches.
+
+    The first queued request opens a batch; it is run as soon as max_batch
+    requests are waiting or max_wait_ms has passed since it arrived,
+    whichever comes first. predict_fn gets a stacked (N, ...) array and runs
+    on a dedicated thread so the event loop keeps accepting requests.
+    """
+
+    def __init__(self, predict_fn, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self._queue = None
+        self._full = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, x):
+        """Queue one input and wait for its row of the batched prediction."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((x, future, time.perf_counter()))
+        if self._queue.qsize() >= self.max_batch - 1:
+            self._full.set()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            remaining = batch[0][2] + self.max_wait - time.perf_counter()
+            if remaining > 0 and self._queue.qsize() < self.max_batch - 1:
+                # Sleep until the deadline unless submit() fills the batch first;
+                # waiting on the event (not the queue) never drops an item
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            inputs = np.stack([x for x, _, _ in batch])
+            try:
+                outputs = await loop.run_in_executor(self._executor, self.predict_fn, inputs)
+            except Exception as e:
+                self.errors += len(batch)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            self.batches += 1
+            self.requests += len(batch)
+            self.batch_sizes.append(len(batch))
+            for (_, future, queued), row in zip(batch, outputs):
+                self.latencies.append(now - queued)
+                if not future.done():
+                    future.set_result(row)
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            'queue_depth': self.queue_depth,
+            'requests': self.requests,
+            'batches': self.batches,
+            'errors': self.errors,
+            'mean_batch': float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+
+def bucket_size(n, max_batch):
+    """Next power of two >= n (capped), so the model only ever sees a few batch shapes."""
+    size = 1
+    while size < n:
+        size *= 2
+    return min(size, max(max_batch, n))
+
+
+class KerasModel:
+    """A trained model.h5 + classes.json, predicting on padded power-of-two batches."""
+
+    def __init__(self, model_dir, input_shape, max_batch=MAX_BATCH):
+        import tensorflow as tf
+        self.model = tf.keras.models.load_model(os.path.join(model_dir, 'model.h5'))
+        classes_path = os.path.join(model_dir, 'classes.json')
+        if os.path.exists(classes_path):
+            with open(classes_path, 'r') as f:
+                self.classes = json.load(f)
+        else:
+            self.classes = [str(i) for i in range(self.model.output_shape[-1])]
+        self.input_shape = input_shape
+        self.max_batch = max_batch
+
+    def warmup(self):
+        size = 1
+        while size <= self.max_batch:
+            self.predict(np.zeros((size,) + self.input_shape, dtype=np.float32))
+            size *= 2
+
+    def predict(self, batch):
+        n = len(batch)
+        padded = np.zeros((bucket_size(n, self.max_batch),) + self.input_shape, dtype=np.float32)
+        padded[:n] = batch
+        return np.asarray(self.model.predict_on_batch(padded))[:n]
+
+
+def parse_static(body):
+    """A 63-value normalized vector, or 21 raw {x,y,z} landmarks to normalize here."""
+    if 'vector' in body:
+        x = np.asarray(body['vector'], dtype=np.float32)
+    elif 'landmarks' in body:
+        points = np.array([[lm['x'], lm['y'], lm['z']] for lm in body['landmarks']], dtype=np.float32)
+        x = normalize_landmarks_array(points).reshape(-1)
+    else:
+        raise ValueError("expected 'vector' or 'landmarks'")
+    if x.shape != (VECTOR_SIZE,):
+        raise ValueError(f"expected {VECTOR_SIZE} values, got shape {list(x.shape)}")
+    return x
+
+
+def parse_dynamic(body):
+    """
+    A window of 63-value vectors, or of 21-landmark frames; padded with the
+    last frame or truncated to WINDOW_SIZE like train_dynamic.pad_sequence.
+    """
+    if 'window' in body:
+        x = np.asarray(body['window'], dtype=np.float32)
+    elif 'frames' in body:
+        points = np.array([[[lm['x'], lm['y'], lm['z']] for lm in frame] for frame in body['frames']],
+                          dtype=np.float32)
+        if points.ndim != 3:
+            raise ValueError("expected a list of 21-landmark frames")
+        x = normalize_landmarks_array(points).reshape(len(points), -1)
+    else:
+        raise ValueError("expected 'window' or 'frames'")
+    if x.ndim != 2 or x.shape[1] != VECTOR_SIZE or len(x) == 0:
+        raise ValueError(f"expected (frames, {VECTOR_SIZE}), got shape {list(x.shape)}")
+    if len(x) >= WINDOW_SIZE:
+        return x[:WINDOW_SIZE]
+    return np.concatenate([x, np.repeat(x[-1:], WINDOW_SIZE - len(x), axis=0)])
+
+
+PARSERS = {'static': parse_static, 'dynamic': parse_dynamic}
+
+
+def format_prediction(probs, classes, top_k=TOP_K):
+    order = np.argsort(probs)[::-1][:top_k]
+    return {
+        'label': classes[order[0]],
+        'confidence': float(probs[order[0]]),
+        'top': [{'label': classes[i], 'confidence': float(probs[i])} for i in order],
+    }
+
+
+class InferenceServer:
+    """
+    Minimal HTTP/1.1 front end (keep-alive, JSON bodies):
+
+      POST /predict/static   {"vector": [63]} or {"landmarks": [{x,y,z} x 21]}
+      POST /predict/dynamic  {"window": [[63], ...]} or {"frames": [[{x,y,z} x 21], ...]}
+      GET  /stats            queue depth, batch sizes and latency percentiles
+    """
+
+    def __init__(self, batchers, classes):
+        self.batchers = batchers
+        self.classes = classes
+        self.started = time.time()
+
+    async def start(self, host, port):
+        for batcher in self.batchers.values():
+            batcher.start()
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def stop(self):
+        for batcher in self.batchers.values():
+            await batcher.stop()
+
+    def stats(self):
+        return {
+            'uptime_s': time.time() - self.started,
+            'models': {kind: batcher.stats() for kind, batcher in self.batchers.items()},
+        }
+
+    async def route(self, method, path, body):
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats()
+        if method == 'POST' and path.startswith('/predict/'):
+            kind = path[len('/predict/'):]
+            if kind not in PARSERS:
+                return 404, {'error': f"unknown model '{kind}'"}
+            if kind not in self.batchers:
+                return 503, {'error': f"{kind} model not loaded"}
+            try:
+                x = PARSERS[kind](json.loads(body or b'{}'))
+            except (ValueError, KeyError, TypeError) as e:
+                return 400, {'error': str(e)}
+            probs = await self.batchers[kind].submit(x)
+            return 200, format_prediction(probs, self.classes[kind])
+        return 404, {'error': f"no route for {method} {path}"}
+
+    async def respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    # The body is left unread, so the connection cannot be reused
+                    status = 413 if length > MAX_BODY_BYTES else 400
+                    await self.respond(writer, status, {'error': f"invalid Content-Length: "
+                                                                 f"{headers.get('content-length')!r}"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, payload = await self.route(method, path, body)
+                except Exception as e:
+                    status, payload = 500, {'error': str(e)}
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    batchers, classes = {}, {}
+    for kind, model_dir, shape in (('static', args.static_model, (VECTOR_SIZE,)),
+                                   ('dynamic', args.dynamic_model, (WINDOW_SIZE, VECTOR_SIZE))):
+        use_numpy = kind == 'static' and not args.keras_static and numpy_mlp.is_current(model_dir)
+        if not use_numpy and not os.path.exists(os.path.join(model_dir, 'model.h5')):
+            print(f"No {kind} model at {model_dir}; /predict/{kind} will return 503")
+            continue
+        if use_numpy:
+            # Plain NumPy forward pass; no TensorFlow needed for this model
+            model = numpy_mlp.NumpyMLP.load(numpy_mlp.weights_path(model_dir))
+        else:
+            model = KerasModel(model_dir, shape, args.max_batch)
+            model.warmup()
+        batchers[kind] = MicroBatcher(model.predict, args.max_batch, args.max_wait_ms)
+        classes[kind] = model.classes
+        engine = 'numpy' if use_numpy else 'keras'
+        print(f"Loaded {kind} model from {model_dir} ({len(model.classes)} classes, {engine})")
+    if not batchers:
+        print("No models found.")
+        return
+
+    server = InferenceServer(batchers, classes)
+    tcp = await server.start(args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port} (max_batch={args.max_batch}, max_wait={args.max_wait_ms}ms)")
+    try:
+        async with tcp:
+            await tcp.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local micro-batching inference server for the static and dynamic models')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST, help='Address to bind')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to bind')
+    parser.add_argument('--static_model', type=str, default=STATIC_MODEL_DIR, help='Directory with model.h5 and classes.json')
+    parser.add_argument('--dynamic_model', type=str, default=DYNAMIC_MODEL_DIR, help='Directory with model.h5 and classes.json')
+    parser.add_argument('--max_batch', type=int, default=MAX_BATCH, help='Largest batch per model call')
+    parser.add_argument('--max_wait_ms', type=float, default=MAX_WAIT_MS, help='Longest a request waits for its batch to fill')
+    parser.add_argument('--threads', type=int, default=None, help='TensorFlow intra-op threads')
+    parser.add_argument('--keras_static', action='store_true',
+                        help='Serve the static model with Keras even when an up-to-date model.npz exists')
+    args = parser.parse_args()
+
+    if args.threads:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(args.threads)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == '__main__':
+    main()
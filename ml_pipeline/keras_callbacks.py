@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import time
+import numpy as np
+import tensorflow as tf
+
+# File names inside a checkpoint directory
+STATE_FILE = 'state.json'
+LAST_WEIGHTS = 'last.weights.h5'
+BEST_WEIGHTS = 'best.weights.h5'
+
+# Counters of the built-in callbacks that must survive a resume
+_TRACKED_ATTRS = ('wait', 'best', 'best_epoch', 'cooldown_counter')
+
+
+class TimeBudget(tf.keras.callbacks.Callback):
+    """Stops training once another epoch would no longer fit in max_seconds of wall-clock time."""
+
+    def __init__(self, max_seconds):
+        super().__init__()
+        self.max_seconds = max_seconds
+        self.stopped_epoch = None
+
+    def on_train_begin(self, logs=None):
+        self._start = time.perf_counter()
+        self._epochs = 0
+
+    def on_epoch_end(self, epoch, logs=None):
+        self._epochs += 1
+        elapsed = time.perf_counter() - self._start
+        if elapsed + elapsed / self._epochs > self.max_seconds:
+            self.stopped_epoch = epoch
+            self.model.stop_training = True
+            print(f"\nEpoch {epoch + 1}: time budget of {self.max_seconds / 60:.1f} min reached after {elapsed / 60:.1f} min")
+
+
+class Checkpointer(tf.keras.callbacks.Callback):
+    """
+    Keeps the best weights by `monitor` and restores them when training
+    ends, however it ends (schedule done, early stop, time budget).
+
+    With a directory, it also saves last.weights.h5 (model and optimizer,
+    so a reduced learning rate carries over) and state.json every `every`
+    epochs, and best.weights.h5 on each improvement. resume() loads them
+    back, including the counters of the `tracked` callbacks
+    (EarlyStopping, ReduceLROnPlateau), so an interrupted run continues
+    where it stopped. meta (e.g. the class list) must match to resume.
+    Must come after the tracked callbacks in the callback list.
+    """
+
+    def __init__(self, directory=None, every=1, monitor='val_loss', tracked=(), meta=None):
+        super().__init__()
+        self.directory = directory
+        self.every = every
+        self.monitor = monitor
+        self.tracked = list(tracked)
+        self.meta = meta
+        self.best = np.inf
+        self.best_epoch = None
+        self.best_weights = None
+        self._tracked_state = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def resume(self, model):
+        """Load the last checkpoint into model; returns the epoch to continue from (0 without one)."""
+        if not self.directory or not os.path.exists(self._path(STATE_FILE)):
+            return 0
+        with open(self._path(STATE_FILE), 'r') as f:
+            state = json.load(f)
+        if state.get('meta') != self.meta:
+            raise ValueError(f"Checkpoint in {self.directory} was made with different settings; remove it to start over")
+        if model.optimizer is not None and not model.optimizer.built:
+            model.optimizer.build(model.trainable_variables)
+        if os.path.exists(self._path(BEST_WEIGHTS)):
+            model.load_weights(self._path(BEST_WEIGHTS))
+            self.best_weights = model.get_weights()
+        model.load_weights(self._path(LAST_WEIGHTS))
+        self.best, self.best_epoch = state['best'], state['best_epoch']
+        self._tracked_state = state['tracked']
+        print(f"Resuming after epoch {state['epoch'] + 1} from {self.directory}")
+        return state['epoch'] + 1
+
+    def on_train_begin(self, logs=None):
+        # The tracked callbacks reset themselves in their own on_train_begin
+        if self._tracked_state:
+            for callback, values in zip(self.tracked, self._tracked_state):
+                for attr, value in values.items():
+                    setattr(callback, attr, value)
+
+    def on_epoch_end(self, epoch, logs=None):
+        current = (logs or {}).get(self.monitor)
+        if current is not None and current < self.best:
+            self.best, self.best_epoch = float(current), epoch
+            self.best_weights = self.model.get_weights()
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                self.model.save_weights(self._path(BEST_WEIGHTS))
+        if self.directory and (epoch + 1) % self.every == 0:
+            self._save(epoch)
+
+    def _save(self, epoch):
+        os.makedirs(self.directory, exist_ok=True)
+        self.model.save_weights(self._path(LAST_WEIGHTS))
+        tracked = [{attr: _plain(getattr(callback, attr)) for attr in _TRACKED_ATTRS if hasattr(callback, attr)}
+                   for callback in self.tracked]
+        state = {'epoch': epoch, 'best': self.best, 'best_epoch': self.best_epoch, 'meta': self.meta,
+                 'tracked': tracked}
+        # Written last and atomically: a state file always matches complete weights
+        tmp_path = self._path(STATE_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._path(STATE_FILE))
+
+    def on_train_end(self, logs=None):
+        if self.best_weights is not None:
+            self.model.set_weights(self.best_weights)
+            print(f"Restored the best weights from epoch {self.best_epoch + 1} ({self.monitor} {self.best:.4f})")
+
+    def finish(self):
+        """Remove the checkpoints once training has completed."""
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _plain(value):
+    """JSON-friendly copy of a callback counter (numpy scalars, inf)."""
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return float(value)
@@ -0,0 +1,153 @@
+import json
+import os
+import argparse
+import time
+import numpy as np
+
+# Configuration
+DEFAULT_MODEL_DIR = 'static_model'
+WEIGHTS_FILE = 'model.npz'
+CHECK_SAMPLES = 256
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _softmax(x):
+    x -= x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': _relu,
+    'softmax': _softmax,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+}
+
+
+def export_mlp(model, path, classes=None):
+    """
+    Save the Dense layers of a Keras MLP (like train_static.create_model)
+    as float32 kernel_i / bias_i arrays plus activation names and classes.
+    Dropout is an identity at inference and is skipped; any other layer
+    type raises ValueError, since the NumPy forward pass would not match.
+    """
+    arrays, activations = {}, []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in ('Dropout', 'InputLayer'):
+            continue
+        if kind != 'Dense':
+            raise ValueError(f"Cannot export {kind} layer '{layer.name}'; only Dense and Dropout are supported")
+        activation = layer.activation.__name__
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation '{activation}' in layer '{layer.name}'")
+        kernel, bias = layer.get_weights()
+        arrays[f"kernel_{len(activations)}"] = kernel.astype(np.float32)
+        arrays[f"bias_{len(activations)}"] = bias.astype(np.float32)
+        activations.append(activation)
+    if not activations:
+        raise ValueError("Model has no Dense layers")
+    if classes is None:
+        classes = [str(i) for i in range(arrays[f"kernel_{len(activations) - 1}"].shape[1])]
+    np.savez(path, activations=np.array(activations), classes=np.array([str(c) for c in classes]), **arrays)
+
+
+class NumpyMLP:
+    """
+    Forward pass of an exported MLP in plain NumPy: no TensorFlow import,
+    millisecond startup and microsecond batch-1 latency. predict() matches
+    Keras model.predict on the same weights to float32 rounding.
+    """
+
+    def __init__(self, kernels, biases, activations, classes):
+        self.kernels = [np.ascontiguousarray(k, dtype=np.float32) for k in kernels]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self.classes = list(classes)
+        self.input_size = self.kernels[0].shape[0]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            activations = data['activations'].tolist()
+            kernels = [data[f"kernel_{i}"] for i in range(len(activations))]
+            biases = [data[f"bias_{i}"] for i in range(len(activations))]
+            classes = data['classes'].tolist()
+        return cls(kernels, biases, activations, classes)
+
+    def predict(self, X):
+        """(N, input_size) or a single (input_size,) vector -> (N, classes) probabilities."""
+        x = np.asarray(X, dtype=np.float32).reshape(-1, self.input_size)
+        for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+            x = x @ kernel
+            x += bias
+            x = ACTIVATIONS[activation](x)
+        return x
+
+    __call__ = predict
+
+
+def weights_path(model_dir):
+    return os.path.join(model_dir, WEIGHTS_FILE)
+
+
+def is_current(model_dir):
+    """True when model_dir has an export at least as new as its model.h5."""
+    npz, h5 = weights_path(model_dir), os.path.join(model_dir, 'model.h5')
+    return os.path.exists(npz) and (not os.path.exists(h5) or os.path.getmtime(npz) >= os.path.getmtime(h5))
+
+
+def _batch1_us(predict, x, calls=200):
+    predict(x)
+    start = time.perf_counter()
+    for _ in range(calls):
+        predict(x)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the static model to a NumPy .npz for TensorFlow-free inference')
+    parser.add_argument('--model', type=str, default=DEFAULT_MODEL_DIR, help='Directory with model.h5 and classes.json')
+    parser.add_argument('--output', type=str, default=None, help=f"Output .npz (default <model>/{WEIGHTS_FILE})")
+    parser.add_argument('--check', type=int, default=CHECK_SAMPLES, help='Random inputs to compare against Keras (0 to skip)')
+    args = parser.parse_args()
+
+    h5 = os.path.join(args.model, 'model.h5')
+    if not os.path.exists(h5):
+        print(f"Model not found at {h5}")
+        return
+    output = args.output or weights_path(args.model)
+    import tensorflow as tf
+    model = tf.keras.models.load_model(h5)
+    classes = None
+    classes_path = os.path.join(args.model, 'classes.json')
+    if os.path.exists(classes_path):
+        with open(classes_path, 'r') as f:
+            classes = json.load(f)
+
+    export_mlp(model, output, classes)
+    mlp = NumpyMLP.load(output)
+    print(f"Exported {' -> '.join(str(k.shape[0]) for k in mlp.kernels)} -> {mlp.kernels[-1].shape[1]} "
+          f"({os.path.getsize(output) / 1024:.1f} KB) to {output}")
+
+    if args.check:
+        X = np.random.default_rng(0).normal(size=(args.check, mlp.input_size)).astype(np.float32)
+        diff = np.abs(mlp.predict(X) - model.predict(X, verbose=0)).max()
+        print(f"Max difference from Keras over {args.check} inputs: {diff:.2e}")
+        one = X[:1]
+        print(f"Batch-1 latency: numpy {_batch1_us(mlp.predict, one):.1f} us, "
+              f"keras predict_on_batch {_batch1_us(model.predict_on_batch, one, calls=20):.1f} us")
+
+
+if __name__ == '__main__':
+    main()
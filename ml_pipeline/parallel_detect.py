@@ -0,0 +1,287 @@
+import queue
+import time
+from collections import deque
+from multiprocessing import get_context, shared_memory
+import numpy as np
+import tracing
+from tracing import NULL_TRACER, Tracer
+from detection import create_detector, detect_hand
+
+# Configuration
+SLOTS_PER_WORKER = 3     # frames in flight per worker: one detecting, the rest queued
+RESULT_POLL_S = 1.0      # how often a waiting decoder checks that its workers are alive
+DRAIN_TIMEOUT_S = 30.0   # longest wait for in-flight results when an iteration is abandoned
+
+
+class FrameRing:
+    """
+    `slots` equally sized frame buffers in one SharedMemory block.
+
+    The decoder copies each frame into a free slot once; workers attach to
+    the block by name and read the frame in place, so only (slot, shape)
+    crosses the process boundary instead of a pickled frame.
+    """
+
+    def __init__(self, slots, slot_bytes, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(slots * slot_bytes, 1))
+        else:
+            # Spawned workers share the parent's resource tracker, so the
+            # owner's unlink() is the only cleanup needed (as in sweep.py)
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    @classmethod
+    def attach(cls, spec):
+        name, slots, slot_bytes = spec
+        return cls(slots, slot_bytes, name=name)
+
+    @property
+    def spec(self):
+        """What a worker needs to attach()."""
+        return (self.name, self.slots, self.slot_bytes)
+
+    def view(self, slot, shape, dtype=np.uint8):
+        """Zero-copy ndarray over a slot."""
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def put(self, slot, image):
+        if image.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {image.nbytes} bytes does not fit a {self.slot_bytes} byte slot")
+        self.view(slot, image.shape, image.dtype)[...] = image
+
+    def close(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes when it is collected
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker(tasks, results, detector_factory, detect, max_dim):
+    """Detector process: detect frames from the ring until a None task arrives."""
+    detector = detector_factory()
+    tracer = Tracer()
+    ring = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            spec, seq, slot, shape, dtype = task
+            if ring is None or ring.name != spec[0]:
+                if ring is not None:
+                    ring.close()
+                ring = FrameRing.attach(spec)
+            tracer.stages.clear()
+            try:
+                landmarks = detect(detector, ring.view(slot, shape, dtype), max_dim, tracer)
+            except Exception as e:
+                results.put((seq, None, {}, f"{type(e).__name__}: {e}"))
+                continue
+            results.put((seq, landmarks, {name: stage[1] for name, stage in tracer.stages.items()}, None))
+    finally:
+        if ring is not None:
+            ring.close()
+        if hasattr(detector, 'close'):
+            detector.close()
+
+
+class ParallelDetector:
+    """
+    Hand detection for the frames of one clip spread over worker processes.
+
+    The calling process decodes and copies each wanted frame into a
+    FrameRing slot; `workers` spawned processes, each with its own detector,
+    take (slot, shape) tasks and send back landmarks. detect() yields the
+    results in input order, so a long clip keeps every core busy while the
+    sinks still see frames in sequence. At most `slots` frames are in
+    flight, which bounds memory and makes the decoder wait for slow
+    detection. Workers live until close(), across clips.
+
+    detector_factory and detect must be picklable (module-level); they
+    default to detection.create_detector and detection.detect_hand.
+    Detection stages timed in the workers are added to tracer, so their
+    totals can exceed the wall time.
+    """
+
+    def __init__(self, workers, max_dim=None, slots=None, detector_factory=create_detector, detect=detect_hand,
+                 tracer=NULL_TRACER):
+        self.workers = workers
+        self.slots = slots or workers * SLOTS_PER_WORKER
+        self.tracer = tracer
+        self._ring = None
+        self._seq = 0
+        self._clip_start = 0
+        # spawn: mediapipe and TensorFlow are not fork-safe once initialized
+        ctx = get_context('spawn')
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._procs = [ctx.Process(target=_worker, args=(self._tasks, self._results, detector_factory, detect, max_dim),
+                                   daemon=True, name=f"detector-{i}")
+                       for i in range(workers)]
+        for proc in self._procs:
+            proc.start()
+
+    def detect(self, frames):
+        """
+        Yield (frame_idx, image, landmarks) for each (frame_idx, image) of
+        frames, in the same order. image is a view into the ring: it is
+        overwritten once the next result is requested, so copy it to keep it.
+        """
+        # Results with a lower seq belong to an earlier, abandoned iteration
+        self._clip_start = self._seq
+        order = deque()  # (seq, frame_idx, slot, shape, dtype) in input order
+        done = {}        # seq -> landmarks, for results that arrived early
+        free = list(range(self.slots)) if self._ring is not None else []
+        try:
+            for frame_idx, image in frames:
+                image = np.ascontiguousarray(image)
+                if self._ring is None or image.nbytes > self._ring.slot_bytes:
+                    # The ring is only reallocated with nothing in flight
+                    while order:
+                        yield from self._ready(order, done, free, block=True)
+                    self._resize(image.nbytes)
+                    free = list(range(self.slots))
+                while not free:
+                    yield from self._ready(order, done, free, block=True)
+                slot = free.pop()
+                self._ring.put(slot, image)
+                self._tasks.put((self._ring.spec, self._seq, slot, image.shape, image.dtype.str))
+                order.append((self._seq, frame_idx, slot, image.shape, image.dtype))
+                self._seq += 1
+                yield from self._ready(order, done, free, block=False)
+            while order:
+                yield from self._ready(order, done, free, block=True)
+        finally:
+            # An abandoned or failed iteration leaves frames in the workers;
+            # wait for them, within a bound, so the next clip starts clean
+            pending = {entry[0] for entry in order} - set(done)
+            deadline = time.monotonic() + DRAIN_TIMEOUT_S
+            while pending and time.monotonic() < deadline:
+                try:
+                    self._collect(done, deadline)
+                except RuntimeError:
+                    # Failed frames are recorded in done; a dead worker will send nothing more
+                    if not all(p.is_alive() for p in self._procs):
+                        break
+                pending -= set(done)
+
+    def _ready(self, order, done, free, block):
+        """Yield every result at the head of order; with block, wait for one first if none is there."""
+        if block and order[0][0] not in done:
+            self._collect(done)
+        while True:
+            try:
+                self._receive(self._results.get_nowait(), done)
+            except queue.Empty:
+                break
+        while order and order[0][0] in done:
+            seq, frame_idx, slot, shape, dtype = order.popleft()
+            yield frame_idx, self._ring.view(slot, shape, dtype), done.pop(seq)
+            free.append(slot)
+
+    def _collect(self, done, deadline=None):
+        """
+        Wait for the next result, or until deadline (time.monotonic()) when
+        given, in which case None is returned. Raises if a worker died or
+        detection failed.
+        """
+        while True:
+            timeout = RESULT_POLL_S if deadline is None else min(RESULT_POLL_S, deadline - time.monotonic())
+            if timeout <= 0:
+                return None
+            try:
+                result = self._results.get(timeout=timeout)
+                break
+            except queue.Empty:
+                dead = [p for p in self._procs if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Detector worker {dead[0].name} exited with code {dead[0].exitcode}")
+        return self._receive(result, done)
+
+    def _receive(self, result, done):
+        seq, landmarks, stages, error = result
+        if seq < self._clip_start:
+            return seq
+        if error is not None:
+            # Recorded first, so a drain after the raise does not wait for it
+            done[seq] = None
+            raise RuntimeError(f"Detection failed in a worker: {error}")
+        for name, seconds in stages.items():
+            self.tracer.add_span(name, seconds)
+        self.tracer.count(tracing.FRAMES_DETECTED)
+        if landmarks:
+            self.tracer.count(tracing.HANDS_FOUND)
+        done[seq] = landmarks
+        return seq
+
+    def _resize(self, slot_bytes):
+        if self._ring is not None:
+            self._ring.close()
+        self._ring = FrameRing(self.slots, slot_bytes)
+
+    def close(self):
+        for _ in self._procs:
+            self._tasks.put(None)
+        for proc in self._procs:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.terminate()
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def decoded_frames(cap, wants_frame, tracer=NULL_TRACER):
+    """
+    (frame_idx, image) for every frame of cap that wants_frame(frame_idx)
+    accepts; the others are grabbed but never converted to BGR.
+    """
+    frame_idx = 0
+    while cap.isOpened():
+        if not wants_frame(frame_idx):
+            with tracer.span(tracing.DECODE):
+                grabbed = cap.grab()
+            if not grabbed:
+                break
+            tracer.count(tracing.FRAMES_DECODED)
+            frame_idx += 1
+            continue
+
+        with tracer.span(tracing.DECODE):
+            success, image = cap.read()
+        if not success:
+            break
+        tracer.count(tracing.FRAMES_DECODED)
+        yield frame_idx, image
+        frame_idx += 1
+
+
+def detect_serial(detector, frames, max_dim=None, tracer=NULL_TRACER):
+    """In-process counterpart of ParallelDetector.detect()."""
+    for frame_idx, image in frames:
+        yield frame_idx, image, detect_hand(detector, image, max_dim, tracer)
+
+
+def add_parallel_args(parser):
+    parser.add_argument('--detect_workers', type=int, default=0,
+                        help='Detector processes fed through a shared-memory frame ring (0 detects in the decoding process)')
+
+
+def parallel_detector_from_args(args, tracer=NULL_TRACER):
+    """A ParallelDetector for --detect_workers, or None to detect in-process."""
+    if not args.detect_workers:
+        return None
+    return ParallelDetector(args.detect_workers, args.max_detect_dim, tracer=tracer)
@@ -1,8 +1,10 @@
 import json
 import os
+import argparse
 import shutil
 import cv2
 from utils_yolo import convert_to_yolo_format
+from frame_dedupe import add_dedupe_args, deduper_from_args
 
 # Configuration
 SHARDED_DIR = 'ml_pipeline/sharded_data'
@@ -10,6 +12,11 @@ YOLO_DATA_DIR = 'ml_pipeline/yolo_dataset'
 CLASSES_FILE = 'ml_pipeline/top_100_signs.json'
 
 def main():
+    parser = argparse.ArgumentParser(description='Build the YOLO dataset from sharded MS-ASL data')
+    add_dedupe_args(parser)
+    args = parser.parse_args()
+    deduper = deduper_from_args(args)
+
     if not os.path.exists(CLASSES_FILE):
         print(f"Classes file not found: {CLASSES_FILE}")
         return
@@ -55,6 +62,8 @@ def main():
                 # Check if it's sharded data from MS-ASL
                 # Usually it has 'frames' or is just a list of frames
                 frames = sample_data if isinstance(sample_data, list) else sample_data.get('frames', [])
+                if deduper is not None:
+                    deduper.begin_clip()
                 
                 for i, frame in enumerate(frames):
                     landmarks = frame.get('landmarks')
@@ -70,6 +79,11 @@ def main():
                     src_img_path = os.path.join(images_src_dir, f"{frame_name}.jpg")
                     
                     if os.path.exists(src_img_path):
+                        if deduper is not None:
+                            image = cv2.imread(src_img_path) if deduper.hash_threshold is not None else None
+                            if not deduper.keep(landmarks, image):
+                                continue
+
                         target_img_path = os.path.join(images_train_dir, f"{frame_name}.jpg")
                         target_lbl_path = os.path.join(labels_train_dir, f"{frame_name}.txt")
                         
@@ -100,6 +114,8 @@ names:
     print(f"\nConversion complete!")
     print(f"Total classes processed: {processed_classes}")
     print(f"Total frames in YOLO dataset: {total_frames}")
+    if deduper is not None:
+        print(deduper.report())
     print(f"Dataset YAML: {os.path.join(YOLO_DATA_DIR, 'dataset.yaml')}")
 
 if __name__ == '__main__':
@@ -1,7 +1,10 @@
-from ultralytics import YOLO
 import os
+import argparse
 
 def main():
+    parser = argparse.ArgumentParser(description='Download the pre-trained YOLOv8n weights')
+    parser.parse_args()
+    from ultralytics import YOLO
     print("Downloading pre-trained YOLOv8n model...")
     # This will download yolov8n.pt to the current directory if it doesn't exist
     model = YOLO('yolov8n.pt')
@@ -1,126 +1,47 @@
 import json
 import os
 import argparse
-import math
 import uuid
 import time
 import shutil
-import cv2
 import numpy as np
-
-# Try importing dependencies
-try:
-    import mediapipe as mp
-except ImportError:
-    print("Error: mediapipe not found. Please run: pip install -r requirements.txt")
-    exit(1)
-
-try:
-    import yt_dlp
-except ImportError:
-    print("Error: yt-dlp not found. Please run: pip install -r requirements.txt")
-    exit(1)
+from utils_landmarks import normalize_landmarks
+from dataset_io import JsonlSampleWriter, compact_jsonl, iter_jsonl
+import tracing
+from tracing import NULL_TRACER, tracer_from_args
+from detection import create_detector, detect_hand
+from fetch_scheduler import add_fetch_args, clean_url, open_clip, scheduler_from_args
+from work_shards import clip_key
 
 # Configuration
 MSASL_DIR = 'MS-ASL'
 OUTPUT_FILE = '../msasl_processed_data.json'
+OUTPUT_JSONL_FILE = '../msasl_processed_data.jsonl'
 TEMP_DIR = 'temp_videos'
 
-def normalize_landmarks(landmarks):
-    """
-    Replicates the normalization logic from src/features/HandFeatures.ts
-    Scale based on Wrist (0) to Middle MCP (9) distance.
-    Origin at Wrist.
-    """
-    wrist = landmarks[0]
-    middle_mcp = landmarks[9]
-    
-    dist = math.sqrt((wrist['x'] - middle_mcp['x'])**2 + 
-                     (wrist['y'] - middle_mcp['y'])**2 + 
-                     (wrist['z'] - middle_mcp['z'])**2)
-                     
-    if dist == 0: 
-        return landmarks 
-    
-    norm_landmarks = []
-    for lm in landmarks:
-        norm_landmarks.append({
-            'x': (lm['x'] - wrist['x']) / dist,
-            'y': (lm['y'] - wrist['y']) / dist,
-            'z': (lm['z'] - wrist['z']) / dist
-        })
-    return norm_landmarks
-
-def download_video_segment(url, start_time, end_time, output_path):
-    """
-    Downloads a specific segment of a YouTube video using yt-dlp.
-    """
-    # Create temp dir if not exists
-    if not os.path.exists(TEMP_DIR):
-        os.makedirs(TEMP_DIR)
-        
-    ydl_opts = {
-        'format': 'best[ext=mp4]',
-        'outtmpl': output_path,
-        'quiet': True,
-        'download_ranges': lambda info, ydl: [{'start_time': start_time, 'end_time': end_time}],
-        'force_keyframes_at_cuts': True, # Re-encode to ensure precise cuts
-    }
-    
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        return True
-    except Exception as e:
-        print(f"Failed to download {url}: {e}")
-        return False
-
-def process_video(video_path, label):
+def process_video(video_path, label, tracer=NULL_TRACER, max_detect_dim=None, segment=None):
     """
     Process video with MediaPipe Tasks API and return sample object.
+    Frames are downscaled to max_detect_dim before detection when it is set.
+    segment (start_time, end_time) limits processing to that part of the video.
     """
-    import mediapipe as mp
-    from mediapipe.tasks import python
-    from mediapipe.tasks.python import vision
+    detector = create_detector()
 
-    model_path = os.path.join(os.path.dirname(__file__), 'hand_landmarker.task')
-    base_options = python.BaseOptions(model_asset_path=model_path)
-    options = vision.HandLandmarkerOptions(
-        base_options=base_options,
-        num_hands=1,
-        min_hand_detection_confidence=0.5,
-        min_hand_presence_confidence=0.5,
-        min_tracking_confidence=0.5)
-    
-    detector = vision.HandLandmarker.create_from_options(options)
-
-    cap = cv2.VideoCapture(video_path)
+    cap = open_clip(video_path, segment)
     frames_data = []
     frame_idx = 0
     
     while cap.isOpened():
-        success, image = cap.read()
+        with tracer.span(tracing.DECODE):
+            success, image = cap.read()
         if not success:
             break
+        tracer.count(tracing.FRAMES_DECODED)
 
-        # Convert BGR to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Convert to MediaPipe Image
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
-        
-        # Detect
-        detection_result = detector.detect(mp_image)
+        # Detect (first hand only, as a list of dicts)
+        landmarks = detect_hand(detector, image, max_detect_dim, tracer)
 
-        if detection_result.hand_landmarks:
-            # Take the first hand found
-            hand_landmarks = detection_result.hand_landmarks[0]
-            
-            # Convert to list of dicts
-            landmarks = []
-            for lm in hand_landmarks:
-                landmarks.append({'x': lm.x, 'y': lm.y, 'z': lm.z})
-            
+        if landmarks:
             # Normalize
             norm_landmarks = normalize_landmarks(landmarks)
             
@@ -152,11 +73,40 @@ def process_video(video_path, label):
         "timestamp": int(time.time() * 1000)
     }
 
+def written_keys(jsonl_path):
+    """clip_key of every sample already in jsonl_path; each sample records its source clip."""
+    if not os.path.exists(jsonl_path):
+        return set()
+    return {clip_key(sample['source']) for _, sample in iter_jsonl(jsonl_path) if 'source' in sample}
+
 def main():
     parser = argparse.ArgumentParser(description='Process MS-ASL data')
     parser.add_argument('--limit', type=int, default=10, help='Limit number of samples to process')
     parser.add_argument('--subset', type=str, default='train', choices=['train', 'val', 'test'], help='Subset to process')
+    parser.add_argument('--output_format', type=str, default='json', choices=['json', 'jsonl'],
+                        help='jsonl keeps the streamed file; json compacts it into one Dataset JSON at the end')
+    parser.add_argument('--output', type=str, default=None, help='Output path (default depends on format)')
+    parser.add_argument('--append', action='store_true',
+                        help='Resume an existing JSONL output: keep its samples and skip the clips it already has')
+    parser.add_argument('--fsync', action='store_true', help='fsync after every sample (slower, survives power loss)')
+    parser.add_argument('--max_detect_dim', type=int, default=None, help='Downscale frames so the longer side is at most this before detection')
+    add_fetch_args(parser)
+    parser.add_argument('--trace', type=str, default=None, help='Write a Chrome trace-event JSON of all stages here')
     args = parser.parse_args()
+
+    # Checked here rather than at import so --help and the unified CLI stay fast
+    try:
+        import mediapipe
+    except ImportError:
+        print("Error: mediapipe not found. Please run: pip install -r requirements.txt")
+        exit(1)
+    if not args.local_videos:
+        try:
+            import yt_dlp
+        except ImportError:
+            print("Error: yt-dlp not found. Please run: pip install -r requirements.txt")
+            exit(1)
+    tracer = tracer_from_args(args.trace)
     
     input_file = os.path.join(MSASL_DIR, f'MSASL_{args.subset}.json')
     
@@ -170,61 +120,76 @@ def main():
         
     print(f"Found {len(data)} samples. Processing first {args.limit}...")
     
-    processed_samples = []
-    
-    # Load existing if file exists?
-    # For now, overwrite or append? Let's just create new list.
+    meta = {
+        "dataset": "msasl-processed",
+        "version": "1.0",
+        "createdAt": "2026-01-15T00:00:00.000Z",
+        "fps": 30,
+        "notes": f"Processed from {input_file}"
+    }
+
+    # Every sample is streamed to JSONL as soon as it is done, so memory
+    # stays flat and a crash only loses the clip in flight.
+    if args.output_format == 'jsonl':
+        output_file = args.output or OUTPUT_JSONL_FILE
+        jsonl_path = output_file
+    else:
+        output_file = args.output or OUTPUT_FILE
+        jsonl_path = output_file + '.partial.jsonl'
+    # The partial file only outlives a crashed run, so json mode always resumes it
+    resume = args.append or args.output_format == 'json'
+    done = written_keys(jsonl_path) if resume else set()
+    wanted = data[:args.limit]
+    todo = [item for item in wanted if clip_key(item) not in done]
+    if done:
+        print(f"Resuming {jsonl_path}: {len(wanted) - len(todo)} clips already extracted")
     
-    count = 0
-    for item in data:
-        if count >= args.limit:
-            break
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    jobs = ({'url': clean_url(item['url']), 'start_time': item['start_time'], 'end_time': item['end_time'],
+             'output_path': os.path.join(TEMP_DIR, f"{item['file']}.mp4"), 'label': item['clean_text']}
+            for item in todo)
+
+    # Downloads run ahead on the scheduler's pool while clips are processed here
+    scheduler = scheduler_from_args(args, tracer)
+    with JsonlSampleWriter(jsonl_path, meta, append=resume, fsync=args.fsync) as sample_writer:
+        for count, (job, result) in enumerate(scheduler.fetch_iter(jobs)):
+            url = job['url']
+            label_text = job['label'] # Use clean text as label
+            temp_vid_path = result.path
+
+            print(f"Processing [{count+1}/{len(todo)}]: {label_text} ({url})")
             
-        url = item['url']
-        start = item['start_time']
-        end = item['end_time']
-        label_text = item['clean_text'] # Use clean text as label
-        
-        # Clean up URL
-        if 'youtube.com' not in url and 'youtu.be' not in url:
-             url = f"https://www.youtube.com/watch?v={url}" if 'www' not in url else f"https://{url}"
-
-        print(f"Processing [{count+1}/{args.limit}]: {label_text} ({url})")
-        
-        temp_vid_path = os.path.join(TEMP_DIR, f"{item['file']}.mp4")
-        
-        # Download
-        if download_video_segment(url, start, end, temp_vid_path):
-            # Process
-            sample = process_video(temp_vid_path, label_text)
-            if sample:
-                processed_samples.append(sample)
-                print(f"  -> Success: {len(sample['frames'])} frames")
+            clip_start = tracer.snapshot()
+            if not result.ok:
+                print(f"  -> Failed to download {url} after {result.attempts} attempts: {result.error}")
             else:
-                print("  -> No hands detected")
-            
-            # Clean up temp file
-            if os.path.exists(temp_vid_path):
-                os.remove(temp_vid_path)
-        
-        count += 1
+                # Process
+                sample = process_video(temp_vid_path, label_text, tracer, args.max_detect_dim, result.segment)
+                if sample:
+                    sample['source'] = {key: job[key] for key in ('url', 'start_time', 'end_time')}
+                    with tracer.span(tracing.WRITE):
+                        sample_writer.write(sample)
+                    print(f"  -> Success: {len(sample['frames'])} frames | {tracer.format_summary(clip_start)}")
+                else:
+                    print("  -> No hands detected")
+                
+                # Clean up temp file
+                scheduler.release(result)
+    scheduler.close()
 
     # Save output
-    output_data = {
-        "meta": {
-            "dataset": "msasl-processed",
-            "version": "1.0",
-            "createdAt": "2026-01-15T00:00:00.000Z",
-            "fps": 30,
-            "notes": f"Processed from {input_file}"
-        },
-        "samples": processed_samples
-    }
-    
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    if args.output_format == 'json':
+        saved = compact_jsonl(jsonl_path, output_file)
+        os.remove(jsonl_path)
+    else:
+        saved = len(done) + sample_writer.count
         
-    print(f"Saved {len(processed_samples)} samples to {OUTPUT_FILE}")
+    print(f"Saved {saved} samples to {output_file}")
+    print(scheduler.report())
+    tracer.print_report()
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
     
     # Clean up temp dir
     if os.path.exists(TEMP_DIR):
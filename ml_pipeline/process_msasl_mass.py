@@ -4,103 +4,86 @@ import argparse
 import uuid
 import time
 import shutil
-import cv2
+from contextlib import closing
 import numpy as np
 from utils_yolo import convert_to_yolo_format
-
-# Try importing dependencies
-try:
-    import mediapipe as mp
-    from mediapipe.tasks import python
-    from mediapipe.tasks.python import vision
-except ImportError:
-    print("Error: mediapipe not found. Please run: pip install -r requirements.txt")
-    exit(1)
-
-try:
-    import yt_dlp
-except ImportError:
-    print("Error: yt-dlp not found. Please run: pip install -r requirements.txt")
-    exit(1)
+from shard_writer import ShardWriter
+from tracing import NULL_TRACER, tracer_from_args
+from detection import create_detector
+from parallel_detect import add_parallel_args, decoded_frames, detect_serial, parallel_detector_from_args
+from fetch_scheduler import add_fetch_args, clean_url, open_clip, scheduler_from_args
+from work_shards import (ManifestWriter, add_shard_args, check_shard_args, clip_key, default_output_root,
+                         read_manifest, select_shard, shard_meta)
 
 # Configuration
 MSASL_DIR = 'MS-ASL'
 SHARDED_DIR = 'sharded_data'
 TEMP_DIR = 'temp_videos_mass'
 
-def get_shard_path(label):
+def get_shard_path(label, sharded_dir=SHARDED_DIR):
     safe_label = "".join([c for c in label if c.isalnum() or c in (' ', '_')]).strip().replace(' ', '_')
-    return os.path.join(SHARDED_DIR, safe_label)
-
-def download_video_segment(url, start_time, end_time, output_path):
-    ydl_opts = {
-        'format': 'best[ext=mp4]',
-        'outtmpl': output_path,
-        'quiet': True,
-        'download_ranges': lambda info, ydl: [{'start_time': start_time, 'end_time': end_time}],
-        'force_keyframes_at_cuts': True,
-    }
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        return True
-    except Exception as e:
-        print(f"Failed to download {url}: {e}")
-        return False
-
-def process_video_to_shard(video_path, label, sample_id, detector):
+    return os.path.join(sharded_dir, safe_label)
+
+def sample_jobs(samples, temp_dir):
+    """Fetch jobs for MS-ASL samples, each under a fresh 8 character sample id."""
+    for item in samples:
+        sample_id = str(uuid.uuid4())[:8]
+        yield {'url': clean_url(item['url']), 'start_time': item['start_time'], 'end_time': item['end_time'],
+               'output_path': os.path.join(temp_dir, f"{sample_id}.mp4"), 'sample_id': sample_id}
+
+def process_video_to_shard(video_path, label, sample_id, detector, class_id=0, writer=None,
+                           tracer=NULL_TRACER, max_detect_dim=None, segment=None, sharded_dir=SHARDED_DIR,
+                           parallel=None):
     """
     Extract landmarks/yolo labels and save to shard.
+    class_id is the sign's index in top_100_signs.json. Images and the sample
+    JSON are handed to writer (a ShardWriter) so detection never waits on disk.
+    Each stage is timed on tracer (see tracing.py). Frames are downscaled to
+    max_detect_dim before detection when it is set. segment (start_time,
+    end_time) limits extraction to that part of the video. The sample is
+    written under sharded_dir/<label>. With parallel (a ParallelDetector)
+    the frames are detected in its worker processes instead of by detector.
     """
-    cap = cv2.VideoCapture(video_path)
+    own_writer = writer is None
+    if own_writer:
+        writer = ShardWriter()
+
+    cap = open_clip(video_path, segment)
     frames_data = []
     yolo_labels = []
-    frame_idx = 0
     
-    shard_dir = get_shard_path(label)
+    shard_dir = get_shard_path(label, sharded_dir)
     img_dir = os.path.join(shard_dir, 'images')
     os.makedirs(img_dir, exist_ok=True)
 
-    while cap.isOpened():
-        success, image = cap.read()
-        if not success:
-            break
-
-        # Extract landmarks every 3rd frame for balance
-        if frame_idx % 3 != 0:
-            frame_idx += 1
-            continue
-
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
-        detection_result = detector.detect(mp_image)
+    # Extract landmarks every 3rd frame for balance; the others are only grabbed
+    frames = decoded_frames(cap, lambda frame_idx: frame_idx % 3 == 0, tracer)
+    if parallel is not None:
+        detections = parallel.detect(frames)
+    else:
+        detections = detect_serial(detector, frames, max_detect_dim, tracer)
 
-        if detection_result.hand_landmarks:
-            hand_landmarks = detection_result.hand_landmarks[0]
-            landmarks = [{'x': lm.x, 'y': lm.y, 'z': lm.z} for lm in hand_landmarks]
-            
+    for frame_idx, image, landmarks in detections:
+        if landmarks:
             # 1. Landmark Data
             frames_data.append({
                 "t": frame_idx * 33,
                 "landmarks": landmarks
             })
             
-            # 2. YOLO Data (images + labels)
-            # Use label ID 0 for all since we shard by folder?
-            # Actually, YOLO training usually needs global IDs.
-            # But sharded landmarks are the primary goal for train_dynamic.
-            # For YOLO we will stick to the sharded structure for now.
-            yolo_label = convert_to_yolo_format(landmarks, 0) # Mock ID 0
+            # 2. YOLO Data (images + labels) with the global top-100 id
+            yolo_label = convert_to_yolo_format(landmarks, class_id)
             if yolo_label:
                 img_name = f"{sample_id}_{len(yolo_labels)}.jpg"
-                cv2.imwrite(os.path.join(img_dir, img_name), image)
+                # A ring slot is reused once the next frame is requested
+                writer.write_image(os.path.join(img_dir, img_name), image if parallel is None else image.copy())
                 yolo_labels.append(yolo_label)
-            
-        frame_idx += 1
 
     cap.release()
     
     if not frames_data:
+        if own_writer:
+            writer.close()
         return False
 
     # Save sharded landmarks JSON for this sample
@@ -112,8 +95,9 @@ def process_video_to_shard(video_path, label, sample_id, detector):
     }
     
     sample_path = os.path.join(shard_dir, f"{sample_id}.json")
-    with open(sample_path, 'w') as f:
-        json.dump(sample_json, f, indent=2)
+    writer.write_record(sample_path, sample_json)
+    if own_writer:
+        writer.close()
         
     return True
 
@@ -121,68 +105,136 @@ def main():
     parser = argparse.ArgumentParser(description='Mass process MS-ASL Top 100')
     parser.add_argument('--limit_signs', type=int, default=5, help='Limit number of signs to process')
     parser.add_argument('--samples_per_sign', type=int, default=10, help='Limit samples per sign')
+    parser.add_argument('--jpeg_workers', type=int, default=4, help='Threads encoding JPEGs in the background')
+    parser.add_argument('--jpeg_quality', type=int, default=95, help='JPEG quality for saved frames')
+    parser.add_argument('--precision', type=int, default=None, help='Round landmark floats to this many decimals')
+    parser.add_argument('--max_detect_dim', type=int, default=None, help='Downscale frames so the longer side is at most this before detection')
+    add_fetch_args(parser)
+    add_shard_args(parser)
+    add_parallel_args(parser)
+    parser.add_argument('--output_dir', type=str, default=None,
+                        help=f"Output root (default {SHARDED_DIR}, or {SHARDED_DIR}_<index>of<num> when sharded)")
+    parser.add_argument('--trace', type=str, default=None, help='Write a Chrome trace-event JSON of all stages here')
     args = parser.parse_args()
+    try:
+        check_shard_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    output_dir = args.output_dir or default_output_root(SHARDED_DIR, args)
+    # Shards on one machine must not share (and delete) each other's downloads
+    temp_dir = default_output_root(TEMP_DIR, args)
+
+    # Checked here rather than at import so --help and the unified CLI stay fast
+    try:
+        import mediapipe
+    except ImportError:
+        print("Error: mediapipe not found. Please run: pip install -r requirements.txt")
+        exit(1)
+    if not args.local_videos:
+        try:
+            import yt_dlp
+        except ImportError:
+            print("Error: yt-dlp not found. Please run: pip install -r requirements.txt")
+            exit(1)
+    tracer = tracer_from_args(args.trace)
 
     # Load targets
     signs_path = os.path.join(os.path.dirname(__file__), 'top_100_signs.json')
     with open(signs_path, 'r') as f:
-        target_signs = json.load(f)[:args.limit_signs]
+        all_signs = json.load(f)
+    class_to_id = {name: i for i, name in enumerate(all_signs)}
+    target_signs = all_signs[:args.limit_signs]
 
     # Load MS-ASL metadata
     msasl_path = os.path.join(os.path.dirname(__file__), MSASL_DIR, 'MSASL_train.json')
     with open(msasl_path, 'r') as f:
         all_samples = json.load(f)
+    if args.num_shards > 1:
+        total = len(all_samples)
+        all_samples = select_shard(all_samples, args.num_shards, args.shard_index)
+        print(f"Shard {args.shard_index} of {args.num_shards}: {len(all_samples)} of {total} clips")
+
+    # Clips a previous run of this shard already extracted are skipped
+    _, done = read_manifest(output_dir)
+    done_keys = {entry['key'] for entry in done}
+    try:
+        manifest = ManifestWriter(output_dir, shard_meta(args))
+    except ValueError as e:
+        print(f"Error: {e}. Pick another --output_dir.")
+        exit(1)
 
     # Initialize Detector
-    model_path = os.path.join(os.path.dirname(__file__), 'hand_landmarker.task')
-    base_options = python.BaseOptions(model_asset_path=model_path)
-    options = vision.HandLandmarkerOptions(
-        base_options=base_options,
-        num_hands=1,
-        min_hand_detection_confidence=0.5,
-        min_hand_presence_confidence=0.5,
-        min_tracking_confidence=0.5)
-    detector = vision.HandLandmarker.create_from_options(options)
-
-    print(f"Starting mass processing for {len(target_signs)} signs...")
+    parallel = parallel_detector_from_args(args, tracer)
+    detector = create_detector() if parallel is None else None
+    writer = ShardWriter(jpeg_workers=args.jpeg_workers,
+                         jpeg_quality=args.jpeg_quality,
+                         precision=args.precision,
+                         tracer=tracer)
+    scheduler = scheduler_from_args(args, tracer)
+    os.makedirs(temp_dir, exist_ok=True)
+
+    print(f"Starting mass processing for {len(target_signs)} signs into {output_dir}...")
 
     for sign in target_signs:
         print(f"\n--- Sign: {sign} ---")
-        shard_dir = get_shard_path(sign)
+        shard_dir = get_shard_path(sign, output_dir)
         os.makedirs(shard_dir, exist_ok=True)
         
         # Filter samples for this sign
         sign_samples = [s for s in all_samples if s['clean_text'] == sign]
         print(f"Found {len(sign_samples)} total samples. Processing up to {args.samples_per_sign}...")
         
-        count = 0
-        for item in sign_samples:
-            if count >= args.samples_per_sign:
-                break
-                
-            sample_id = str(uuid.uuid4())[:8]
-            url = item['url']
-            
-            if not os.path.exists(TEMP_DIR):
-                os.makedirs(TEMP_DIR)
-            temp_vid = os.path.join(TEMP_DIR, f"{sample_id}.mp4")
-            
-            if download_video_segment(url, item['start_time'], item['end_time'], temp_vid):
-                if process_video_to_shard(temp_vid, sign, sample_id, detector):
-                    print(f"  [{count+1}] Processed {sample_id}")
-                    count += 1
+        count = sum(1 for entry in done if entry['label'] == sign)
+        if count:
+            print(f"  {count} already extracted by a previous run")
+        sign_samples = [s for s in sign_samples if clip_key(s) not in done_keys]
+        extracted = []
+        # Only a few downloads run ahead, since the sign stops at samples_per_sign successes
+        prefetch = min(args.samples_per_sign, 2 * args.fetch_workers)
+        with closing(scheduler.fetch_iter(sample_jobs(sign_samples, temp_dir), prefetch)) as results:
+            for job, result in results:
+                if count >= args.samples_per_sign:
+                    break
+
+                sample_id = job['sample_id']
+                temp_vid = result.path
+                clip_start = tracer.snapshot()
+                if result.ok:
+                    if process_video_to_shard(temp_vid, sign, sample_id, detector, class_to_id[sign], writer, tracer,
+                                              args.max_detect_dim, result.segment, output_dir, parallel):
+                        print(f"  [{count+1}] Processed {sample_id}: {tracer.format_summary(clip_start)}")
+                        count += 1
+                        extracted.append({'id': sample_id, 'label': sign, 'class_id': class_to_id[sign],
+                                          'url': job['url'], 'start_time': job['start_time'],
+                                          'end_time': job['end_time'], 'key': clip_key(job)})
+                    else:
+                        print(f"  [{count+1}] No hands in {sample_id}")
+
+                    scheduler.release(result)
                 else:
-                    print(f"  [{count+1}] No hands in {sample_id}")
-                
-                if os.path.exists(temp_vid):
-                    os.remove(temp_vid)
-            else:
-                print(f"  [{count+1}] Failed to download {url}")
-
-    detector.close()
-    if os.path.exists(TEMP_DIR):
-        shutil.rmtree(TEMP_DIR)
+                    print(f"  [{count+1}] Failed to download {job['url']}: {result.error}")
+
+        # One durability point per shard instead of per file; the manifest
+        # only lists samples once they are on disk
+        writer.sync_shard(shard_dir)
+        for entry in extracted:
+            manifest.write(entry)
+
+    manifest.close()
+    scheduler.close()
+    writer.close()
+    if parallel is not None:
+        parallel.close()
+    else:
+        detector.close()
+    if os.path.exists(temp_dir):
+        shutil.rmtree(temp_dir)
     print("\nMass processing complete.")
+    print(scheduler.report())
+    tracer.print_report()
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
 
 if __name__ == '__main__':
     main()
@@ -4,63 +4,46 @@ import argparse
 import uuid
 import time
 import shutil
+from itertools import islice
 import cv2
 import numpy as np
 from utils_yolo import convert_to_yolo_format
-
-# Try importing dependencies
-try:
-    import mediapipe as mp
-    from mediapipe.tasks import python
-    from mediapipe.tasks.python import vision
-except ImportError:
-    print("Error: mediapipe not found. Please run: pip install -r requirements.txt")
-    exit(1)
-
-try:
-    import yt_dlp
-except ImportError:
-    print("Error: yt-dlp not found. Please run: pip install -r requirements.txt")
-    exit(1)
+import tracing
+from tracing import NULL_TRACER, tracer_from_args
+from detection import create_detector, detect_hand
+from frame_dedupe import add_dedupe_args, deduper_from_args
+from fetch_scheduler import add_fetch_args, clean_url, open_clip, scheduler_from_args
 
 # Configuration
 MSASL_DIR = 'MS-ASL'
 YOLO_DATA_DIR = 'yolo_dataset'
 TEMP_DIR = 'temp_videos'
 
-def download_video_segment(url, start_time, end_time, output_path):
-    # Same as process_msasl.py
-    ydl_opts = {
-        'format': 'best[ext=mp4]',
-        'outtmpl': output_path,
-        'quiet': True,
-        'download_ranges': lambda info, ydl: [{'start_time': start_time, 'end_time': end_time}],
-        'force_keyframes_at_cuts': True,
-    }
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        return True
-    except Exception as e:
-        print(f"Failed to download {url}: {e}")
-        return False
-
-def process_video_to_yolo(video_path, label_id, sample_id):
+def labeled_jobs(data, class_to_id):
+    """Fetch jobs for the samples whose label is a known class."""
+    for item in data:
+        label_id = class_to_id.get(item['clean_text'], -1)
+        if label_id == -1:
+            print(f"Skipping unknown label: {item['clean_text']}")
+            continue
+        sample_id = str(uuid.uuid4())[:8]
+        yield {'url': clean_url(item['url']), 'start_time': item['start_time'], 'end_time': item['end_time'],
+               'output_path': os.path.join(TEMP_DIR, f"{sample_id}.mp4"), 'sample_id': sample_id,
+               'label': item['clean_text'], 'label_id': label_id}
+
+def process_video_to_yolo(video_path, label_id, sample_id, tracer=NULL_TRACER, max_detect_dim=None,
+                          deduper=None, segment=None):
     """
     Extract frames and save them with YOLO labels.
+    Detection may run on a downscaled copy; the full frame is what gets saved.
+    Near-duplicate frames are skipped when a FrameDeduper is given. segment
+    (start_time, end_time) limits extraction to that part of the video.
     """
-    model_path = os.path.join(os.path.dirname(__file__), 'hand_landmarker.task')
-    base_options = python.BaseOptions(model_asset_path=model_path)
-    options = vision.HandLandmarkerOptions(
-        base_options=base_options,
-        num_hands=1,
-        min_hand_detection_confidence=0.5,
-        min_hand_presence_confidence=0.5,
-        min_tracking_confidence=0.5)
-    
-    detector = vision.HandLandmarker.create_from_options(options)
+    if deduper is not None:
+        deduper.begin_clip()
+    detector = create_detector()
 
-    cap = cv2.VideoCapture(video_path)
+    cap = open_clip(video_path, segment)
     frame_count = 0
     saved_frames = 0
     
@@ -71,33 +54,44 @@ def process_video_to_yolo(video_path, label_id, sample_id):
     os.makedirs(labels_dir, exist_ok=True)
 
     while cap.isOpened():
-        success, image = cap.read()
+        with tracer.span(tracing.DECODE):
+            success, image = cap.read()
         if not success:
             break
+        tracer.count(tracing.FRAMES_DECODED)
 
         # Process every 5th frame to avoid redundancy
         if frame_count % 5 != 0:
             frame_count += 1
             continue
 
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
-        detection_result = detector.detect(mp_image)
+        landmarks = detect_hand(detector, image, max_detect_dim, tracer)
 
-        if detection_result.hand_landmarks:
-            hand_landmarks = detection_result.hand_landmarks[0]
-            landmarks = [{'x': lm.x, 'y': lm.y, 'z': lm.z} for lm in hand_landmarks]
-            
+        if landmarks:
             yolo_label = convert_to_yolo_format(landmarks, label_id)
             
             if yolo_label:
+                # Encoded before the deduper sees it, so a frame that is never
+                # written cannot suppress later near-duplicates
+                with tracer.span(tracing.JPEG):
+                    ok, buf = cv2.imencode('.jpg', image)
+                if not ok:
+                    print(f"Could not encode frame {frame_count} of {sample_id} as JPEG, skipping it")
+                    frame_count += 1
+                    continue
+                if deduper is not None and not deduper.keep(landmarks, image):
+                    frame_count += 1
+                    continue
+
                 frame_name = f"{sample_id}_{saved_frames}"
                 img_path = os.path.join(images_dir, f"{frame_name}.jpg")
                 lbl_path = os.path.join(labels_dir, f"{frame_name}.txt")
-                
-                cv2.imwrite(img_path, image)
-                with open(lbl_path, 'w') as f:
-                    f.write(yolo_label)
+                with tracer.span(tracing.WRITE):
+                    with open(img_path, 'wb') as f:
+                        f.write(buf.tobytes())
+                    with open(lbl_path, 'w') as f:
+                        f.write(yolo_label)
+                tracer.count(tracing.BYTES_WRITTEN, len(buf) + len(yolo_label))
                 
                 saved_frames += 1
             
@@ -111,7 +105,26 @@ def main():
     parser = argparse.ArgumentParser(description='Process MS-ASL data for YOLOv8')
     parser.add_argument('--limit', type=int, default=5, help='Limit number of samples to process')
     parser.add_argument('--subset', type=str, default='train', choices=['train', 'val', 'test'], help='Subset to process')
+    parser.add_argument('--max_detect_dim', type=int, default=None, help='Downscale frames so the longer side is at most this before detection')
+    add_dedupe_args(parser)
+    add_fetch_args(parser)
+    parser.add_argument('--trace', type=str, default=None, help='Write a Chrome trace-event JSON of all stages here')
     args = parser.parse_args()
+
+    # Checked here rather than at import so --help and the unified CLI stay fast
+    try:
+        import mediapipe
+    except ImportError:
+        print("Error: mediapipe not found. Please run: pip install -r requirements.txt")
+        exit(1)
+    if not args.local_videos:
+        try:
+            import yt_dlp
+        except ImportError:
+            print("Error: yt-dlp not found. Please run: pip install -r requirements.txt")
+            exit(1)
+    tracer = tracer_from_args(args.trace)
+    deduper = deduper_from_args(args)
     
     input_file = os.path.join(os.path.dirname(__file__), MSASL_DIR, f'MSASL_{args.subset}.json')
     
@@ -130,35 +143,23 @@ def main():
         classes = json.load(f)
     class_to_id = {name: i for i, name in enumerate(classes)}
 
-    count = 0
-    for item in data:
-        if count >= args.limit:
-            break
-            
-        url = item['url']
-        start = item['start_time']
-        end = item['end_time']
-        label_text = item['clean_text']
-        label_id = class_to_id.get(label_text, -1)
-        
-        if label_id == -1:
-            print(f"Skipping unknown label: {label_text}")
-            continue
-
-        sample_id = str(uuid.uuid4())[:8]
-        print(f"Processing [{count+1}/{args.limit}]: {label_text} (ID: {label_id})")
-        
-        if not os.path.exists(TEMP_DIR):
-            os.makedirs(TEMP_DIR)
-        temp_vid_path = os.path.join(TEMP_DIR, f"{sample_id}.mp4")
-        
-        if download_video_segment(url, start, end, temp_vid_path):
-            frames = process_video_to_yolo(temp_vid_path, label_id, sample_id)
-            print(f"  -> Success: {frames} frames saved")
-            if os.path.exists(temp_vid_path):
-                os.remove(temp_vid_path)
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    scheduler = scheduler_from_args(args, tracer)
+    jobs = islice(labeled_jobs(data, class_to_id), args.limit)
+    for count, (job, result) in enumerate(scheduler.fetch_iter(jobs)):
+        sample_id = job['sample_id']
+        temp_vid_path = result.path
+        print(f"Processing [{count+1}/{args.limit}]: {job['label']} (ID: {job['label_id']})")
         
-        count += 1
+        clip_start = tracer.snapshot()
+        if result.ok:
+            frames = process_video_to_yolo(temp_vid_path, job['label_id'], sample_id, tracer, args.max_detect_dim,
+                                           deduper, result.segment)
+            print(f"  -> Success: {frames} frames saved | {tracer.format_summary(clip_start)}")
+            scheduler.release(result)
+        else:
+            print(f"  -> Failed to download {job['url']}: {result.error}")
+    scheduler.close()
 
     # Create dataset.yaml for YOLOv8
     yaml_content = f"""
@@ -175,9 +176,16 @@ names:
         f.write(yaml_content)
     
     print(f"Dataset ready at {YOLO_DATA_DIR}/dataset.yaml")
+    if deduper is not None:
+        print(deduper.report())
+    print(scheduler.report())
     
     if os.path.exists(TEMP_DIR):
         shutil.rmtree(TEMP_DIR)
+    tracer.print_report()
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
 
 if __name__ == '__main__':
     main()
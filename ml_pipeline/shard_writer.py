@@ -0,0 +1,204 @@
+import ctypes
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import tracing
+from tracing import NULL_TRACER
+
+_STOP = object()
+
+
+def round_floats(obj, ndigits):
+    """
+    Recursively round every float in a JSON-like structure.
+    """
+    if isinstance(obj, float):
+        return round(obj, ndigits)
+    if isinstance(obj, dict):
+        return {k: round_floats(v, ndigits) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [round_floats(v, ndigits) for v in obj]
+    return obj
+
+
+def encode_record(record, precision=None):
+    """
+    Compact JSON encoding of a sample record, optionally with reduced float precision.
+    """
+    if precision is not None:
+        record = round_floats(record, precision)
+    return json.dumps(record, separators=(',', ':')).encode('utf-8')
+
+
+class ShardWriter:
+    """
+    Moves shard output off the detection thread.
+
+    JPEGs are encoded and written on a thread pool; JSON records and small
+    text files are queued to a single writer thread that drains them in
+    batches. Nothing is fsynced per file: sync_shard() (or close()) makes a
+    shard durable with one filesystem-wide barrier (syncfs() of the shard's
+    filesystem on Linux, sync() elsewhere), which also flushes anything else
+    pending on that disk. Only where neither exists (Windows) is every file
+    fsynced.
+    """
+
+    def __init__(self, jpeg_workers=4, jpeg_quality=95, batch_size=32,
+                 precision=None, fsync=True, max_pending=256, tracer=NULL_TRACER):
+        self.tracer = tracer
+        self.jpeg_quality = jpeg_quality
+        self.batch_size = batch_size
+        self.precision = precision
+        self.fsync = fsync
+
+        self.bytes_written = 0
+        self.files_written = 0
+        self.errors = []
+
+        self._lock = threading.Lock()
+        self._dirty = {}
+        self._queue = queue.Queue(maxsize=max_pending)
+        # Bounds in-flight frames so a stalled disk cannot exhaust memory;
+        # the detector only ever blocks here if the disk is far behind.
+        self._image_slots = threading.BoundedSemaphore(max_pending)
+        self._image_futures = []
+        self._jpeg_pool = ThreadPoolExecutor(max_workers=jpeg_workers)
+        self._thread = threading.Thread(target=self._run, name='shard-writer', daemon=True)
+        self._thread.start()
+
+    def write_image(self, path, image):
+        """Queue a BGR frame to be JPEG-encoded and written to path."""
+        self._image_slots.acquire()
+        future = self._jpeg_pool.submit(self._encode_and_write, path, image)
+        future.add_done_callback(lambda _: self._image_slots.release())
+        self._image_futures.append(future)
+
+    def write_record(self, path, record):
+        """Queue a JSON-serializable record for compact writing to path."""
+        self._queue.put((path, record))
+
+    def write_text(self, path, text):
+        """Queue a small text file (e.g. a YOLO label) for writing."""
+        self._queue.put((path, text))
+
+    def sync_shard(self, shard_dir):
+        """Block until queued output is written, then sync the shard once."""
+        self._drain()
+        with self._lock:
+            paths = self._dirty.pop(os.path.normpath(shard_dir), [])
+        if self.fsync:
+            _sync_barrier(shard_dir, paths)
+
+    def close(self):
+        """Flush all pending output, sync every touched shard and stop the workers."""
+        self._drain()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._jpeg_pool.shutdown(wait=True)
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if self.fsync:
+            for shard_dir, paths in dirty.items():
+                _sync_barrier(shard_dir, paths)
+        if self.errors:
+            print(f"ShardWriter: {len(self.errors)} writes failed, first: {self.errors[0]}")
+
+    def _drain(self):
+        for future in self._image_futures:
+            future.result()
+        self._image_futures = []
+        self._queue.join()
+
+    def _encode_and_write(self, path, image):
+        try:
+            with self.tracer.span(tracing.JPEG):
+                ok, buf = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality])
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+            self._write_file(path, buf.tobytes())
+        except Exception as e:
+            self.errors.append(f"{path}: {e}")
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is already queued, up to one batch
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                path, payload = item
+                try:
+                    if isinstance(payload, str):
+                        data = payload.encode('utf-8')
+                    else:
+                        data = encode_record(payload, self.precision)
+                    self._write_file(path, data)
+                except Exception as e:
+                    self.errors.append(f"{path}: {e}")
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_file(self, path, data):
+        with self.tracer.span(tracing.WRITE):
+            with open(path, 'wb') as f:
+                f.write(data)
+        self.tracer.count(tracing.BYTES_WRITTEN, len(data))
+        with self._lock:
+            self.bytes_written += len(data)
+            self.files_written += 1
+            shard_dir = os.path.normpath(self._shard_of(path))
+            self._dirty.setdefault(shard_dir, []).append(path)
+
+    @staticmethod
+    def _shard_of(path):
+        parent = os.path.dirname(path)
+        # Shard images live in <shard>/images
+        if os.path.basename(parent) == 'images':
+            return os.path.dirname(parent)
+        return parent
+
+
+def _syncfs():
+    """libc's syncfs(fd), or None where there is none."""
+    try:
+        return ctypes.CDLL(None, use_errno=True).syncfs
+    except (AttributeError, OSError, TypeError):
+        return None
+
+
+_SYNCFS = _syncfs()
+
+
+def _sync_barrier(shard_dir, paths):
+    """Make the files written into shard_dir durable with a single call where the OS allows."""
+    if not paths:
+        return
+    if _SYNCFS is not None and os.path.isdir(shard_dir):
+        fd = os.open(shard_dir, os.O_RDONLY)
+        try:
+            if _SYNCFS(fd) == 0:
+                return
+        finally:
+            os.close(fd)
+    if hasattr(os, 'sync'):
+        os.sync()
+        return
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
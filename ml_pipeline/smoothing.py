@@ -0,0 +1,154 @@
+from operator import itemgetter
+import numpy as np
+from utils_landmarks import normalize_landmarks_array
+
+# OneEuroFilter / LandmarkSmoother parameters from src/tracking/Smoothing.ts
+MIN_CUTOFF = 1.0
+BETA = 1.0
+D_CUTOFF = 1.0
+# (confidence above, min_cutoff, beta); anything lower gets LOW_CONFIDENCE_PARAMS
+CONFIDENCE_TIERS = [(0.8, 1.0, 10.0), (0.5, 0.5, 1.0)]
+LOW_CONFIDENCE_PARAMS = (0.1, 0.001)
+# The app resets its smoother when the hand is lost; in recorded frames a
+# hand loss shows up as a timestamp gap
+RESET_GAP_MS = 100
+
+_xyz = itemgetter('x', 'y', 'z')
+
+
+def confidence_params(score):
+    """Per-frame (min_cutoff, beta) chosen from the hand score like LandmarkSmoother.smooth."""
+    score = np.asarray(score, dtype=np.float64)
+    conditions = [score > threshold for threshold, _, _ in CONFIDENCE_TIERS]
+    min_cutoff = np.select(conditions, [c for _, c, _ in CONFIDENCE_TIERS], LOW_CONFIDENCE_PARAMS[0])
+    beta = np.select(conditions, [b for _, _, b in CONFIDENCE_TIERS], LOW_CONFIDENCE_PARAMS[1])
+    return min_cutoff, beta
+
+
+def _alpha(dt, cutoff):
+    r = 2 * np.pi * cutoff * dt
+    return r / (r + 1)
+
+
+def one_euro(x, t, min_cutoff=MIN_CUTOFF, beta=BETA, d_cutoff=D_CUTOFF, valid=None, reset_gap_ms=None):
+    """
+    One Euro filter along axis 1 of x, shaped (B, T, ...), for every value at once.
+
+    t is (B, T) in milliseconds. min_cutoff and beta are scalars or (B, T)
+    per-frame values. Frames where valid (B, T) is False leave the state
+    untouched (padding). A step longer than reset_gap_ms restarts the filter,
+    as the app does when a hand re-enters. Steps with dt <= 0 repeat the
+    previous output, matching OneEuroFilter.filter.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    batch, steps = x.shape[:2]
+    per_row = (batch,) + (1,) * (x.ndim - 2)  # broadcasts (B,) over the value axes
+    min_cutoff = np.broadcast_to(np.asarray(min_cutoff, dtype=np.float64), (batch, steps))
+    beta = np.broadcast_to(np.asarray(beta, dtype=np.float64), (batch, steps))
+    valid = np.ones((batch, steps), dtype=bool) if valid is None else np.asarray(valid, dtype=bool)
+
+    out = np.empty_like(x)
+    x_prev = x[:, 0].copy()
+    dx_prev = np.zeros_like(x_prev)
+    t_prev = t[:, 0].copy()
+    out[:, 0] = x_prev
+
+    for k in range(1, steps):
+        x_k = x[:, k]
+        dt = (t[:, k] - t_prev) / 1000.0
+        restart = np.zeros(batch, dtype=bool)
+        if reset_gap_ms is not None:
+            restart = valid[:, k] & (dt * 1000.0 > reset_gap_ms)
+        step = valid[:, k] & (dt > 0) & ~restart
+        safe_dt = np.where(step, dt, 1.0).reshape(per_row)
+
+        dx = (x_k - x_prev) / safe_dt
+        a_d = _alpha(safe_dt, d_cutoff)
+        dx_hat = a_d * dx + (1 - a_d) * dx_prev
+        cutoff = min_cutoff[:, k].reshape(per_row) + beta[:, k].reshape(per_row) * np.abs(dx_hat)
+        a = _alpha(safe_dt, cutoff)
+        x_hat = a * x_k + (1 - a) * x_prev
+
+        step_b = step.reshape(per_row)
+        restart_b = restart.reshape(per_row)
+        x_prev = np.where(step_b, x_hat, np.where(restart_b, x_k, x_prev))
+        dx_prev = np.where(step_b, dx_hat, np.where(restart_b, 0.0, dx_prev))
+        t_prev = np.where(valid[:, k], t[:, k], t_prev)
+        out[:, k] = x_prev
+    return out
+
+
+def smooth_landmarks(landmarks, t, score=None, min_cutoff=None, beta=None, reset_gap_ms=RESET_GAP_MS):
+    """
+    Smooth a (T, 21, 3) sequence, or a (B, T, 21, 3) batch, with timestamps
+    t in ms. With score the parameters follow the per-frame confidence
+    tiers of LandmarkSmoother; otherwise min_cutoff/beta (default: the
+    LandmarkSmoother construction values) apply to every frame.
+    """
+    landmarks = np.asarray(landmarks)
+    single = landmarks.ndim == 3
+    x = landmarks[None] if single else landmarks
+    t = np.asarray(t)[None] if single else np.asarray(t)
+    if score is not None and min_cutoff is None and beta is None:
+        score = np.asarray(score)[None] if single else np.asarray(score)
+        min_cutoff, beta = confidence_params(score)
+    else:
+        min_cutoff = MIN_CUTOFF if min_cutoff is None else min_cutoff
+        beta = BETA if beta is None else beta
+    out = one_euro(x, t, min_cutoff, beta, reset_gap_ms=reset_gap_ms).astype(landmarks.dtype, copy=False)
+    return out[0] if single else out
+
+
+def smooth_ragged(landmarks, t, offsets, score=None, reset_gap_ms=RESET_GAP_MS):
+    """
+    Smooth many samples stored back to back (frames of sample i are
+    offsets[i]:offsets[i+1], the dataset_io binary layout) in one padded batch.
+    """
+    landmarks = np.asarray(landmarks)
+    offsets = np.asarray(offsets)
+    lengths = np.diff(offsets)
+    if lengths.size == 0 or lengths.max() == 0:
+        return landmarks.copy()
+    rows = np.repeat(np.arange(lengths.size), lengths)
+    cols = np.arange(offsets[-1] - offsets[0]) - np.repeat(offsets[:-1] - offsets[0], lengths)
+    frames = slice(offsets[0], offsets[-1])
+
+    shape = (lengths.size, lengths.max())
+    x = np.zeros(shape + landmarks.shape[1:], dtype=np.float64)
+    x[rows, cols] = landmarks[frames]
+    times = np.zeros(shape, dtype=np.float64)
+    times[rows, cols] = np.asarray(t)[frames]
+    valid = np.zeros(shape, dtype=bool)
+    valid[rows, cols] = True
+    if score is not None:
+        scores = np.zeros(shape, dtype=np.float64)
+        scores[rows, cols] = np.asarray(score)[frames]
+        min_cutoff, beta = confidence_params(scores)
+    else:
+        min_cutoff, beta = MIN_CUTOFF, BETA
+
+    out = landmarks.copy()
+    out[frames] = one_euro(x, times, min_cutoff, beta, valid=valid, reset_gap_ms=reset_gap_ms)[rows, cols]
+    return out
+
+
+def smoothed_norm_samples(samples):
+    """
+    Capture-format samples -> list of (T, 21, 3) normalized landmark arrays
+    computed from smoothed raw landmarks, as the live app does. Frames
+    without 21 landmarks are dropped first.
+    """
+    raw, t, score, lengths = [], [], [], []
+    for sample in samples:
+        frames = [f for f in sample['frames'] if len(f.get('landmarks') or []) == 21]
+        raw.extend(list(map(_xyz, f['landmarks'])) for f in frames)
+        t.extend(f.get('t', i * 33) for i, f in enumerate(frames))
+        score.extend(f.get('score', 1.0) for f in frames)
+        lengths.append(len(frames))
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    if offsets[-1] == 0:
+        return [np.zeros((0, 21, 3), dtype=np.float32) for _ in samples]
+    raw = np.array(raw, dtype=np.float32)
+    norm = normalize_landmarks_array(smooth_ragged(raw, t, offsets, score))
+    return [norm[offsets[i]:offsets[i + 1]] for i in range(len(samples))]
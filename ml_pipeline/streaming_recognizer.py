@@ -0,0 +1,255 @@
+import json
+import argparse
+import time
+from collections import deque
+import numpy as np
+from utils_landmarks import normalize_landmarks_array
+
+# Configuration, matching src/ml/DynamicModelRunner.ts and src/recognition
+DYNAMIC_MODEL_DIR = 'dynamic_model'
+VECTOR_SIZE = 63
+WINDOW_SIZE = 30        # Must match train_dynamic.py
+STRIDE = 5              # frames between scored windows
+THRESHOLD = 0.8         # DynamicModelRunner confidence gate
+IGNORE_PREFIX = 'IDLE'  # DynamicModelRunner drops IDLE_* classes
+HISTORY_SIZE = 5        # Recognizer.historySize
+DEBOUNCE = 4            # Recognizer.debounceThreshold
+TIME_WINDOW_MS = 1500   # DynamicASLDetector.timeWindow
+BATCH_SIZE = 256
+FPS = 30
+NONE = 'NONE'
+
+
+class FrameRing:
+    """
+    The last `window` frames, readable as one contiguous (window, dim) view.
+
+    Every frame is written twice, at i and i + window of a 2 * window
+    buffer, so the window is always a plain slice: no per-frame shifting
+    and no copy to read it.
+    """
+
+    def __init__(self, window, dim, dtype=np.float32):
+        self.size = window
+        self._buf = np.zeros((2 * window, dim), dtype=dtype)
+        self.count = 0
+
+    def push(self, frame):
+        i = self.count % self.size
+        self._buf[i] = frame
+        self._buf[i + self.size] = frame
+        self.count += 1
+
+    @property
+    def full(self):
+        return self.count >= self.size
+
+    def window(self):
+        """Oldest-to-newest view of the last `window` frames (valid until the next push)."""
+        start = self.count % self.size
+        return self._buf[start:start + self.size]
+
+    def clear(self):
+        self.count = 0
+
+
+class Debouncer:
+    """
+    Recognizer.getConsensus over window predictions: a label is reported
+    once it wins at least `threshold` of the last `history` windows, and an
+    event is emitted only when the reported label changes.
+    """
+
+    def __init__(self, history=HISTORY_SIZE, threshold=DEBOUNCE):
+        self.threshold = threshold
+        self._history = deque(maxlen=history)
+        self.active = None
+
+    def update(self, label, confidence):
+        """Returns (label, mean confidence) when a new sign starts, else None."""
+        self._history.append((label, confidence))
+        counts, sums = {}, {}
+        winner, best = NONE, 0
+        for entry_label, entry_conf in self._history:
+            counts[entry_label] = counts.get(entry_label, 0) + 1
+            sums[entry_label] = sums.get(entry_label, 0.0) + entry_conf
+            if counts[entry_label] > best:
+                winner, best = entry_label, counts[entry_label]
+
+        if winner == NONE or best < self.threshold:
+            self.active = None
+            return None
+        if winner == self.active:
+            return None
+        self.active = winner
+        return winner, sums[winner] / counts[winner]
+
+    def reset(self):
+        self._history.clear()
+        self.active = None
+
+
+class StreamingRecognizer:
+    """
+    Continuous dynamic-sign recognition over a landmark stream.
+
+    Frames (63-value normalized vectors) go into a FrameRing; every
+    `stride` frames the current window is scored with predict_fn, gated
+    like DynamicModelRunner (confidence > threshold, IDLE classes dropped)
+    and debounced like Recognizer. Windows spanning more than
+    time_window_ms (the hand was lost) count as no sign.
+
+    push() handles one live frame at a time; run() processes a recorded
+    stream in batches and produces the same events.
+    """
+
+    def __init__(self, predict_fn, classes, window=WINDOW_SIZE, stride=STRIDE, threshold=THRESHOLD,
+                 history=HISTORY_SIZE, debounce=DEBOUNCE, time_window_ms=TIME_WINDOW_MS,
+                 ignore_prefix=IGNORE_PREFIX, batch_size=BATCH_SIZE):
+        self.predict_fn = predict_fn
+        self.classes = list(classes)
+        self.window = window
+        self.stride = stride
+        self.threshold = threshold
+        self.time_window_ms = time_window_ms
+        self.batch_size = batch_size
+        self.ignored = np.array([str(c).startswith(ignore_prefix) for c in self.classes])
+        self.debouncer = Debouncer(history, debounce)
+        self.ring = FrameRing(window, VECTOR_SIZE)
+        self.times = FrameRing(window, 1, dtype=np.float64)
+        self.windows_scored = 0
+
+    def reset(self):
+        self.ring.clear()
+        self.times.clear()
+        self.debouncer.reset()
+
+    def _labels(self, probs):
+        """Per-window (label or NONE, confidence) after the DynamicModelRunner gate."""
+        best = probs.argmax(axis=1)
+        conf = probs[np.arange(len(probs)), best]
+        accepted = (conf > self.threshold) & ~self.ignored[best]
+        return [(self.classes[b] if ok else NONE, float(c)) for b, c, ok in zip(best, conf, accepted)]
+
+    def _emit(self, label, confidence, frame, start_t, end_t):
+        result = self.debouncer.update(label, confidence)
+        if result is None:
+            return None
+        return {'label': result[0], 'confidence': result[1], 'frame': frame,
+                'start_t': start_t, 'end_t': end_t}
+
+    def push(self, vector, t=None):
+        """Add one frame; returns an event dict when a sign is recognized, else None."""
+        frame = self.ring.count
+        t = frame * 1000.0 / FPS if t is None else t
+        self.ring.push(vector)
+        self.times.push(t)
+        if not self.ring.full or (frame - self.window + 1) % self.stride:
+            return None
+
+        times = self.times.window()
+        start_t, end_t = float(times[0, 0]), float(times[-1, 0])
+        self.windows_scored += 1
+        if end_t - start_t >= self.time_window_ms:
+            return self._emit(NONE, 0.0, frame, start_t, end_t)
+        probs = np.asarray(self.predict_fn(self.ring.window()[np.newaxis]))
+        (label, confidence), = self._labels(probs)
+        return self._emit(label, confidence, frame, start_t, end_t)
+
+    def run(self, vectors, t=None):
+        """
+        Events for a whole recorded (N, 63) stream with timestamps t in ms
+        (default FPS). Windows are strided views of the stream and are
+        only copied batch_size at a time, for the model input.
+        """
+        self.reset()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        t = np.arange(len(vectors)) * 1000.0 / FPS if t is None else np.asarray(t, dtype=np.float64)
+        if len(vectors) < self.window:
+            return []
+        windows = np.lib.stride_tricks.sliding_window_view(vectors, self.window, axis=0)[::self.stride]
+        ends = np.arange(self.window - 1, len(vectors), self.stride)
+        start_t, end_t = t[ends - self.window + 1], t[ends]
+        in_time = (end_t - start_t) < self.time_window_ms
+
+        events = []
+        for lo in range(0, len(ends), self.batch_size):
+            hi = min(lo + self.batch_size, len(ends))
+            labels = [(NONE, 0.0)] * (hi - lo)
+            scored = np.flatnonzero(in_time[lo:hi])
+            if scored.size:
+                # sliding_window_view puts the window axis last
+                batch = windows[lo + scored].transpose(0, 2, 1)
+                for i, entry in zip(scored, self._labels(np.asarray(self.predict_fn(batch)))):
+                    labels[i] = entry
+            for i, (label, confidence) in enumerate(labels, start=lo):
+                event = self._emit(label, confidence, int(ends[i]), float(start_t[i]), float(end_t[i]))
+                if event is not None:
+                    events.append(event)
+        self.windows_scored += len(ends)
+        return events
+
+
+def load_stream(path, fps=FPS):
+    """
+    (vectors (N, 63), t (N,) ms) from a .npy of raw (N, 21, 3) landmarks,
+    a .npz with 'landmarks' and optional 't', or a capture JSON whose
+    samples are concatenated in order.
+    """
+    t = None
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        vectors = np.array([[v for lm in frame['features']['norm'] for v in (lm['x'], lm['y'], lm['z'])]
+                            for sample in data['samples'] for frame in sample['frames']], dtype=np.float32)
+    else:
+        loaded = np.load(path)
+        if path.endswith('.npz'):
+            landmarks = loaded['landmarks']
+            t = loaded['t'] if 't' in loaded.files else None
+        else:
+            landmarks = loaded
+        vectors = normalize_landmarks_array(landmarks.astype(np.float32)).reshape(len(landmarks), -1)
+    if t is None:
+        t = np.arange(len(vectors)) * 1000.0 / fps
+    return vectors, t
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recognize dynamic signs in a continuous landmark stream')
+    parser.add_argument('stream', type=str, help='.npy/.npz raw landmarks or a capture JSON')
+    parser.add_argument('--model', type=str, default=DYNAMIC_MODEL_DIR, help='Directory with model.h5 and classes.json')
+    parser.add_argument('--fps', type=float, default=FPS, help='Frame rate when the stream has no timestamps')
+    parser.add_argument('--stride', type=int, default=STRIDE, help='Frames between scored windows')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='Minimum window confidence')
+    parser.add_argument('--debounce', type=int, default=DEBOUNCE, help=f'Windows out of the last {HISTORY_SIZE} that must agree')
+    parser.add_argument('--batch_size', type=int, default=BATCH_SIZE, help='Windows per model call')
+    parser.add_argument('--output', type=str, default=None, help='Write events as JSON lines')
+    args = parser.parse_args()
+
+    from inference_server import KerasModel
+
+    vectors, t = load_stream(args.stream, args.fps)
+    print(f"Loaded {len(vectors)} frames ({len(vectors) / args.fps / 60:.1f} min at {args.fps:g} fps)")
+    model = KerasModel(args.model, (WINDOW_SIZE, VECTOR_SIZE), max_batch=args.batch_size)
+    recognizer = StreamingRecognizer(model.predict, model.classes, stride=args.stride, threshold=args.threshold,
+                                     debounce=min(args.debounce, HISTORY_SIZE), batch_size=args.batch_size)
+
+    start = time.perf_counter()
+    events = recognizer.run(vectors, t)
+    elapsed = time.perf_counter() - start
+
+    for event in events:
+        print(f"  {event['end_t'] / 1000:9.2f}s  {event['label']:<16} {event['confidence']:.2f}")
+    print(f"{len(events)} events from {recognizer.windows_scored} windows in {elapsed:.2f}s "
+          f"({len(vectors) / max(elapsed, 1e-9):.0f} frames/s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+        print(f"Events written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+import csv
+import json
+import os
+import argparse
+import itertools
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context, shared_memory
+import numpy as np
+
+# Configuration
+DEFAULT_DATASET_PATH = '../capture_data.json'
+DEFAULT_RESULTS_PATH = 'sweep_results.csv'
+LATENCY_CALLS = 50
+
+# Searched values per model kind; override with --space
+DEFAULT_SPACES = {
+    'static': {
+        'epochs': [25, 50],
+        'batch_size': [16, 32, 64],
+        'hidden_units': [[64, 32], [128, 64], [256, 128]],
+        'dropout': [0.1, 0.2, 0.3],
+        'learning_rate': [0.001, 0.003],
+    },
+    'dynamic': {
+        'epochs': [25, 50],
+        'batch_size': [8, 16, 32],
+        'filters': [32, 64],
+        'lstm_units': [32, 64, 128],
+        'dense_units': [32],
+        'dropout': [0.2, 0.3],
+        'learning_rate': [0.001, 0.003],
+    },
+}
+
+# Per-worker state, set once by _init_worker
+_shared = {}
+_arrays = {}
+_kind = None
+
+
+def expand_space(space, search='grid', trials=None, seed=0):
+    """
+    Configurations from {param: [values]}: the full grid (optionally
+    capped at trials, in a shuffled order) or trials random draws.
+    """
+    names = sorted(space)
+    if search == 'grid':
+        configs = [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+        if trials is not None and trials < len(configs):
+            configs = random.Random(seed).sample(configs, trials)
+        return configs
+    rng = random.Random(seed)
+    return [{n: rng.choice(space[n]) for n in names} for _ in range(trials or 10)]
+
+
+def share_arrays(arrays):
+    """
+    Copy named numpy arrays into shared memory once.
+    Returns the SharedMemory blocks (owned by the caller) and the specs
+    workers need to attach to them.
+    """
+    blocks, specs = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        blocks.append(shm)
+        specs[name] = (shm.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+def attach_arrays(specs):
+    """Zero-copy views of shared arrays; the blocks are returned so they stay mapped."""
+    blocks, arrays = [], {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        # Spawned workers share the parent's resource tracker, so the
+        # parent's unlink() is the only cleanup needed
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return blocks, arrays
+
+
+def _init_worker(specs, kind, threads):
+    global _kind
+    # Thread limits must be set before TensorFlow starts its pools
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    blocks, arrays = attach_arrays(specs)
+    _shared['blocks'] = blocks
+    _arrays.update(arrays)
+    _kind = kind
+
+
+def _run_in_worker(trial_id, config):
+    return run_trial(trial_id, config, _arrays, _kind)
+
+
+def measure_latency(model, sample, calls=LATENCY_CALLS):
+    """Median single-sample inference time in ms (the live-recognition case)."""
+    sample = sample[np.newaxis]
+    model(sample, training=False)  # build and warm up
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        model(sample, training=False)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1000)
+
+
+def run_trial(trial_id, config, arrays, kind):
+    """Train one configuration on the shared split and return its results row."""
+    import tensorflow as tf
+    if kind == 'static':
+        from train_static import create_model
+    else:
+        from train_dynamic import create_model
+
+    tf.keras.utils.set_random_seed(trial_id)
+    model_args = {k: v for k, v in config.items() if k not in ('epochs', 'batch_size')}
+    if 'hidden_units' in model_args:
+        model_args['hidden_units'] = tuple(model_args['hidden_units'])
+    model = create_model(int(arrays['num_classes'][0]), **model_args)
+
+    start = time.perf_counter()
+    model.fit(arrays['X_train'], arrays['y_train'], epochs=config.get('epochs', 50),
+              batch_size=config.get('batch_size', 32), verbose=0)
+    train_s = time.perf_counter() - start
+    loss, acc = model.evaluate(arrays['X_test'], arrays['y_test'], verbose=0)
+
+    return {
+        'trial': trial_id,
+        **{k: json.dumps(v) if isinstance(v, list) else v for k, v in config.items()},
+        'accuracy': float(acc),
+        'loss': float(loss),
+        'train_s': train_s,
+        'latency_ms': measure_latency(model, arrays['X_test'][0]),
+        'params': model.count_params(),
+    }
+
+
+def load_split(kind, path, test_size=0.2, smooth=False):
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+    if kind == 'static':
+        from train_static import load_data
+    else:
+        from train_dynamic import load_data
+
+    X, y = load_data(path, smooth)
+    if len(X) == 0:
+        return None, None
+    le = LabelEncoder()
+    y_enc = le.fit_transform(y)
+    X_train, X_test, y_train, y_test = train_test_split(X.astype(np.float32), y_enc,
+                                                        test_size=test_size, random_state=42)
+    arrays = {
+        'X_train': X_train, 'X_test': X_test,
+        'y_train': y_train.astype(np.int32), 'y_test': y_test.astype(np.int32),
+        'num_classes': np.array([len(le.classes_)], dtype=np.int32),
+    }
+    return arrays, list(le.classes_)
+
+
+def write_results(rows, path):
+    columns = []
+    for row in rows:
+        columns.extend(k for k in row if k not in columns)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_table(rows, top=10):
+    params = [k for k in rows[0] if k not in ('trial', 'accuracy', 'loss', 'train_s', 'latency_ms', 'params')]
+    print(f"\n{'trial':>5}{'acc':>8}{'train s':>9}{'lat ms':>8}{'params':>9}  config")
+    for row in rows[:top]:
+        config = ' '.join(f"{k}={row[k]}" for k in params)
+        print(f"{row['trial']:>5}{row['accuracy']*100:>7.2f}%{row['train_s']:>9.1f}"
+              f"{row['latency_ms']:>8.2f}{row['params']:>9}  {config}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hyperparameter sweep over a dataset loaded once into shared memory')
+    parser.add_argument('kind', choices=['static', 'dynamic'], help='Which model to sweep')
+    parser.add_argument('--data', type=str, default=DEFAULT_DATASET_PATH, help='Path to dataset JSON')
+    parser.add_argument('--smooth', action='store_true', help='Load One Euro smoothed landmarks')
+    parser.add_argument('--space', type=str, default=None, help='JSON file of {param: [values]} (default: built-in space)')
+    parser.add_argument('--search', type=str, default='grid', choices=['grid', 'random'], help='Grid or random search')
+    parser.add_argument('--trials', type=int, default=None, help='Max trials (grid is subsampled; random defaults to 10)')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel training processes')
+    parser.add_argument('--threads_per_worker', type=int, default=1, help='TensorFlow/OpenMP threads per process')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for trial selection')
+    parser.add_argument('--results', type=str, default=DEFAULT_RESULTS_PATH, help='CSV of all trials')
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACES[args.kind]
+    if args.space:
+        with open(args.space, 'r') as f:
+            space = json.load(f)
+    configs = expand_space(space, args.search, args.trials, args.seed)
+
+    print("Loading data...")
+    arrays, classes = load_split(args.kind, args.data, smooth=args.smooth)
+    if arrays is None:
+        print("No data found.")
+        return
+    print(f"Loaded {len(arrays['X_train']) + len(arrays['X_test'])} samples, {len(classes)} classes")
+
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads_per_worker)
+    print(f"Running {len(configs)} trials on {workers} workers x {args.threads_per_worker} threads...")
+
+    blocks, specs = share_arrays(arrays)
+    rows = []
+    try:
+        # spawn: TensorFlow is not fork-safe once initialized
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                 initializer=_init_worker,
+                                 initargs=(specs, args.kind, args.threads_per_worker)) as pool:
+            futures = {pool.submit(_run_in_worker, i, config): i for i, config in enumerate(configs)}
+            for future in as_completed(futures):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    print(f"  trial {futures[future]} failed: {e}")
+                    continue
+                rows.append(row)
+                print(f"  [{len(rows)}/{len(configs)}] trial {row['trial']}: "
+                      f"{row['accuracy']*100:.2f}% in {row['train_s']:.1f}s, {row['latency_ms']:.2f}ms/sample")
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    if not rows:
+        print("No trials completed.")
+        return
+    rows.sort(key=lambda r: (-r['accuracy'], r['latency_ms']))
+    write_results(rows, args.results)
+    print_table(rows)
+    print(f"\nResults for {len(rows)} trials written to {args.results}")
+
+
+if __name__ == '__main__':
+    main()
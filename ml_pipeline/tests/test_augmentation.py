@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add parent dir to path to import augmentation
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from augmentation import LandmarkAugmenter, augmented_batches, rotation_matrices
+
+
+def hands(shape, seed=0):
+    """Wrist-centred random landmark vectors of shape (..., 63)."""
+    points = np.random.default_rng(seed).normal(size=shape[:-1] + (21, 3)).astype(np.float32)
+    points[..., 0, :] = 0
+    return points.reshape(shape)
+
+
+class TestAugmentation(unittest.TestCase):
+    def test_rotation_matrices_orthonormal(self):
+        angles = np.random.default_rng(1).uniform(-1, 1, (8, 3))
+        R = rotation_matrices(angles)
+        np.testing.assert_allclose(R @ R.transpose(0, 2, 1), np.broadcast_to(np.eye(3), R.shape), atol=1e-12)
+        np.testing.assert_allclose(np.linalg.det(R), 1.0)
+
+    def test_rotate_keeps_distances_from_wrist(self):
+        X = hands((16, 63))
+        out = LandmarkAugmenter(['rotate'], rotate_deg=30, seed=0)(X)
+        self.assertEqual(out.dtype, np.float32)
+        norms = lambda a: np.linalg.norm(a.reshape(16, 21, 3), axis=-1)
+        np.testing.assert_allclose(norms(out), norms(X), rtol=1e-5, atol=1e-6)
+        self.assertFalse(np.allclose(out, X))
+
+    def test_same_transform_for_every_frame_of_a_sequence(self):
+        frame = hands((4, 63))
+        X = np.repeat(frame[:, np.newaxis], 10, axis=1)
+        out = LandmarkAugmenter(['rotate', 'scale', 'mirror'], seed=3)(X)
+        np.testing.assert_allclose(out, np.repeat(out[:, :1], 10, axis=1), atol=1e-6)
+
+    def test_mirror_negates_x_only(self):
+        X = hands((32, 63))
+        out = LandmarkAugmenter(['mirror'], mirror_p=1.0, seed=0)(X)
+        points, original = out.reshape(32, 21, 3), X.reshape(32, 21, 3)
+        np.testing.assert_array_equal(points[..., 0], -original[..., 0])
+        np.testing.assert_array_equal(points[..., 1:], original[..., 1:])
+
+    def test_seeded_runs_repeat(self):
+        X = hands((8, 30, 63))
+        a = LandmarkAugmenter(seed=7)(X)
+        b = LandmarkAugmenter(seed=7)(X)
+        c = LandmarkAugmenter(seed=8)(X)
+        np.testing.assert_array_equal(a, b)
+        self.assertFalse(np.allclose(a, c))
+        self.assertEqual(a.shape, X.shape)
+
+    def test_time_warp(self):
+        ramp = np.tile(np.arange(30, dtype=np.float32)[np.newaxis, :, np.newaxis], (6, 1, 63))
+        identity = LandmarkAugmenter(['warp'], warp=0.0, seed=0)(ramp)
+        np.testing.assert_allclose(identity, ramp)
+        warped = LandmarkAugmenter(['warp'], warp=0.5, seed=0)(ramp)[..., 0]
+        # Still in time order, within the original range, centred on the middle frame
+        self.assertTrue(np.all(np.diff(warped, axis=1) >= 0))
+        self.assertTrue(np.all((warped >= 0) & (warped <= 29)))
+        np.testing.assert_allclose(warped[:, 14] + warped[:, 15], 29, atol=1e-4)
+
+    def test_frame_dropout_holds_previous_frame(self):
+        ramp = np.tile(np.arange(50, dtype=np.float32)[np.newaxis, :, np.newaxis], (20, 1, 63))
+        out = LandmarkAugmenter(['dropout'], frame_dropout=0.3, seed=0)(ramp)[..., 0]
+        steps = np.diff(out, axis=1)
+        self.assertTrue(np.all(out[:, 0] == 0))
+        self.assertTrue(np.all(steps >= 0))
+        # Every kept frame is itself; dropped ones repeat the last kept
+        kept = np.concatenate([np.ones((20, 1), bool), steps > 0], axis=1)
+        np.testing.assert_array_equal(out[kept], np.broadcast_to(np.arange(50), out.shape)[kept])
+        self.assertTrue(0.2 < 1 - kept[:, 1:].mean() < 0.4)
+
+    def test_static_batches_skip_sequence_ops(self):
+        X = hands((5, 63))
+        out = LandmarkAugmenter(['warp', 'dropout'], seed=0)(X)
+        np.testing.assert_array_equal(out, X)
+
+    def test_unknown_op(self):
+        with self.assertRaises(ValueError):
+            LandmarkAugmenter(['flip'])
+
+    def test_augmented_batches_cover_each_epoch(self):
+        X = np.arange(10, dtype=np.float32)[:, np.newaxis] * np.ones((1, 63), np.float32)
+        y = np.arange(10)
+        batches = augmented_batches(X, y, 4, lambda x: x + 100, seed=0)
+        epoch = [next(batches) for _ in range(3)]
+        self.assertEqual([len(b[1]) for b in epoch], [4, 4, 2])
+        seen = np.concatenate([b[1] for b in epoch])
+        self.assertEqual(sorted(seen), list(range(10)))
+        for xb, yb in epoch:
+            np.testing.assert_array_equal(xb[:, 0], yb + 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+import os
+import sys
+
+# Add benchmarks dir to path to import run_benchmarks
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from run_benchmarks import compare, fit_exponent
+
+
+class TestBenchmarkRegressions(unittest.TestCase):
+    def test_fit_exponent(self):
+        sizes = [1000, 4000, 16000]
+        self.assertAlmostEqual(fit_exponent(sizes, [s * 1e-6 for s in sizes]), 1.0, places=5)
+        self.assertAlmostEqual(fit_exponent(sizes, [s * s * 1e-9 for s in sizes]), 2.0, places=5)
+
+    def test_quadratic_case_fails(self):
+        results = {'slow_case': {1000: 0.001, 4000: 0.016, 16000: 0.256}}
+        failures = compare(results, {}, threshold=2.0, max_exponent=1.4)
+        self.assertEqual(len(failures), 1)
+        self.assertIn('size^2.00', failures[0])
+
+    def test_baseline_regression(self):
+        results = {'case': {1000: 0.003}}
+        self.assertEqual(compare(results, {'case': {'1000': 0.002}}, 2.0, 1.4), [])
+        failures = compare(results, {'case': {'1000': 0.001}}, 2.0, 1.4)
+        self.assertEqual(len(failures), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
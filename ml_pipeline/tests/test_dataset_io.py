@@ -0,0 +1,89 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+
+# Add parent dir to path to import dataset_io
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset_io import JsonlSampleWriter, compact_jsonl, iter_jsonl, read_jsonl_meta
+
+
+def make_sample(i):
+    return {
+        "id": f"s{i}",
+        "label": "apple",
+        "type": "dynamic",
+        "handedness": "Unknown",
+        "frames": [{"t": 0, "landmarks": [{"x": 0.1, "y": 0.2, "z": 0.3}]}],
+        "summary": {"durationMs": 33},
+        "timestamp": 0
+    }
+
+
+class TestJsonlDataset(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = 'test_dataset_io_output'
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+        os.makedirs(self.test_dir)
+        self.jsonl_path = os.path.join(self.test_dir, 'data.jsonl')
+        self.meta = {"dataset": "test", "version": "1.0"}
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_compact_matches_dataset_shape(self):
+        with JsonlSampleWriter(self.jsonl_path, self.meta) as writer:
+            for i in range(3):
+                writer.write(make_sample(i))
+
+        output = os.path.join(self.test_dir, 'data.json')
+        self.assertEqual(compact_jsonl(self.jsonl_path, output), 3)
+        with open(output, 'r') as f:
+            data = json.load(f)
+        self.assertEqual(data['meta'], self.meta)
+        self.assertEqual([s['id'] for s in data['samples']], ['s0', 's1', 's2'])
+
+    def test_truncated_tail_is_skipped(self):
+        with JsonlSampleWriter(self.jsonl_path, self.meta) as writer:
+            writer.write(make_sample(0))
+        # Simulate a crash half way through the next sample
+        with open(self.jsonl_path, 'a') as f:
+            f.write(json.dumps(make_sample(1))[:20])
+
+        samples = [s for _, s in iter_jsonl(self.jsonl_path)]
+        self.assertEqual(len(samples), 1)
+
+    def test_append_keeps_single_meta(self):
+        with JsonlSampleWriter(self.jsonl_path, self.meta) as writer:
+            writer.write(make_sample(0))
+        with JsonlSampleWriter(self.jsonl_path, self.meta, append=True) as writer:
+            writer.write(make_sample(1))
+
+        with open(self.jsonl_path, 'r') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual([s['id'] for _, s in iter_jsonl(self.jsonl_path)], ['s0', 's1'])
+
+    def test_append_after_crash_drops_partial_line(self):
+        with JsonlSampleWriter(self.jsonl_path, self.meta) as writer:
+            writer.write(make_sample(0))
+        with open(self.jsonl_path, 'a') as f:
+            f.write(json.dumps(make_sample(1))[:40])
+        with JsonlSampleWriter(self.jsonl_path, self.meta, append=True) as writer:
+            writer.write(make_sample(2))
+        self.assertEqual([s['id'] for _, s in iter_jsonl(self.jsonl_path)], ['s0', 's2'])
+
+        # Not even the meta line survived
+        with open(self.jsonl_path, 'w') as f:
+            f.write('{"meta":{"data')
+        with JsonlSampleWriter(self.jsonl_path, self.meta, append=True) as writer:
+            writer.write(make_sample(3))
+        self.assertEqual(read_jsonl_meta(self.jsonl_path), self.meta)
+        self.assertEqual([s['id'] for _, s in iter_jsonl(self.jsonl_path)], ['s3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add parent dir to path to import detection
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from detection import resize_for_detection, landmark_error
+
+
+class TestResizeForDetection(unittest.TestCase):
+    def test_keeps_aspect_ratio(self):
+        image = np.zeros((720, 1280, 3), dtype=np.uint8)
+        small = resize_for_detection(image, 640)
+        self.assertEqual(small.shape, (360, 640, 3))
+
+    def test_never_upscales(self):
+        image = np.zeros((240, 320, 3), dtype=np.uint8)
+        self.assertIs(resize_for_detection(image, 640), image)
+        self.assertIs(resize_for_detection(image, None), image)
+
+
+class TestLandmarkError(unittest.TestCase):
+    def test_pixel_error_uses_full_frame_size(self):
+        reference = [{'x': 0.5, 'y': 0.5, 'z': 0.0}] * 21
+        candidate = [{'x': 0.51, 'y': 0.5, 'z': 0.0}] * 21
+        norm_err, pixel_err = landmark_error(reference, candidate, 1000, 500)
+        self.assertEqual(norm_err.shape, (21,))
+        np.testing.assert_allclose(norm_err, 0.01, atol=1e-9)
+        np.testing.assert_allclose(pixel_err, 10.0, atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add parent dir to path to import evaluate
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from evaluate import label_ids, load_classes
+
+
+class TestLabelIds(unittest.TestCase):
+    def test_ids_follow_saved_class_order(self):
+        # An incrementally trained model: 'apple' was appended after 'zebra'
+        classes = ['zebra', 'apple', 'mango']
+        y_true, y_pred, got = label_ids(['apple', 'zebra', 'apple', 'kiwi'], [1, 0, 2, 1], classes)
+        self.assertEqual(y_true.tolist(), [1, 0, 1])
+        self.assertEqual(y_pred.tolist(), [1, 0, 2])
+        self.assertEqual(got, classes)
+
+    def test_sorted_labels_without_saved_classes(self):
+        y_true, _, classes = label_ids(['b', 'a', 'b'], [1, 0, 1], None)
+        self.assertEqual((y_true.tolist(), classes), ([1, 0, 1], ['a', 'b']))
+
+    def test_load_classes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = os.path.join(tmp, 'model.h5')
+            self.assertIsNone(load_classes(model_path))
+            with open(os.path.join(tmp, 'classes.json'), 'w') as f:
+                json.dump(['zebra', 'apple'], f)
+            self.assertEqual(load_classes(model_path), ['zebra', 'apple'])
+
+
+if __name__ == '__main__':
+    unittest.main()
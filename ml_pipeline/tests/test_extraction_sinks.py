@@ -0,0 +1,87 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import numpy as np
+
+# Add parent dir to path to import extraction_sinks
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extraction_sinks import (CaptureJsonSink, FrameSink, LandmarkShardSink, YoloSink,
+                              detection_stride, safe_label)
+
+
+def make_landmarks(offset=0.0):
+    return [{'x': 0.4 + offset + i * 0.01, 'y': 0.4 + i * 0.01, 'z': 0.0} for i in range(21)]
+
+
+class TestExtractionSinks(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = 'test_extraction_output'
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+        os.makedirs(self.test_dir)
+        self.clip = {'sample_id': 'abcd1234', 'label': 'thank you', 'class_id': 42}
+        self.image = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_sink_without_add_frame_fails_on_construction(self):
+        class Incomplete(FrameSink):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_detection_stride_union(self):
+        wants = detection_stride([LandmarkShardSink(self.test_dir), YoloSink(self.test_dir, [])])
+        wanted = [i for i in range(16) if wants(i)]
+        self.assertEqual(wanted, [0, 3, 5, 6, 9, 10, 12, 15])
+
+    def test_yolo_sink_uses_global_class_id(self):
+        sink = YoloSink(os.path.join(self.test_dir, 'yolo'), ['eat', 'thank you'])
+        sink.begin_clip(self.clip)
+        sink.add_frame(0, self.image, make_landmarks())
+        sink.add_frame(5, self.image, make_landmarks(0.1))
+        self.assertEqual(sink.end_clip(), 2)
+        sink.close()
+
+        label_path = os.path.join(sink.labels_dir, 'abcd1234_1.txt')
+        with open(label_path, 'r') as f:
+            self.assertTrue(f.read().startswith('42 '))
+        self.assertTrue(os.path.exists(os.path.join(sink.images_dir, 'abcd1234_1.jpg')))
+        self.assertTrue(os.path.exists(os.path.join(sink.yolo_dir, 'dataset.yaml')))
+
+    def test_shard_sink_writes_sample_json(self):
+        sink = LandmarkShardSink(os.path.join(self.test_dir, 'shards'))
+        sink.begin_clip(self.clip)
+        sink.add_frame(3, self.image, make_landmarks())
+        self.assertEqual(sink.end_clip(), 1)
+
+        path = os.path.join(self.test_dir, 'shards', safe_label('thank you'), 'abcd1234.json')
+        with open(path, 'r') as f:
+            sample = json.load(f)
+        self.assertEqual(sample['frames'][0]['t'], 99)
+        self.assertTrue(sample['yolo_labels'][0].startswith('42 '))
+
+    def test_capture_sink_dataset_shape(self):
+        output = os.path.join(self.test_dir, 'capture.json')
+        sink = CaptureJsonSink(output)
+        sink.begin_clip(self.clip)
+        sink.add_frame(0, self.image, make_landmarks())
+        sink.end_clip()
+        sink.begin_clip(self.clip)
+        self.assertEqual(sink.end_clip(), 0)
+        sink.close()
+
+        with open(output, 'r') as f:
+            data = json.load(f)
+        self.assertEqual(len(data['samples']), 1)
+        norm = data['samples'][0]['frames'][0]['features']['norm']
+        self.assertEqual(norm[0], {'x': 0.0, 'y': 0.0, 'z': 0.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
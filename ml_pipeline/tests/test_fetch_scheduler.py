@@ -0,0 +1,201 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import cv2
+import numpy as np
+
+# Add parent dir to path to import fetch_scheduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fetch_scheduler import FetchScheduler, LocalDirectoryBackend, clean_url, open_clip, video_id
+
+
+def write_video(path, num_frames, fps=10):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (32, 24))
+    for i in range(num_frames):
+        writer.write(np.full((24, 32, 3), i * 8, dtype=np.uint8))
+    writer.release()
+
+
+def frame_values(cap):
+    values = []
+    while cap.isOpened():
+        success, image = cap.read()
+        if not success:
+            break
+        values.append(int(round(image.mean() / 8)))
+    cap.release()
+    return values
+
+
+class FlakyBackend:
+    """Fails each url `failures` times before succeeding; tracks peak concurrency per host."""
+
+    name = 'flaky'
+
+    def __init__(self, failures=0, permanent_urls=(), delay_s=0.0):
+        self.failures = failures
+        self.permanent_urls = set(permanent_urls)
+        self.delay_s = delay_s
+        self.calls = {}
+        self.active = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def fetch(self, url, start_time, end_time, output_path):
+        host = url.split('/')[2]
+        with self.lock:
+            self.calls[url] = self.calls.get(url, 0) + 1
+            calls = self.calls[url]
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        try:
+            time.sleep(self.delay_s)
+            if url in self.permanent_urls:
+                raise ValueError('Video unavailable')
+            if calls <= self.failures:
+                raise IOError('HTTP Error 503')
+            with open(output_path, 'w') as f:
+                f.write(url)
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+    def permanent(self, error):
+        return isinstance(error, ValueError)
+
+
+class TestFetchScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sleeps = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scheduler(self, backend, **kwargs):
+        scheduler = FetchScheduler(backend, sleep=self.sleeps.append, **kwargs)
+        self.addCleanup(scheduler.close)
+        return scheduler
+
+    def job(self, url, name):
+        return {'url': url, 'start_time': 0, 'end_time': 1, 'output_path': os.path.join(self.tmp.name, name)}
+
+    def test_clean_url_and_video_id(self):
+        self.assertEqual(clean_url('abc123'), 'https://www.youtube.com/watch?v=abc123')
+        self.assertEqual(video_id('www.youtube.com/watch?v=abc123'), 'abc123')
+        self.assertEqual(video_id('https://youtu.be/xyz'), 'xyz')
+
+    def test_retries_with_exponential_backoff(self):
+        backend = FlakyBackend(failures=2)
+        scheduler = self.scheduler(backend, retries=3, backoff_s=1.0, max_backoff_s=3.0)
+        result = scheduler.fetch('https://a.com/v1', 0, 1, os.path.join(self.tmp.name, 'v1.mp4'))
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 3)
+        self.assertEqual(scheduler.retried, 2)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertTrue(1.0 <= self.sleeps[0] <= 1.25)
+        self.assertTrue(2.0 <= self.sleeps[1] <= 2.5)
+        self.assertTrue(3.0 <= scheduler.backoff(5) <= 3.75)
+
+    def test_failure_log_and_permanent_errors(self):
+        log = os.path.join(self.tmp.name, 'failures.jsonl')
+        backend = FlakyBackend(failures=10, permanent_urls={'https://a.com/gone'})
+        scheduler = self.scheduler(backend, retries=2, failure_log=log)
+        jobs = [self.job('https://a.com/gone', 'gone.mp4'), self.job('https://a.com/busy', 'busy.mp4')]
+        results = [result for _, result in scheduler.fetch_iter(jobs)]
+
+        self.assertFalse(any(r.ok for r in results))
+        self.assertEqual(backend.calls, {'https://a.com/gone': 1, 'https://a.com/busy': 3})
+        with open(log) as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([e['url'] for e in entries], ['https://a.com/gone', 'https://a.com/busy'])
+        self.assertEqual([e['attempts'] for e in entries], [1, 3])
+        self.assertIn('503', entries[1]['error'])
+        self.assertEqual(scheduler.failed, 2)
+
+    def test_per_host_limit(self):
+        backend = FlakyBackend(delay_s=0.02)
+        scheduler = self.scheduler(backend, workers=6, per_host=2)
+        jobs = [self.job(f"https://{host}/v{i}", f"{host}{i}.mp4") for i in range(6) for host in ('a.com', 'b.com')]
+        results = [result for _, result in scheduler.fetch_iter(jobs)]
+        self.assertTrue(all(r.ok for r in results))
+        self.assertLessEqual(max(backend.peak.values()), 2)
+        self.assertEqual(scheduler.ok, 12)
+
+    def test_results_in_job_order_and_early_close(self):
+        backend = FlakyBackend(delay_s=0.01)
+        scheduler = self.scheduler(backend, workers=2)
+        jobs = [self.job(f"https://a.com/v{i}", f"v{i}.mp4") for i in range(50)]
+        results = scheduler.fetch_iter(jobs, prefetch=4)
+        seen = []
+        for job, result in results:
+            seen.append(job['url'])
+            with open(result.path) as f:
+                self.assertEqual(f.read(), job['url'])
+            if len(seen) == 3:
+                break
+        results.close()
+        scheduler.close()
+        self.assertEqual(seen, [f"https://a.com/v{i}" for i in range(3)])
+        # Only the prefetch window was ever submitted
+        self.assertLessEqual(len(backend.calls), 7)
+
+    def test_local_directory_backend(self):
+        videos = os.path.join(self.tmp.name, 'videos')
+        os.makedirs(videos)
+        with open(os.path.join(videos, 'abc123.mp4'), 'wb') as f:
+            f.write(b'video')
+        scheduler = self.scheduler(LocalDirectoryBackend(videos), retries=3)
+        jobs = [self.job(clean_url('abc123'), 'out1.mp4'), self.job(clean_url('missing'), 'out2.mp4')]
+        (_, found), (_, missing) = scheduler.fetch_iter(jobs)
+        self.assertTrue(found.ok)
+        with open(found.path, 'rb') as f:
+            self.assertEqual(f.read(), b'video')
+        self.assertFalse(missing.ok)
+        self.assertEqual(missing.attempts, 1)  # a missing file is not retried
+        self.assertEqual(scheduler.bytes, 5)
+
+    def test_open_clip_seeks_to_segment(self):
+        path = os.path.join(self.tmp.name, 'source.avi')
+        write_video(path, 30)
+        self.assertEqual(frame_values(open_clip(path, (1.0, 1.5))), [10, 11, 12, 13, 14])
+        self.assertEqual(frame_values(open_clip(path, (2.5, None))), [25, 26, 27, 28, 29])
+        self.assertEqual(len(frame_values(open_clip(path))), 30)
+
+    def test_whole_sources_fetched_once(self):
+        videos = os.path.join(self.tmp.name, 'videos')
+        os.makedirs(videos)
+        write_video(os.path.join(videos, 'aaa.avi'), 30)
+        write_video(os.path.join(videos, 'bbb.avi'), 30)
+        backend = LocalDirectoryBackend(videos)
+        calls = []
+        fetch = backend.fetch
+        backend.fetch = lambda url, start, end, path: calls.append((url, start)) or fetch(url, start, end, path)
+        scheduler = self.scheduler(backend, whole_sources=True)
+
+        clips = [('aaa', 0.0, 0.5), ('bbb', 1.0, 1.2), ('aaa', 2.0, 2.3)]
+        jobs = [{'url': clean_url(vid), 'start_time': s, 'end_time': e,
+                 'output_path': os.path.join(self.tmp.name, f"clip{i}.mp4"), 'i': i}
+                for i, (vid, s, e) in enumerate(clips)]
+        seen = []
+        for job, result in scheduler.fetch_iter(jobs):
+            self.assertTrue(result.ok)
+            seen.append((job['i'], frame_values(open_clip(result.path, result.segment))))
+            scheduler.release(result)
+            if job['i'] == 0:
+                self.assertTrue(os.path.exists(result.path))  # clip 2 still needs it
+            else:
+                self.assertFalse(os.path.exists(result.path))
+
+        # Grouped by source, each downloaded once and in full
+        self.assertEqual(seen, [(0, [0, 1, 2, 3, 4]), (2, [20, 21, 22]), (1, [10, 11])])
+        self.assertEqual(sorted(calls), [(clean_url('aaa'), None), (clean_url('bbb'), None)])
+        self.assertIn('3 clips from 2 sources', scheduler.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
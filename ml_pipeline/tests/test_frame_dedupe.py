@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add parent dir to path to import frame_dedupe
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_dedupe import FrameDeduper, dhash, hamming
+
+
+def make_hand(offset=0.0, curl=0.0):
+    rng = np.random.default_rng(0)
+    points = 0.3 + 0.2 * rng.random((21, 3))
+    points[9] = points[0] + [0.0, -0.1, 0.0]
+    points[8] += curl
+    points[:, :2] += offset
+    return [{'x': float(p[0]), 'y': float(p[1]), 'z': float(p[2])} for p in points]
+
+
+class TestFrameDeduper(unittest.TestCase):
+    def test_drops_held_pose(self):
+        deduper = FrameDeduper()
+        self.assertTrue(deduper.keep(make_hand()))
+        self.assertFalse(deduper.keep(make_hand(offset=0.001)))
+        self.assertEqual((deduper.seen, deduper.kept, deduper.dropped), (2, 1, 1))
+
+    def test_keeps_moved_or_changed_hand(self):
+        deduper = FrameDeduper()
+        self.assertTrue(deduper.keep(make_hand()))
+        # Same pose, different box
+        self.assertTrue(deduper.keep(make_hand(offset=0.1)))
+        # Same box, different finger configuration
+        self.assertTrue(deduper.keep(make_hand(curl=-0.05)))
+
+    def test_clips_are_independent(self):
+        deduper = FrameDeduper()
+        deduper.keep(make_hand())
+        deduper.begin_clip()
+        self.assertTrue(deduper.keep(make_hand()))
+        self.assertIn("kept 2 of 2 frames from 2 clips", deduper.report())
+
+    def test_hash_keeps_different_images(self):
+        rng = np.random.default_rng(1)
+        image_a = rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)
+        image_b = rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)
+        self.assertEqual(hamming(dhash(image_a), dhash(image_a.copy())), 0)
+
+        deduper = FrameDeduper(hash_threshold=6)
+        self.assertTrue(deduper.keep(make_hand(), image_a))
+        self.assertTrue(deduper.keep(make_hand(), image_b))
+        self.assertFalse(deduper.keep(make_hand(), image_a.copy()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import numpy as np
+
+# Add parent dir to path to import generate_dummy_data
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate_dummy_data import (BONE_LENGTHS, class_prototypes, generate_chunk,
+                                 hand_skeleton, plan_samples, write_json, write_npz)
+from dataset_io import read_binary_dataset
+
+
+class TestSyntheticGenerator(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = 'test_generator_output'
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+        os.makedirs(self.test_dir)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_bone_lengths_preserved(self):
+        rng = np.random.default_rng(1)
+        hands = hand_skeleton(rng.uniform(0, 1.5, (50, 5, 3)), rng.uniform(-0.2, 0.2, (50, 5)))
+        for f in range(5):
+            chain = hands[:, 1 + 4 * f: 5 + 4 * f]
+            bones = np.linalg.norm(np.diff(chain, axis=1), axis=-1)
+            np.testing.assert_allclose(bones, np.broadcast_to(BONE_LENGTHS[f], bones.shape), atol=1e-5)
+        np.testing.assert_allclose(np.linalg.norm(hands[:, 9] - hands[:, 0], axis=-1), 1.0, atol=1e-6)
+
+    def test_dynamic_trajectories_are_smooth(self):
+        rng = np.random.default_rng(2)
+        protos = class_prototypes(rng, 3)
+        labels, dynamic, lengths = plan_samples(rng, 3, 4, 30, 0, 'dynamic')
+        landmarks, t = generate_chunk(rng, protos, labels, dynamic, lengths, noise=0.0)
+        self.assertEqual(landmarks.shape, (12 * 30, 21, 3))
+        steps = np.abs(np.diff(landmarks.reshape(12, 30, 21, 3), axis=1)).max()
+        self.assertLess(steps, 0.05)
+        self.assertEqual(t[29], 29 * 33)
+
+    def test_seeded_outputs(self):
+        def run(path, writer, seed):
+            rng = np.random.default_rng(seed)
+            protos = class_prototypes(rng, 2)
+            labels, dynamic, lengths = plan_samples(rng, 2, 3, 5, 2, 'mixed')
+            writer(path, rng, protos, ['A', 'B'], labels, dynamic, lengths, {"dataset": "t"})
+            return lengths
+
+        json_a, json_b = (os.path.join(self.test_dir, n) for n in ('a.json', 'b.json'))
+        run(json_a, write_json, 7)
+        run(json_b, write_json, 7)
+        with open(json_a, 'rb') as fa, open(json_b, 'rb') as fb:
+            self.assertEqual(fa.read(), fb.read())
+        with open(json_a, 'r') as f:
+            data = json.load(f)
+        self.assertEqual(len(data['samples']), 6)
+        self.assertEqual(len(data['samples'][0]['frames'][0]['features']['norm']), 21)
+
+        npz = os.path.join(self.test_dir, 'a.npz')
+        lengths = run(npz, write_npz, 7)
+        dataset = read_binary_dataset(npz)
+        self.assertEqual(dataset['landmarks'].shape, (lengths.sum(), 21, 3))
+        self.assertEqual(list(np.diff(dataset['sample_offsets'])), list(lengths))
+        self.assertEqual(dataset['classes'], ['A', 'B'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add parent dir to path to import hand_features
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hand_features import capture_finger_states, extract_features, joint_angles
+from utils_landmarks import normalize_landmarks
+
+# Four poses (open hand, fist, two fingers up, mixed) from the synthetic
+# generator, rounded to 4 decimals. Expected values were produced by running
+# src/features/HandFeatures.ts on exactly these inputs.
+LANDMARKS = [
+    [
+        [0.5, 0.6, 0.0], [0.53, 0.58, 0.0], [0.5645, 0.5511, 0.0], [0.5913, 0.5286, 0.0],
+        [0.6143, 0.5093, 0.0], [0.53, 0.505, 0.0], [0.5363, 0.4604, 0.0], [0.54, 0.4337, 0.0],
+        [0.5431, 0.4119, 0.0], [0.5, 0.5, 0.0], [0.5, 0.45, 0.0], [0.5, 0.42, 0.0],
+        [0.5, 0.396, 0.0], [0.475, 0.508, 0.0], [0.4686, 0.4624, 0.0], [0.4647, 0.4347, 0.0],
+        [0.4616, 0.4129, 0.0], [0.452, 0.52, 0.0], [0.4421, 0.4854, 0.0], [0.436, 0.4642, 0.0],
+        [0.4305, 0.445, 0.0],
+    ],
+    [
+        [0.4, 0.5, 0.0], [0.438, 0.4802, 0.0061], [0.4522, 0.4571, -0.0406], [0.4254, 0.4672, -0.0714],
+        [0.3993, 0.4889, -0.0593], [0.452, 0.3929, -0.011], [0.4712, 0.3858, -0.061], [0.4702, 0.4134, -0.078],
+        [0.4602, 0.4332, -0.0636], [0.4188, 0.3837, -0.0228], [0.4372, 0.3753, -0.0793], [0.4395, 0.4065, -0.097],
+        [0.4321, 0.4287, -0.0802], [0.3887, 0.3901, -0.0298], [0.403, 0.3823, -0.0826], [0.4085, 0.4116, -0.0981],
+        [0.4049, 0.432, -0.0818], [0.3602, 0.4015, -0.0352], [0.3693, 0.3956, -0.0771], [0.3763, 0.4183, -0.0886],
+        [0.3758, 0.4365, -0.073],
+    ],
+    [
+        [0.6, 0.55, 0.0], [0.6297, 0.5404, -0.0089], [0.6613, 0.5195, -0.0232], [0.6612, 0.4953, -0.0434],
+        [0.64, 0.4835, -0.0553], [0.6521, 0.4771, -0.0027], [0.6736, 0.4431, -0.0073], [0.6855, 0.4225, -0.0123],
+        [0.6948, 0.4057, -0.0172], [0.6298, 0.4655, 0.0083], [0.6391, 0.4215, 0.01], [0.6437, 0.3949, 0.0085],
+        [0.6469, 0.3737, 0.0064], [0.6076, 0.4661, 0.0164], [0.5963, 0.447, -0.0186], [0.588, 0.4668, -0.0318],
+        [0.5873, 0.4858, -0.0263], [0.5858, 0.4706, 0.0234], [0.5759, 0.4556, -0.0035], [0.5716, 0.4713, -0.0147],
+        [0.5731, 0.4888, -0.0106],
+    ],
+    [
+        [0.45, 0.7, 0.0], [0.4703, 0.6704, -0.0169], [0.4831, 0.6367, -0.0508], [0.4885, 0.6145, -0.0818],
+        [0.491, 0.5976, -0.11], [0.4349, 0.6068, -0.0557], [0.4234, 0.5877, -0.0998], [0.4218, 0.5958, -0.1284],
+        [0.4233, 0.6105, -0.1475], [0.4028, 0.6152, -0.0517], [0.3799, 0.5792, -0.0864], [0.3679, 0.5649, -0.1136],
+        [0.3596, 0.558, -0.1377], [0.3817, 0.6324, -0.0421], [0.3678, 0.6347, -0.0907], [0.377, 0.6593, -0.1067],
+        [0.3901, 0.679, -0.1014], [0.3645, 0.6523, -0.0309], [0.3386, 0.6292, -0.0499], [0.323, 0.6166, -0.0634],
+        [0.3093, 0.6065, -0.0774],
+    ],
+]
+EXPECTED_SCALE = [0.1, 0.119996, 0.089984, 0.109963]
+EXPECTED_NORMAL = [
+    [0, 0, -1],
+    [0.268064, 0.226332, -0.936438],
+    [-0.340357, -0.209293, -0.916708],
+    [0.026456, 0.509664, -0.859967],
+]
+EXPECTED_CURL = [
+    [7.9e-05, 0.000454, 0, 0.00046, 0.000408],
+    [0.382694, 0.762536, 0.75986, 0.75712, 0.779485],
+    [0.28718, 0.053807, 0.053441, 0.790072, 0.80523],
+    [0.033036, 0.386828, 0.171231, 0.638624, 0.065766],
+]
+EXPECTED_EXTENDED = [
+    [True, True, True, True, True],
+    [False, False, False, False, False],
+    [False, True, True, False, False],
+    [True, True, True, False, True],
+]
+
+
+class TestHandFeaturesParity(unittest.TestCase):
+    def setUp(self):
+        self.features = extract_features(np.array(LANDMARKS))
+
+    def test_matches_typescript(self):
+        f = self.features
+        np.testing.assert_allclose(f['hand_scale'], EXPECTED_SCALE, atol=1e-5)
+        np.testing.assert_allclose(f['palm_normal'], EXPECTED_NORMAL, atol=1e-5)
+        np.testing.assert_allclose(f['curl'], EXPECTED_CURL, atol=1e-3)
+        np.testing.assert_array_equal(f['extended'], EXPECTED_EXTENDED)
+
+    def test_norm_matches_dict_version(self):
+        frame = [{'x': p[0], 'y': p[1], 'z': p[2]} for p in LANDMARKS[2]]
+        expected = [[lm['x'], lm['y'], lm['z']] for lm in normalize_landmarks(frame)]
+        np.testing.assert_allclose(self.features['norm'][2], expected, atol=1e-5)
+
+    def test_shapes_and_capture_records(self):
+        f = self.features
+        self.assertEqual(f['angles'].shape, (4, 5, 3))
+        # Open hand: every joint close to straight
+        self.assertTrue((f['angles'][0] > 160).all())
+        states = capture_finger_states(f['extended'])
+        self.assertEqual(states[1], {name: 'curled' for name in ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']})
+        self.assertEqual(states[2]['Index'], 'extended')
+
+    def test_degenerate_vectors(self):
+        zero = np.zeros(3)
+        self.assertEqual(joint_angles(zero, zero, np.ones(3)), 0.0)
+        f = extract_features(np.zeros((2, 21, 3)))
+        self.assertFalse(np.isnan(f['curl']).any())
+        np.testing.assert_array_equal(f['palm_normal'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
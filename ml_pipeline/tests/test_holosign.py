@@ -0,0 +1,51 @@
+import unittest
+import os
+import subprocess
+import sys
+
+# Add parent dir to path to import holosign
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PIPELINE_DIR)
+from holosign import COMMANDS, ImportTimer
+
+LAZY_CHECK = """
+import sys
+import holosign
+try:
+    holosign.main({argv!r})
+except SystemExit:
+    pass
+heavy = [m for m in ('tensorflow', 'sklearn', 'mediapipe', 'ultralytics', 'yt_dlp') if m in sys.modules]
+print('HEAVY=' + ','.join(heavy))
+"""
+
+
+def heavy_modules_after(argv):
+    result = subprocess.run([sys.executable, '-c', LAZY_CHECK.format(argv=argv)], cwd=PIPELINE_DIR,
+                            capture_output=True, text=True, timeout=120)
+    line = [l for l in result.stdout.splitlines() if l.startswith('HEAVY=')][-1]
+    return [m for m in line[len('HEAVY='):].split(',') if m]
+
+
+class TestHolosign(unittest.TestCase):
+    def test_help_imports_nothing_heavy(self):
+        for argv in (['--help'], ['analyze', '--help'], ['train', 'static', '--help'],
+                     ['train', 'dynamic', '--help'], ['evaluate', '--help'], ['extract', '--help'],
+                     ['export', '--help'], ['sweep', '--help']):
+            self.assertEqual(heavy_modules_after(argv), [], argv)
+
+    def test_command_modules_exist(self):
+        for entry in COMMANDS.values():
+            for module, _ in (entry.values() if isinstance(entry, dict) else [entry]):
+                self.assertTrue(os.path.exists(os.path.join(PIPELINE_DIR, module + '.py')), module)
+
+    def test_import_timer_records_watched_packages(self):
+        sys.modules.pop('wave', None)
+        with ImportTimer(packages=('wave',)) as timer:
+            import wave
+        self.assertIn('wave', timer.times)
+        self.assertIsNone(timer.times['wave'][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
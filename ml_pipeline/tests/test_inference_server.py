@@ -0,0 +1,99 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import numpy as np
+
+# Add parent dir to path to import inference_server
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference_server import (InferenceServer, MAX_BODY_BYTES, MicroBatcher, WINDOW_SIZE, bucket_size,
+                              parse_dynamic, parse_static)
+
+
+def fake_predict(batch):
+    # Two "classes": the mean of the input and its negation
+    flat = batch.reshape(len(batch), -1).mean(axis=1)
+    return np.stack([flat, -flat], axis=1)
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_coalesces_concurrent_requests(self):
+        async def run():
+            batcher = MicroBatcher(fake_predict, max_batch=8, max_wait_ms=50)
+            batcher.start()
+            results = await asyncio.gather(*(batcher.submit(np.full(3, i, dtype=np.float32)) for i in range(20)))
+            await batcher.stop()
+            return batcher, results
+
+        batcher, results = asyncio.run(run())
+        self.assertEqual([r[0] for r in results], list(range(20)))
+        self.assertEqual(batcher.requests, 20)
+        self.assertEqual(batcher.batches, 3)  # 8 + 8 + 4
+        self.assertEqual(batcher.stats()['mean_batch'], 20 / 3)
+
+    def test_deadline_flushes_partial_batch(self):
+        async def run():
+            batcher = MicroBatcher(fake_predict, max_batch=64, max_wait_ms=1)
+            batcher.start()
+            result = await asyncio.wait_for(batcher.submit(np.ones(3, dtype=np.float32)), 1.0)
+            await batcher.stop()
+            return result
+
+        self.assertEqual(asyncio.run(run())[0], 1.0)
+
+    def test_bucket_size(self):
+        self.assertEqual([bucket_size(n, 64) for n in (1, 3, 8, 9, 64)], [1, 4, 8, 16, 64])
+
+
+class TestParsing(unittest.TestCase):
+    def test_static_and_dynamic_inputs(self):
+        landmarks = [{'x': i * 0.01, 'y': 0.5, 'z': 0.0} for i in range(21)]
+        self.assertEqual(parse_static({'landmarks': landmarks}).shape, (63,))
+        window = parse_dynamic({'window': [[0.0] * 62 + [float(i)] for i in range(5)]})
+        self.assertEqual(window.shape, (WINDOW_SIZE, 63))
+        self.assertEqual(window[-1, -1], 4.0)  # padded with the last frame
+        with self.assertRaises(ValueError):
+            parse_static({'vector': [0.0] * 10})
+
+
+class TestHttp(unittest.TestCase):
+    def test_predict_and_stats(self):
+        async def request(port, method, path, body=None, length=None):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            data = json.dumps(body).encode() if body is not None else b''
+            length = len(data) if length is None else length
+            writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            head, _, payload = response.partition(b'\r\n\r\n')
+            return int(head.split()[1]), json.loads(payload)
+
+        async def run():
+            server = InferenceServer({'static': MicroBatcher(fake_predict, max_wait_ms=2)},
+                                     {'static': ['POS', 'NEG']})
+            tcp = await server.start('127.0.0.1', 0)
+            port = tcp.sockets[0].getsockname()[1]
+            ok = await request(port, 'POST', '/predict/static', {'vector': [1.0] * 63})
+            missing = await request(port, 'POST', '/predict/dynamic', {'window': [[0.0] * 63]})
+            bad = await request(port, 'POST', '/predict/static', {'vector': [1.0]})
+            stats = await request(port, 'GET', '/stats')
+            lengths = [(await request(port, 'POST', '/predict/static', length=length))[0]
+                       for length in ('abc', -5, MAX_BODY_BYTES + 1)]
+            tcp.close()
+            await tcp.wait_closed()
+            await server.stop()
+            return ok, missing, bad, stats, lengths
+
+        ok, missing, bad, stats, lengths = asyncio.run(run())
+        self.assertEqual(ok[0], 200)
+        self.assertEqual(ok[1]['label'], 'POS')
+        self.assertEqual(missing[0], 503)
+        self.assertEqual(bad[0], 400)
+        self.assertEqual(stats[1]['models']['static']['requests'], 1)
+        self.assertEqual(lengths, [400, 400, 413])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+# Add parent dir to path to import numpy_mlp
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from numpy_mlp import NumpyMLP, export_mlp, is_current, weights_path
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestNumpyMLP(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'model.npz')
+        self.X = np.random.default_rng(0).normal(size=(64, 63)).astype(np.float32)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parity_with_keras(self):
+        from train_static import create_model, expand_output_layer
+        model = create_model(5)
+        # Move the biases off zero so they are exercised too
+        for layer in model.layers:
+            weights = layer.get_weights()
+            if weights:
+                layer.set_weights([weights[0], np.random.default_rng(1).normal(size=weights[1].shape)])
+        for keras_model in (model, expand_output_layer(model, 7)):
+            export_mlp(keras_model, self.path, classes=[f"C{i}" for i in range(keras_model.output_shape[-1])])
+            mlp = NumpyMLP.load(self.path)
+            expected = keras_model.predict(self.X, verbose=0)
+            np.testing.assert_allclose(mlp.predict(self.X), expected, rtol=1e-5, atol=1e-6)
+            np.testing.assert_allclose(mlp.predict(self.X[0]), expected[:1], rtol=1e-5, atol=1e-6)
+            self.assertEqual(mlp.classes[-1], f"C{keras_model.output_shape[-1] - 1}")
+        self.assertEqual(mlp.activations, ['relu', 'relu', 'softmax'])
+
+    def test_rejects_non_dense_models(self):
+        from train_dynamic import create_model
+        with self.assertRaises(ValueError):
+            export_mlp(create_model(3), self.path)
+
+    def test_softmax_is_stable(self):
+        mlp = NumpyMLP([np.eye(2, dtype=np.float32)], [np.zeros(2, np.float32)], ['softmax'], ['a', 'b'])
+        probs = mlp.predict(np.array([[1000.0, 0.0], [0.0, 0.0]]))
+        np.testing.assert_allclose(probs, [[1.0, 0.0], [0.5, 0.5]])
+
+    def test_is_current(self):
+        model_dir = self.tmp.name
+        h5 = os.path.join(model_dir, 'model.h5')
+        self.assertFalse(is_current(model_dir))
+        open(weights_path(model_dir), 'w').close()
+        self.assertTrue(is_current(model_dir))
+        open(h5, 'w').close()
+        os.utime(weights_path(model_dir), (0, 0))
+        self.assertFalse(is_current(model_dir))
+
+    def test_import_does_not_load_tensorflow(self):
+        code = "import sys, numpy_mlp; print('tensorflow' in sys.modules)"
+        out = subprocess.run([sys.executable, '-c', code], cwd=PIPELINE_DIR, capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import os
+import sys
+import time
+import numpy as np
+
+# Add parent dir to path to import parallel_detect
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tracing
+from tracing import Tracer
+from parallel_detect import FrameRing, ParallelDetector, decoded_frames
+
+
+# Module level so the spawned workers can unpickle them
+def fake_detector():
+    return {'threshold': 100}
+
+
+def fake_detect(detector, image, max_dim=None, tracer=tracing.NULL_TRACER):
+    """A 'hand' wherever the frame is bright enough; its landmark carries the frame's mean and size."""
+    with tracer.span(tracing.DETECT):
+        mean = float(image.mean())
+    if mean < detector['threshold']:
+        return None
+    return [{'x': mean, 'y': float(image.shape[0]), 'z': float(image.shape[1])}]
+
+
+def failing_detect(detector, image, max_dim=None, tracer=tracing.NULL_TRACER):
+    raise ValueError('bad frame')
+
+
+def fail_on_marked(detector, image, max_dim=None, tracer=tracing.NULL_TRACER):
+    """Fails only on frames whose first pixel is 7."""
+    if image[0, 0, 0] == 7:
+        raise ValueError('bad frame')
+    return fake_detect(detector, image, max_dim, tracer)
+
+
+def clip(count, shape=(24, 32, 3), seed=0):
+    rng = np.random.default_rng(seed)
+    return [(i * 3, rng.integers(0, 256, shape, dtype=np.uint8)) for i in range(count)]
+
+
+class FakeCapture:
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.pos = 0
+        self.grabbed = 0
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        self.grabbed += 1
+        self.pos += 1
+        return self.pos <= len(self.frames)
+
+    def read(self):
+        if self.pos >= len(self.frames):
+            return False, None
+        self.pos += 1
+        return True, self.frames[self.pos - 1]
+
+
+class TestFrameRing(unittest.TestCase):
+    def test_views_share_memory(self):
+        ring = FrameRing(2, 24 * 32 * 3)
+        try:
+            image = np.arange(24 * 32 * 3, dtype=np.uint8).reshape(24, 32, 3)
+            ring.put(1, image)
+            worker_side = FrameRing.attach(ring.spec)
+            np.testing.assert_array_equal(worker_side.view(1, image.shape), image)
+            # Writes through one mapping are seen by the other
+            ring.view(1, image.shape)[0, 0, 0] = 255
+            self.assertEqual(worker_side.view(1, image.shape)[0, 0, 0], 255)
+            worker_side.close()
+            with self.assertRaises(ValueError):
+                ring.put(0, np.zeros((25, 32, 3), np.uint8))
+        finally:
+            ring.close()
+
+
+class TestParallelDetector(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tracer = Tracer()
+        cls.detector = ParallelDetector(2, slots=3, detector_factory=fake_detector, detect=fake_detect,
+                                        tracer=cls.tracer)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.detector.close()
+
+    def expected(self, frames):
+        return [(idx, fake_detect(fake_detector(), image)) for idx, image in frames]
+
+    def test_results_are_in_frame_order(self):
+        frames = clip(40)
+        results = [(idx, image.copy(), landmarks) for idx, image, landmarks in self.detector.detect(iter(frames))]
+        self.assertEqual([(idx, landmarks) for idx, _, landmarks in results], self.expected(frames))
+        for (_, image, _), (_, original) in zip(results, frames):
+            np.testing.assert_array_equal(image, original)
+        self.assertGreaterEqual(self.tracer.counters[tracing.FRAMES_DETECTED], 40)
+        self.assertIn(tracing.DETECT, self.tracer.stages)
+
+    def test_larger_frames_and_abandoned_clips(self):
+        small, large = clip(5, seed=1), clip(7, shape=(48, 64, 3), seed=2)
+        for idx, image, landmarks in self.detector.detect(iter(small)):
+            if idx == 3:
+                break  # frames still in flight must not leak into the next clip
+        got = [(idx, landmarks) for idx, _, landmarks in self.detector.detect(iter(large + small))]
+        self.assertEqual(got, self.expected(large + small))
+        self.assertEqual(list(self.detector.detect(iter([]))), [])
+
+    def test_worker_errors_are_raised(self):
+        with ParallelDetector(1, detector_factory=fake_detector, detect=failing_detect) as detector:
+            with self.assertRaises(RuntimeError):
+                list(detector.detect(iter(clip(3))))
+
+    def test_single_failed_frame_is_raised_and_detector_recovers(self):
+        frames = clip(4)
+        frames[1][1][0, 0, 0] = 7
+        for frame in frames[:1] + frames[2:]:
+            frame[1][0, 0, 0] = 0
+        with ParallelDetector(2, detector_factory=fake_detector, detect=fail_on_marked) as detector:
+            start = time.monotonic()
+            with self.assertRaises(RuntimeError):
+                list(detector.detect(iter(frames)))
+            self.assertLess(time.monotonic() - start, 10)
+            # The failed clip's frames do not leak into the next one
+            good = clip(6, seed=3)
+            for _, image in good:
+                image[0, 0, 0] = 0
+            got = [(idx, landmarks) for idx, _, landmarks in detector.detect(iter(good))]
+            self.assertEqual(got, self.expected(good))
+
+
+class TestDecodedFrames(unittest.TestCase):
+    def test_unwanted_frames_are_only_grabbed(self):
+        frames = [np.full((2, 2, 3), i, np.uint8) for i in range(7)]
+        cap = FakeCapture(frames)
+        got = [(idx, int(image[0, 0, 0])) for idx, image in decoded_frames(cap, lambda i: i % 3 == 0)]
+        self.assertEqual(got, [(0, 0), (3, 3), (6, 6)])
+        # Frames 1, 2, 4, 5 and the end of the stream
+        self.assertEqual(cap.grabbed, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add parent dir to path to import process_msasl
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset_io import JsonlSampleWriter
+from process_msasl import written_keys
+from work_shards import clip_key
+
+
+class TestResume(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'out.partial.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_written_keys_survive_a_crash(self):
+        self.assertEqual(written_keys(self.path), set())
+        sources = [{'url': 'https://www.youtube.com/watch?v=abc123', 'start_time': 1.0, 'end_time': 2.5},
+                   {'url': 'www.youtube.com/watch?v=def456', 'start_time': 0.0, 'end_time': 1.0}]
+        with JsonlSampleWriter(self.path, {'dataset': 'test'}) as writer:
+            writer.write({'id': 'a', 'label': 'hello', 'frames': [], 'source': sources[0]})
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'id': 'b', 'label': 'hello', 'frames': [], 'source': sources[1]})[:30])
+
+        # The MS-ASL item, with the url spelled as in MSASL_train.json
+        item = {'url': 'www.youtube.com/watch?v=abc123', 'start_time': 1.0, 'end_time': 2.5}
+        self.assertEqual(written_keys(self.path), {clip_key(item)})
+        with JsonlSampleWriter(self.path, {'dataset': 'test'}, append=True) as writer:
+            writer.write({'id': 'b', 'label': 'hello', 'frames': [], 'source': sources[1]})
+        self.assertEqual(written_keys(self.path), {clip_key(s) for s in sources})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import numpy as np
+
+# Add parent dir to path to import shard_writer
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import shard_writer
+from shard_writer import ShardWriter, encode_record
+
+
+class TestShardWriter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = 'test_shard_writer_output'
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+        os.makedirs(os.path.join(self.test_dir, 'apple', 'images'))
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_compact_reduced_precision(self):
+        record = {'frames': [{'t': 0, 'landmarks': [{'x': 0.123456789, 'y': 1.0, 'z': -0.5}]}]}
+        encoded = encode_record(record, precision=4)
+        self.assertNotIn(b' ', encoded)
+        self.assertEqual(json.loads(encoded)['frames'][0]['landmarks'][0]['x'], 0.1235)
+
+    def test_background_writes_are_complete_after_close(self):
+        writer = ShardWriter(jpeg_workers=2, batch_size=4)
+        shard = os.path.join(self.test_dir, 'apple')
+        image = np.full((32, 32, 3), 128, dtype=np.uint8)
+        for i in range(10):
+            writer.write_image(os.path.join(shard, 'images', f's_{i}.jpg'), image)
+            writer.write_record(os.path.join(shard, f's_{i}.json'), {'id': f's_{i}', 'frames': []})
+        writer.sync_shard(shard)
+        writer.close()
+
+        self.assertEqual(writer.errors, [])
+        self.assertEqual(writer.files_written, 20)
+        self.assertEqual(len(os.listdir(os.path.join(shard, 'images'))), 10)
+        with open(os.path.join(shard, 's_9.json'), 'r') as f:
+            self.assertEqual(json.load(f)['id'], 's_9')
+
+    def test_one_sync_per_shard(self):
+        calls = []
+        original = shard_writer._SYNCFS
+        shard_writer._SYNCFS = lambda fd: calls.append(fd) or 0
+        try:
+            writer = ShardWriter(jpeg_workers=2)
+            shard = os.path.join(self.test_dir, 'apple')
+            for i in range(5):
+                writer.write_image(os.path.join(shard, 'images', f's_{i}.jpg'), np.zeros((8, 8, 3), np.uint8))
+                writer.write_record(os.path.join(shard, f's_{i}.json'), {'id': f's_{i}'})
+            writer.sync_shard(shard)
+            self.assertEqual(len(calls), 1)
+            # Nothing new was written, so closing syncs nothing more
+            writer.close()
+            self.assertEqual(len(calls), 1)
+        finally:
+            shard_writer._SYNCFS = original
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add parent dir to path to import smoothing
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smoothing import confidence_params, one_euro, smooth_landmarks, smooth_ragged, smoothed_norm_samples
+
+# One value stream through OneEuroFilter from src/tracking/Smoothing.ts, with a
+# duplicate timestamp (dt = 0). FIXED uses new OneEuroFilter(1.0, 1.0);
+# ADAPTIVE calls setParams per frame from SCORE like LandmarkSmoother.
+T = [0, 33, 66, 66, 100, 133, 170, 200, 233, 266]
+X = [0.5, 0.52, 0.55, 0.6, 0.58, 0.61, 0.7, 0.69, 0.71, 0.705]
+SCORE = [0.9, 0.9, 0.7, 0.7, 0.3, 0.95, 0.6, 0.85, 0.2, 0.9]
+FIXED = [0.5, 0.5037256290633029, 0.5137107115952161, 0.5137107115952161, 0.5306962650727042,
+         0.5532788283830006, 0.6071344947323531, 0.635053441438387, 0.6625478901526316, 0.6778101995530611]
+ADAPTIVE = [0.5, 0.5059467214422811, 0.5123180949983568, 0.5123180949983568, 0.5137421884394164,
+            0.5807795325694035, 0.6176302097264387, 0.6726400347646448, 0.6734101184063879, 0.6973531610530803]
+
+
+class TestOneEuroParity(unittest.TestCase):
+    def test_fixed_params(self):
+        out = one_euro(np.array([X]), np.array([T]))
+        np.testing.assert_allclose(out[0], FIXED, rtol=1e-12)
+
+    def test_confidence_params(self):
+        min_cutoff, beta = confidence_params(np.array([SCORE]))
+        out = one_euro(np.array([X]), np.array([T]), min_cutoff, beta)
+        np.testing.assert_allclose(out[0], ADAPTIVE, rtol=1e-12)
+
+    def test_every_landmark_filtered_independently(self):
+        seq = np.tile(np.array(X)[:, None, None], (1, 21, 3)) * np.arange(1, 4)
+        out = smooth_landmarks(seq, T, SCORE)
+        self.assertEqual(out.shape, (10, 21, 3))
+        np.testing.assert_allclose(out[:, 7, 0], ADAPTIVE, rtol=1e-12)
+        # The cutoff depends on speed, so a scaled stream is not a scaled output
+        min_cutoff, beta = confidence_params(np.array([SCORE]))
+        scaled = one_euro(np.array([X]) * 3, np.array([T]), min_cutoff, beta)[0]
+        np.testing.assert_allclose(out[:, 7, 2], scaled, rtol=1e-12)
+
+
+class TestBatches(unittest.TestCase):
+    def test_ragged_matches_per_sample(self):
+        rng = np.random.default_rng(0)
+        lengths = [4, 7, 1]
+        raw = rng.random((sum(lengths), 21, 3))
+        t = np.concatenate([np.arange(n) * 33 for n in lengths])
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        out = smooth_ragged(raw, t, offsets)
+        for i in range(len(lengths)):
+            frames = slice(offsets[i], offsets[i + 1])
+            np.testing.assert_allclose(out[frames], smooth_landmarks(raw[frames], t[frames]), rtol=1e-12)
+
+    def test_gap_restarts_filter(self):
+        seq = np.zeros((3, 21, 3))
+        seq[2] = 1.0
+        out = smooth_landmarks(seq, [0, 33, 1000])
+        np.testing.assert_array_equal(out[2], 1.0)
+
+    def test_capture_samples(self):
+        frame = {'t': 0, 'score': 0.9, 'landmarks': [{'x': i * 0.01, 'y': 0.5, 'z': 0.0} for i in range(21)]}
+        samples = [{'frames': [frame, dict(frame, t=33)]}, {'frames': [{'landmarks': []}]}]
+        norm = smoothed_norm_samples(samples)
+        self.assertEqual([n.shape for n in norm], [(2, 21, 3), (0, 21, 3)])
+        np.testing.assert_allclose(norm[0][0, 9], [1.0, 0.0, 0.0], atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add parent dir to path to import streaming_recognizer
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from streaming_recognizer import VECTOR_SIZE, Debouncer, FrameRing, StreamingRecognizer
+
+CLASSES = ['HELLO', 'IDLE_OPEN', 'THANKS']
+
+
+def fake_predict(batch):
+    # Class index is encoded in the first value of the newest frame
+    cls = np.rint(batch[:, -1, 0]).astype(int)
+    probs = np.full((len(batch), len(CLASSES)), 0.05, dtype=np.float32)
+    probs[np.arange(len(batch)), cls] = 0.9
+    return probs
+
+
+def make_stream(segments):
+    """Concatenated runs of frames whose first value is the class index."""
+    vectors = np.concatenate([np.full((n, VECTOR_SIZE), cls, dtype=np.float32) for cls, n in segments])
+    return vectors + np.random.default_rng(0).normal(0, 0.01, vectors.shape).astype(np.float32)
+
+
+class TestFrameRing(unittest.TestCase):
+    def test_window_is_last_frames_in_order(self):
+        ring = FrameRing(4, 2)
+        for i in range(11):
+            ring.push([i, -i])
+        window = ring.window()
+        np.testing.assert_array_equal(window[:, 0], [7, 8, 9, 10])
+        self.assertIs(window.base, ring._buf)  # a view, not a copy
+
+
+class TestDebouncer(unittest.TestCase):
+    def test_emits_once_per_onset(self):
+        debouncer = Debouncer(history=5, threshold=4)
+        labels = ['A', 'A', 'A', 'A', 'A', 'A', 'NONE', 'NONE', 'A', 'A', 'A', 'A']
+        events = [debouncer.update(label, 0.9) for label in labels]
+        self.assertEqual([i for i, e in enumerate(events) if e], [3, 11])
+
+
+class TestStreamingRecognizer(unittest.TestCase):
+    def test_push_and_run_agree(self):
+        vectors = make_stream([(1, 60), (0, 60), (1, 45), (2, 70), (0, 40)])
+        live = StreamingRecognizer(fake_predict, CLASSES, stride=5, batch_size=7)
+        pushed = [e for e in (live.push(v) for v in vectors) if e]
+        batched = StreamingRecognizer(fake_predict, CLASSES, stride=5, batch_size=7).run(vectors)
+        self.assertEqual(pushed, batched)
+        self.assertEqual([e['label'] for e in batched], ['HELLO', 'THANKS', 'HELLO'])
+
+    def test_windows_across_a_time_gap_are_skipped(self):
+        vectors = make_stream([(0, 60)])
+        t = np.arange(60) * 33.0
+        t[20:] += 5000  # hand lost for 5s
+        calls = []
+
+        def predict(batch):
+            calls.append(len(batch))
+            return fake_predict(batch)
+
+        events = StreamingRecognizer(predict, CLASSES, stride=1).run(vectors, t)
+        self.assertEqual(sum(calls), 11)  # only the windows fully after the gap
+        self.assertEqual([e['frame'] for e in events], [52])
+
+
+if __name__ == '__main__':
+    unittest.main()
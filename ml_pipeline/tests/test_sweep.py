@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+# Add parent dir to path to import sweep
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sweep import attach_arrays, expand_space, run_trial, share_arrays
+
+
+class TestExpandSpace(unittest.TestCase):
+    def test_grid_and_cap(self):
+        space = {'epochs': [1, 2], 'batch_size': [8, 16, 32]}
+        configs = expand_space(space)
+        self.assertEqual(len(configs), 6)
+        self.assertIn({'epochs': 2, 'batch_size': 16}, configs)
+        capped = expand_space(space, trials=4, seed=1)
+        self.assertEqual(len(capped), 4)
+        self.assertEqual(capped, expand_space(space, trials=4, seed=1))
+
+    def test_random(self):
+        configs = expand_space({'dropout': [0.1, 0.2]}, search='random', trials=7)
+        self.assertEqual(len(configs), 7)
+        self.assertTrue(all(c['dropout'] in (0.1, 0.2) for c in configs))
+
+
+class TestSharedArrays(unittest.TestCase):
+    def test_round_trip(self):
+        source = {'X': np.arange(12, dtype=np.float32).reshape(3, 4), 'y': np.array([0, 1, 2], dtype=np.int32)}
+        blocks, specs = share_arrays(source)
+        try:
+            views, arrays = attach_arrays(specs)
+            np.testing.assert_array_equal(arrays['X'], source['X'])
+            np.testing.assert_array_equal(arrays['y'], source['y'])
+            del arrays
+            for shm in views:
+                shm.close()
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+
+class TestRunTrial(unittest.TestCase):
+    def test_static_trial_row(self):
+        rng = np.random.default_rng(0)
+        arrays = {
+            'X_train': rng.random((32, 63), dtype=np.float32), 'y_train': rng.integers(0, 3, 32).astype(np.int32),
+            'X_test': rng.random((8, 63), dtype=np.float32), 'y_test': rng.integers(0, 3, 8).astype(np.int32),
+            'num_classes': np.array([3], dtype=np.int32),
+        }
+        row = run_trial(0, {'epochs': 1, 'batch_size': 16, 'hidden_units': [16]}, arrays, 'static')
+        self.assertEqual(row['hidden_units'], '[16]')
+        self.assertEqual(row['params'], 63 * 16 + 16 + 16 * 3 + 3)
+        for key in ('accuracy', 'train_s', 'latency_ms'):
+            self.assertGreaterEqual(row[key], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+
+# Add parent dir to path to import tracing
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tracing
+from tracing import NULL_TRACER, Tracer
+
+
+class TestTracer(unittest.TestCase):
+    def test_stage_totals_and_rates(self):
+        tracer = Tracer()
+        for _ in range(4):
+            with tracer.span(tracing.DETECT):
+                pass
+            tracer.count(tracing.FRAMES_DECODED)
+            tracer.count(tracing.FRAMES_DETECTED)
+        tracer.count(tracing.BYTES_WRITTEN, 2048)
+
+        summary = tracer.summarize()
+        self.assertEqual(summary['stages'][tracing.DETECT]['count'], 4)
+        self.assertEqual(summary['bytes_written'], 2048)
+        self.assertGreater(summary['frames_per_sec'], 0)
+
+    def test_clip_delta(self):
+        tracer = Tracer()
+        with tracer.span(tracing.DECODE):
+            pass
+        since = tracer.snapshot()
+        with tracer.span(tracing.DECODE):
+            pass
+        self.assertEqual(tracer.summarize(since)['stages'][tracing.DECODE]['count'], 1)
+
+    def test_chrome_trace_export_from_threads(self):
+        tracer = Tracer(record_events=True)
+
+        def work():
+            with tracer.span(tracing.JPEG, frame=1):
+                pass
+
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trace.json')
+            tracer.export_chrome_trace(path)
+            with open(path, 'r') as f:
+                events = json.load(f)['traceEvents']
+        self.assertEqual(len(events), 3)
+        self.assertTrue(all(e['ph'] == 'X' and e['name'] == tracing.JPEG for e in events))
+
+    def test_null_tracer_records_nothing(self):
+        with NULL_TRACER.span(tracing.DETECT):
+            pass
+        NULL_TRACER.count(tracing.FRAMES_DECODED)
+        self.assertEqual(NULL_TRACER.stages, {})
+        self.assertEqual(NULL_TRACER.counters, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+# Add parent dir to path to import train_dynamic
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from train_dynamic import (MASK_VALUE, VECTOR_SIZE, WINDOW_SIZE, bucket_batches, create_masked_model,
+                           load_data, load_sequences, pad_batch, predict_bucketed)
+
+
+def sequences_of(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(0.1, 1.0, (n, VECTOR_SIZE)).astype(np.float32) for n in lengths]
+
+
+class TestBucketedTraining(unittest.TestCase):
+    def test_bucket_batches_never_mix_buckets(self):
+        lengths = np.array([5, 40, 12, 33, 70, 16, 17, 200, 8, 31])
+        boundaries = (16, 32, 64)
+        for rng in (None, np.random.default_rng(0)):
+            batches = bucket_batches(lengths, 3, boundaries, rng)
+            self.assertEqual(sorted(np.concatenate(batches)), list(range(len(lengths))))
+            for idx in batches:
+                self.assertLessEqual(len(idx), 3)
+                self.assertEqual(len(set(np.searchsorted(boundaries, lengths[idx]))), 1)
+        # Without rng each bucket is in length order
+        self.assertEqual([lengths[idx].tolist() for idx in bucket_batches(lengths, 3, boundaries)],
+                         [[5, 8, 12], [16], [17, 31], [33, 40], [70, 200]])
+
+    def test_pad_batch_masks_padding(self):
+        seqs = sequences_of([3, 5])
+        X = pad_batch(seqs, [0, 1])
+        self.assertEqual(X.shape, (2, 5, VECTOR_SIZE))
+        np.testing.assert_array_equal(X[0, :3], seqs[0])
+        self.assertTrue(np.all(X[0, 3:] == MASK_VALUE))
+        np.testing.assert_array_equal(X[1], seqs[1])
+
+    def test_pad_batch_augments_before_masking(self):
+        seqs = sequences_of([2, 4])
+        seen = []
+        X = pad_batch(seqs, [0, 1], augment=lambda b: seen.append(b.copy()) or b + 1)
+        # The augmenter sees the last real frame repeated, never the mask value
+        np.testing.assert_array_equal(seen[0][0, 2:], np.repeat(seqs[0][-1:], 2, axis=0))
+        np.testing.assert_allclose(X[0, :2], seqs[0] + 1)
+        self.assertTrue(np.all(X[0, 2:] == MASK_VALUE))
+
+    def test_load_sequences_keeps_full_length(self):
+        frame = {'features': {'norm': [{'x': 0.5, 'y': 0.5, 'z': 0.0}] * 21}}
+        data = {'samples': [{'type': 'dynamic', 'label': 'A', 'frames': [frame] * 45},
+                            {'type': 'dynamic', 'label': 'B', 'frames': [frame] * 10},
+                            {'type': 'static', 'label': 'C', 'frames': [frame] * 5}]}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'data.json')
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            X, y = load_sequences(path)
+            self.assertEqual([len(s) for s in X], [45, 10])
+            self.assertEqual(list(y), ['A', 'B'])
+            self.assertEqual([len(s) for s in load_sequences(path, max_len=20)[0]], [20, 10])
+            X_fixed, _ = load_data(path)
+            self.assertEqual(X_fixed.shape, (2, WINDOW_SIZE, VECTOR_SIZE))
+
+    def test_masked_model_ignores_padding(self):
+        model = create_masked_model(3, frame_units=8, lstm_units=8, dense_units=8)
+        seqs = sequences_of([4, 9, 30, 17])
+        alone = np.concatenate([model.predict(s[np.newaxis], verbose=0) for s in seqs])
+        padded = model.predict(pad_batch(seqs, [0, 1, 2, 3]), verbose=0)
+        np.testing.assert_allclose(padded, alone, atol=1e-5)
+        np.testing.assert_allclose(predict_bucketed(model, seqs, batch_size=2, boundaries=(8, 16)), alone,
+                                   atol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+# Add parent dir to path to import train_static
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from train_static import VECTOR_SIZE, create_model, expand_output_layer, merge_classes, replay_sample
+
+
+class TestIncrementalTraining(unittest.TestCase):
+    def test_merge_classes_keeps_ids(self):
+        classes = merge_classes(['B', 'A'], np.array(['A', 'D', 'C', 'D']))
+        self.assertEqual(classes, ['B', 'A', 'C', 'D'])
+
+    def test_replay_sample(self):
+        X = np.arange(20).reshape(10, 2)
+        y = np.arange(10)
+        X_r, y_r = replay_sample(X, y, 0.3)
+        self.assertEqual(len(X_r), 3)
+        np.testing.assert_array_equal(X_r[:, 0] // 2, y_r)
+        self.assertEqual(len(replay_sample(X, y, 0)[0]), 0)
+
+    def test_expand_preserves_old_classes(self):
+        model = create_model(3, hidden_units=(16,))
+        X = np.random.default_rng(0).random((5, VECTOR_SIZE), dtype=np.float32)
+        before = model.predict(X, verbose=0)
+
+        expanded = expand_output_layer(model, 5)
+        after = expanded.predict(X, verbose=0)
+        self.assertEqual(after.shape, (5, 5))
+        # Softmax over the old units alone is unchanged
+        np.testing.assert_allclose(after[:, :3] / after[:, :3].sum(axis=1, keepdims=True), before, atol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
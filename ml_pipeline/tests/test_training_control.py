@@ -0,0 +1,98 @@
+import unittest
+import argparse
+import os
+import sys
+import tempfile
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+# Add parent dir to path to import training_control
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from training_control import add_budget_args, fit_with_budget
+
+
+def budget_args(*argv):
+    parser = argparse.ArgumentParser()
+    add_budget_args(parser)
+    return parser.parse_args(list(argv))
+
+
+def tiny_model():
+    from train_static import create_model
+    return create_model(3, hidden_units=(8,))
+
+
+def tiny_data(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(48, 63)).astype(np.float32), rng.integers(0, 3, 48)
+
+
+class TestTrainingControl(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint_dir = os.path.join(self.tmp.name, 'checkpoint')
+        self.X, self.y = tiny_data()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_time_budget_stops_after_first_epoch(self):
+        model = tiny_model()
+        history = fit_with_budget(model, budget_args('--max_minutes', '1e-9'), self.checkpoint_dir, None,
+                                  self.X, self.y, epochs=20, validation_split=0.25, verbose=0)
+        self.assertEqual(history.epoch, [0])
+        self.assertFalse(os.path.exists(self.checkpoint_dir))
+
+    def test_checkpointer_restores_best_weights(self):
+        from keras_callbacks import Checkpointer
+        model = tiny_model()
+        checkpointer = Checkpointer()
+        checkpointer.set_model(model)
+        snapshots = []
+        for epoch, val_loss in enumerate([1.0, 0.5, 0.8]):
+            model.set_weights([w + epoch for w in model.get_weights()])
+            snapshots.append(model.get_weights())
+            checkpointer.on_epoch_end(epoch, {'val_loss': val_loss})
+        checkpointer.on_train_end()
+        for restored, best in zip(model.get_weights(), snapshots[1]):
+            np.testing.assert_array_equal(restored, best)
+
+    def test_resume_continues_interrupted_run(self):
+        import tensorflow as tf
+        from keras_callbacks import Checkpointer
+        meta = {'classes': ['a', 'b', 'c']}
+        model = tiny_model()
+        early = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=50)
+        # An interrupted run: checkpoints written, finish() never called
+        interrupted = Checkpointer(self.checkpoint_dir, tracked=[early], meta=meta)
+        model.fit(self.X, self.y, epochs=3, validation_split=0.25, callbacks=[early, interrupted], verbose=0)
+        self.assertTrue(os.path.exists(os.path.join(self.checkpoint_dir, 'state.json')))
+
+        with self.assertRaises(ValueError):
+            Checkpointer(self.checkpoint_dir, meta={'classes': ['x']}).resume(tiny_model())
+
+        resumed_model = tiny_model()
+        resumed = Checkpointer(self.checkpoint_dir, tracked=[early], meta=meta)
+        self.assertEqual(resumed.resume(resumed_model), 3)
+        self.assertEqual(resumed.best, interrupted.best)
+        for restored, best in zip(resumed.best_weights, interrupted.best_weights):
+            np.testing.assert_allclose(restored, best)
+
+        history = fit_with_budget(tiny_model(), budget_args('--resume', '--patience', '50'), self.checkpoint_dir,
+                                  meta, self.X, self.y, epochs=5, validation_split=0.25, verbose=0)
+        self.assertEqual(history.epoch, [3, 4])
+        self.assertFalse(os.path.exists(self.checkpoint_dir))
+
+    def test_stale_checkpoint_is_ignored_without_resume(self):
+        from keras_callbacks import Checkpointer
+        model = tiny_model()
+        model.fit(self.X, self.y, epochs=2, validation_split=0.25, verbose=0,
+                  callbacks=[Checkpointer(self.checkpoint_dir, meta=None)])
+        history = fit_with_budget(tiny_model(), budget_args(), self.checkpoint_dir, None,
+                                  self.X, self.y, epochs=1, validation_split=0.25, verbose=0)
+        self.assertEqual(history.epoch, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
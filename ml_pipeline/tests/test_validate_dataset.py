@@ -0,0 +1,128 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add parent dir to path to import validate_dataset
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset_io import iter_jsonl, read_binary_dataset, write_binary_dataset
+from validate_dataset import load_dataset, validate_arrays, validate_path
+
+
+def points(rng):
+    raw = rng.uniform(0.3, 0.7, (21, 3))
+    raw[:, 2] = rng.uniform(-0.1, 0.1, 21)
+    return raw
+
+
+def frame(raw, t, score=0.9):
+    as_dicts = [{'x': float(x), 'y': float(y), 'z': float(z)} for x, y, z in raw]
+    result = {'t': t, 'score': score, 'landmarks': as_dicts, 'features': {'norm': as_dicts}}
+    if score is None:
+        del result['score']
+    return result
+
+
+def make_dataset():
+    rng = np.random.default_rng(0)
+    good = lambda n: [frame(points(rng), i * 33) for i in range(n)]
+    nan_raw = points(rng)
+    nan_raw[4, 0] = np.nan
+    same = points(rng)
+    same[9] = same[0]  # zero hand scale
+    far = points(rng)
+    far[0, 1] = 3.0
+    samples = [
+        {'id': 's0', 'label': 'A', 'type': 'static', 'frames': good(4)},
+        {'id': 's1', 'label': 'A', 'type': 'static',
+         'frames': good(2) + [frame(nan_raw, 66), frame(same, 99), frame(far, 132)]},
+        {'id': 's2', 'label': 'B', 'type': 'dynamic', 'frames': good(3) + [frame(points(rng), 10)]},
+        {'id': 's3', 'label': 'B', 'type': 'static',
+         'frames': [{**good(1)[0], 'landmarks': good(1)[0]['landmarks'][:20]}]},
+        {'id': 's0', 'label': '', 'type': 'sideways', 'frames': good(2)},
+    ]
+    return {'meta': {'dataset': 'test'}, 'samples': samples}
+
+
+class TestValidateDataset(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_checks_find_each_problem(self):
+        path = os.path.join(self.tmp.name, 'data.json')
+        with open(path, 'w') as f:
+            json.dump(make_dataset(), f)
+        dataset, fmt, _ = load_dataset(path)
+        frame_issues, sample_issues, conflicts = validate_arrays(
+            dataset['landmarks'], dataset['t'], dataset['score'], dataset['sample_offsets'],
+            dataset['labels'], dataset['types'], dataset['ids'], dataset['landmark_counts'],
+            dataset['norm'], dataset['norm_counts'])
+        self.assertEqual(fmt, 'json')
+        self.assertEqual(np.flatnonzero(frame_issues['non_finite']).tolist(), [6])
+        self.assertEqual(np.flatnonzero(frame_issues['zero_scale']).tolist(), [7])
+        self.assertEqual(np.flatnonzero(frame_issues['out_of_range']).tolist(), [8])
+        self.assertEqual(np.flatnonzero(frame_issues['landmark_count']).tolist(), [13])
+        self.assertEqual(np.flatnonzero(sample_issues['non_monotonic_t']).tolist(), [2])
+        self.assertEqual(np.flatnonzero(sample_issues['no_valid_frames']).tolist(), [3])
+        self.assertEqual(np.flatnonzero(sample_issues['duplicate_id']).tolist(), [4])
+        self.assertEqual(np.flatnonzero(sample_issues['bad_type'] & sample_issues['empty_label']).tolist(), [4])
+        self.assertEqual(conflicts, {'B': ['dynamic', 'static']})
+
+    def test_cleaned_jsonl_output(self):
+        path = os.path.join(self.tmp.name, 'data.jsonl')
+        with open(path, 'w') as f:
+            data = make_dataset()
+            f.write(json.dumps({'meta': data['meta']}) + '\n')
+            for sample in data['samples']:
+                f.write(json.dumps(sample) + '\n')
+        cleaned = os.path.join(self.tmp.name, 'clean.jsonl')
+        report = os.path.join(self.tmp.name, 'report.csv')
+        self.assertFalse(validate_path(path, report=report, output=cleaned, verbose=False))
+        samples = [s for _, s in iter_jsonl(cleaned)]
+        self.assertEqual([(s['id'], len(s['frames'])) for s in samples], [('s0', 4), ('s1', 2)])
+        with open(report) as f:
+            self.assertEqual(len(f.readlines()), 6)
+        self.assertTrue(validate_path(cleaned, verbose=False))
+
+    def test_frames_without_score(self):
+        rng = np.random.default_rng(2)
+        frames = [frame(points(rng), i * 33, score=None) for i in range(5)]
+        frames[3]['score'] = 1.5
+        path = os.path.join(self.tmp.name, 'data.jsonl')
+        with open(path, 'w') as f:
+            f.write(json.dumps({'meta': {'dataset': 'test'}}) + '\n')
+            f.write(json.dumps({'id': 's0', 'label': 'A', 'type': 'static', 'frames': frames}) + '\n')
+        dataset, _, _ = load_dataset(path)
+        frame_issues, _, _ = validate_arrays(
+            dataset['landmarks'], dataset['t'], dataset['score'], dataset['sample_offsets'],
+            dataset['labels'], dataset['types'], dataset['ids'], dataset['landmark_counts'],
+            dataset['norm'], dataset['norm_counts'])
+        self.assertEqual(np.flatnonzero(frame_issues['score_range']).tolist(), [3])
+        # A capture without scores at all (as process_msasl.py writes) is clean
+        del frames[3]['score']
+        with open(path, 'w') as f:
+            f.write(json.dumps({'meta': {'dataset': 'test'}}) + '\n')
+            f.write(json.dumps({'id': 's0', 'label': 'A', 'type': 'static', 'frames': frames}) + '\n')
+        self.assertTrue(validate_path(path, max_bad_fraction=0, verbose=False))
+
+    def test_binary_dataset(self):
+        rng = np.random.default_rng(1)
+        landmarks = np.stack([points(rng) for _ in range(6)]).astype(np.float32)
+        landmarks[5, 3, 2] = np.inf
+        path = os.path.join(self.tmp.name, 'data.npz')
+        write_binary_dataset(path, landmarks, [0, 33, 66, 0, 33, 66], np.ones(6), [0, 3, 6],
+                             [0, 1], [0, 1], ['A', 'B'], {'dataset': 'test'})
+        cleaned = os.path.join(self.tmp.name, 'clean.npz')
+        self.assertFalse(validate_path(path, output=cleaned, verbose=False))
+        data = read_binary_dataset(cleaned)
+        self.assertEqual(data['sample_offsets'].tolist(), [0, 3, 5])
+        self.assertTrue(np.isfinite(data['landmarks']).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
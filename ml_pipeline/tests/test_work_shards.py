@@ -0,0 +1,117 @@
+import unittest
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+# Add parent dir to path to import work_shards
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from work_shards import (MANIFEST_FILE, ManifestWriter, add_shard_args, check_shard_args, clip_key,
+                         default_output_root, merge_roots, read_manifest, select_shard, shard_of)
+
+
+def msasl_samples(videos=40, clips_per_video=3):
+    return [{'url': f"https://www.youtube.com/watch?v=vid{v:04d}", 'start_time': c * 2.0,
+             'end_time': c * 2.0 + 1.5, 'clean_text': 'hello'}
+            for v in range(videos) for c in range(clips_per_video)]
+
+
+def write_root(root, shard_index, num_shards, samples):
+    """A shard output root: one JSON and two images per (sample_id, label, url) plus its manifest."""
+    manifest = ManifestWriter(root, {'num_shards': num_shards, 'shard_index': shard_index})
+    for sample_id, label, url in samples:
+        label_dir = os.path.join(root, label, 'images')
+        os.makedirs(label_dir, exist_ok=True)
+        with open(os.path.join(root, label, f"{sample_id}.json"), 'w') as f:
+            json.dump({'id': sample_id, 'label': label, 'frames': [], 'yolo_labels': []}, f)
+        for n in range(2):
+            with open(os.path.join(label_dir, f"{sample_id}_{n}.jpg"), 'w') as f:
+                f.write(f"{url} {n}")
+        item = {'url': url, 'start_time': 0.0, 'end_time': 1.0}
+        manifest.write(dict(item, id=sample_id, label=label, class_id=0, key=clip_key(item)))
+    manifest.close()
+
+
+class TestPartitioning(unittest.TestCase):
+    def test_shards_are_disjoint_and_complete(self):
+        samples = msasl_samples()
+        parts = [select_shard(samples, 4, i) for i in range(4)]
+        self.assertEqual(sum(len(p) for p in parts), len(samples))
+        keys = [clip_key(s) for p in parts for s in p]
+        self.assertEqual(len(set(keys)), len(samples))
+        self.assertTrue(all(parts))
+        # All clips of a video land in the same shard
+        for part in parts:
+            for item in part:
+                self.assertEqual(shard_of(item, 4), shard_of(dict(item, start_time=99), 4))
+
+    def test_hash_is_stable_across_url_spellings(self):
+        spellings = ['https://www.youtube.com/watch?v=abc123', 'www.youtube.com/watch?v=abc123', 'abc123',
+                     'https://youtu.be/abc123']
+        self.assertEqual(len({shard_of({'url': url}, 7) for url in spellings}), 1)
+        # Pinned so a change of hash (which would reshuffle running extractions) is noticed
+        self.assertEqual([shard_of({'url': f"v{i}"}, 1000) for i in range(4)], [219, 858, 191, 945])
+
+    def test_shard_args(self):
+        parser = argparse.ArgumentParser()
+        add_shard_args(parser)
+        args = parser.parse_args(['--num-shards', '3', '--shard-index', '2'])
+        check_shard_args(args)
+        self.assertEqual(default_output_root('sharded_data', args), 'sharded_data_2of3')
+        self.assertEqual(default_output_root('sharded_data', parser.parse_args([])), 'sharded_data')
+        with self.assertRaises(ValueError):
+            check_shard_args(parser.parse_args(['--num_shards', '3', '--shard_index', '3']))
+
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.roots = [os.path.join(self.tmp.name, f"shard{i}") for i in range(2)]
+        self.dest = os.path.join(self.tmp.name, 'merged')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_merge_renames_colliding_ids(self):
+        write_root(self.roots[0], 0, 2, [('aaaa1111', 'hello', 'v1'), ('bbbb2222', 'thanks', 'v2')])
+        write_root(self.roots[1], 1, 2, [('aaaa1111', 'hello', 'v3'), ('cccc3333', 'hello', 'v4')])
+        stats = merge_roots(self.roots, self.dest)
+        self.assertEqual((stats['merged'], stats['renamed'], stats['warnings']), (4, 1, []))
+
+        hello = os.path.join(self.dest, 'hello')
+        self.assertEqual(sorted(os.listdir(hello)), ['aaaa1111.json', 'aaaa1111_s1.json', 'cccc3333.json', 'images'])
+        with open(os.path.join(hello, 'aaaa1111_s1.json')) as f:
+            self.assertEqual(json.load(f)['id'], 'aaaa1111_s1')
+        with open(os.path.join(hello, 'images', 'aaaa1111_s1_1.jpg')) as f:
+            self.assertEqual(f.read(), 'v3 1')
+        meta, entries = read_manifest(self.dest)
+        self.assertEqual(meta, {'merged': True})
+        self.assertEqual(sorted((e['id'], e['shard_index']) for e in entries),
+                         [('aaaa1111', 0), ('aaaa1111_s1', 1), ('bbbb2222', 0), ('cccc3333', 1)])
+
+        # Merging again adds nothing
+        again = merge_roots(self.roots, self.dest)
+        self.assertEqual((again['merged'], again['duplicates']), (0, 4))
+        self.assertEqual(len(read_manifest(self.dest)[1]), 4)
+
+    def test_merge_warns_about_missing_shards_and_files(self):
+        write_root(self.roots[0], 0, 3, [('aaaa1111', 'hello', 'v1'), ('bbbb2222', 'hello', 'v2')])
+        os.remove(os.path.join(self.roots[0], 'hello', 'bbbb2222.json'))
+        stats = merge_roots(self.roots[:1], self.dest, move=True)
+        self.assertEqual((stats['merged'], stats['missing']), (1, 1))
+        self.assertEqual(stats['warnings'], ["Shards [1, 2] are not among the sources"])
+        self.assertFalse(os.path.exists(os.path.join(self.roots[0], 'hello', 'aaaa1111.json')))
+        with self.assertRaises(ValueError):
+            merge_roots([self.tmp.name], self.dest)
+
+    def test_manifest_refuses_another_shard(self):
+        ManifestWriter(self.roots[0], {'num_shards': 2, 'shard_index': 0}).close()
+        ManifestWriter(self.roots[0], {'num_shards': 2, 'shard_index': 0}).close()
+        with self.assertRaises(ValueError):
+            ManifestWriter(self.roots[0], {'num_shards': 2, 'shard_index': 1})
+        self.assertTrue(os.path.exists(os.path.join(self.roots[0], MANIFEST_FILE)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import os
+import sys
+import tempfile
+import cv2
+import numpy as np
+
+# Add parent dir to path to import yolo_infer
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from yolo_infer import list_videos, load_detections, run
+
+
+def write_video(path, num_frames):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+    for i in range(num_frames):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+
+
+class TestYoloInfer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = [os.path.join(self.tmp.name, 'a.avi'), os.path.join(self.tmp.name, 'b.avi')]
+        write_video(self.paths[0], 7)
+        write_video(self.paths[1], 5)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fixed_batches_across_videos(self):
+        calls = []
+
+        def detect(images):
+            calls.append(len(images))
+            # One detection on bright frames; class from the brightness
+            return [np.array([[round(img.mean() / 10) % 3, 0.9, 0.5, 0.5, 0.2, 0.3]]) if img.mean() > 25
+                    else np.zeros((0, 6)) for img in images]
+
+        self.assertEqual(list_videos(self.tmp.name), self.paths)
+        writer, reader = run(self.paths, detect, batch_size=4)
+        self.assertEqual(calls, [4, 4, 4])  # 12 frames, last batch padded
+        self.assertEqual(reader.frame_counts, [7, 5])
+
+        out = os.path.join(self.tmp.name, 'det.npz')
+        writer.save(out, self.paths, reader.frame_counts, reader.fps, ['A', 'B', 'C'])
+        data = load_detections(out)
+        self.assertEqual(data['names'], ['A', 'B', 'C'])
+        np.testing.assert_array_equal(data['video'], [0, 0, 0, 0, 1, 1])
+        np.testing.assert_array_equal(data['frame'], [3, 4, 5, 6, 3, 4])
+        np.testing.assert_allclose(data['box'][0], [0.5, 0.5, 0.2, 0.3], atol=1e-3)
+
+    def test_frame_stride(self):
+        seen = []
+
+        def detect(images):
+            seen.extend(images)
+            return [np.zeros((0, 6))] * len(images)
+
+        writer, reader = run(self.paths[:1], detect, batch_size=8, frame_stride=3)
+        self.assertEqual(len(seen), 8)  # frames 0, 3, 6 plus padding
+        self.assertEqual(reader.frame_counts, [7])
+        self.assertEqual(writer.columns()['video'].size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
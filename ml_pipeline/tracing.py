@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Stage names shared by the extractors so summaries line up across scripts
+FETCH = 'fetch'
+DECODE = 'decode'
+COLOR = 'color_convert'
+DETECT = 'detect'
+JPEG = 'jpeg_encode'
+WRITE = 'write'
+
+FRAMES_DECODED = 'frames_decoded'
+FRAMES_DETECTED = 'frames_detected'
+HANDS_FOUND = 'hands_found'
+BYTES_WRITTEN = 'bytes_written'
+BYTES_FETCHED = 'bytes_fetched'
+FETCH_RETRIES = 'fetch_retries'
+
+
+class Tracer:
+    """
+    Lightweight span timing for extraction runs.
+
+    Every span adds to per-stage totals; when record_events is set, spans are
+    also kept as Chrome trace events (chrome://tracing, Perfetto) for
+    export_chrome_trace(). Spans may be opened from any thread.
+    """
+
+    def __init__(self, enabled=True, record_events=False):
+        self.enabled = enabled
+        self.record_events = record_events
+        self.events = []
+        self.stages = {}    # name -> [count, total_seconds]
+        self.counters = {}  # name -> value
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    @contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                stage = self.stages.setdefault(name, [0, 0.0])
+                stage[0] += 1
+                stage[1] += end - start
+                if self.record_events:
+                    self.events.append({
+                        'name': name, 'ph': 'X', 'pid': self._pid,
+                        'tid': threading.get_ident(),
+                        'ts': (start - self._origin) * 1e6,
+                        'dur': (end - start) * 1e6,
+                        'args': args,
+                    })
+
+    def add_span(self, name, seconds):
+        """
+        Add a duration measured elsewhere (e.g. in a worker process) to a
+        stage's totals. No trace event is recorded for it.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stage = self.stages.setdefault(name, [0, 0.0])
+            stage[0] += 1
+            stage[1] += seconds
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Copy of the totals, for per-clip deltas with summarize(since=...)."""
+        with self._lock:
+            return ({k: list(v) for k, v in self.stages.items()}, dict(self.counters), time.perf_counter())
+
+    def summarize(self, since=None):
+        """
+        Stage totals and derived rates (frames/sec, detect ms/frame, bytes
+        written), either for the whole run or since a snapshot().
+        """
+        stages, counters, now = self.snapshot()
+        start = self._origin
+        if since is not None:
+            old_stages, old_counters, start = since
+            stages = {k: [v[0] - old_stages.get(k, [0, 0.0])[0], v[1] - old_stages.get(k, [0, 0.0])[1]]
+                      for k, v in stages.items()}
+            counters = {k: v - old_counters.get(k, 0) for k, v in counters.items()}
+
+        wall = now - start
+        frames = counters.get(FRAMES_DECODED, 0)
+        detected = counters.get(FRAMES_DETECTED, 0)
+        detect_total = stages.get(DETECT, [0, 0.0])[1]
+        return {
+            'wall_s': wall,
+            'stages': {k: {'count': v[0], 'total_ms': v[1] * 1000,
+                           'mean_ms': v[1] * 1000 / v[0] if v[0] else 0.0}
+                       for k, v in stages.items() if v[0]},
+            'counters': counters,
+            'frames_per_sec': frames / wall if wall > 0 else 0.0,
+            'detect_ms_per_frame': detect_total * 1000 / detected if detected else 0.0,
+            'bytes_written': counters.get(BYTES_WRITTEN, 0),
+        }
+
+    def format_summary(self, since=None):
+        if not self.enabled:
+            return ''
+        s = self.summarize(since)
+        parts = [f"{name} {st['total_ms']:.0f}ms" for name, st in
+                 sorted(s['stages'].items(), key=lambda kv: -kv[1]['total_ms'])]
+        parts.append(f"{s['frames_per_sec']:.1f} fps")
+        if s['detect_ms_per_frame']:
+            parts.append(f"detect {s['detect_ms_per_frame']:.1f}ms/frame")
+        if s['bytes_written']:
+            parts.append(f"{s['bytes_written'] / 1e6:.2f}MB written")
+        return ' | '.join(parts)
+
+    def print_report(self):
+        if not self.enabled:
+            return
+        s = self.summarize()
+        print(f"\nStage timings over {s['wall_s']:.1f}s:")
+        print(f"  {'stage':<16}{'count':>8}{'total ms':>12}{'mean ms':>10}{'share':>8}")
+        for name, st in sorted(s['stages'].items(), key=lambda kv: -kv[1]['total_ms']):
+            share = st['total_ms'] / (s['wall_s'] * 1000) * 100 if s['wall_s'] else 0.0
+            print(f"  {name:<16}{st['count']:>8}{st['total_ms']:>12.1f}{st['mean_ms']:>10.2f}{share:>7.1f}%")
+        for name, value in sorted(s['counters'].items()):
+            print(f"  {name}: {value}")
+        print(f"  frames/sec: {s['frames_per_sec']:.1f}, detect ms/frame: {s['detect_ms_per_frame']:.2f}")
+
+    def export_chrome_trace(self, path):
+        """Write recorded spans as Chrome trace-event JSON."""
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+# Shared no-op tracer so instrumented functions need no None checks
+NULL_TRACER = Tracer(enabled=False)
+
+
+def tracer_from_args(trace_path):
+    """Tracer for a script's --trace option: events are only kept when exporting."""
+    return Tracer(record_events=bool(trace_path))
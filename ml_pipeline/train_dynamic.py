@@ -1,17 +1,22 @@
 import json
 import numpy as np
-import tensorflow as tf
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 import os
 
 import argparse
+from smoothing import smoothed_norm_samples
+from augmentation import add_augment_args, augmented_batches, augmenter_from_args
+from training_control import add_budget_args, fit_with_budget
 
 # Configuration
 DEFAULT_DATASET_PATH = '../capture_data.json'
 MODEL_SAVE_PATH = 'dynamic_model'
 VECTOR_SIZE = 63
 WINDOW_SIZE = 30 # Must match runner
+EPOCHS = 50
+BATCH_SIZE = 16
+MASK_VALUE = 0.0 # Padded steps in bucketed mode; real frames are never all zero
+BUCKET_BOUNDARIES = (16, 32, 48, 64, 96, 128)
+CHECKPOINT_DIR = os.path.join(MODEL_SAVE_PATH, 'checkpoint')
 
 def pad_sequence(seq, max_len):
     # Pad with zeros or duplicate last frame?
@@ -22,33 +27,51 @@ def pad_sequence(seq, max_len):
     padding = [seq[-1]] * pad_len if seq else [[0]*VECTOR_SIZE] * pad_len
     return seq + padding
 
-def load_data(path):
+def _dynamic_sequences(path, smooth=False):
+    """(label, list of 63-value frames) per dynamic sample, or None if the file is missing."""
     if not os.path.exists(path):
         print(f"Dataset not found at {path}")
-        return np.array([]), np.array([])
+        return None
         
     with open(path, 'r') as f:
         data = json.load(f)
     
-    X = []
-    y = []
-    
     print(f"Loading data from {path}...")
     
+    if smooth:
+        samples = [s for s in data['samples'] if s['type'] == 'dynamic']
+        smoothed = iter(smoothed_norm_samples(samples))
+    
+    sequences = []
     for sample in data['samples']:
         if sample['type'] != 'dynamic':
             continue
             
-        label = sample['label']
-        
-        sequence = []
-        for frame in sample['frames']:
-            landmarks = frame['features']['norm']
-            vector = []
-            for lm in landmarks:
-                vector.extend([lm['x'], lm['y'], lm['z']])
-            sequence.append(vector)
-            
+        if smooth:
+            sequence = next(smoothed).reshape(-1, VECTOR_SIZE).tolist()
+        else:
+            sequence = []
+            for frame in sample['frames']:
+                landmarks = frame['features']['norm']
+                vector = []
+                for lm in landmarks:
+                    vector.extend([lm['x'], lm['y'], lm['z']])
+                sequence.append(vector)
+        sequences.append((sample['label'], sequence))
+    return sequences
+
+def load_data(path, smooth=False):
+    """
+    One padded WINDOW_SIZE sequence per dynamic sample. With smooth, the
+    features are recomputed from One Euro smoothed raw landmarks (see smoothing.py).
+    """
+    sequences = _dynamic_sequences(path, smooth)
+    if sequences is None:
+        return np.array([]), np.array([])
+    
+    X = []
+    y = []
+    for label, sequence in sequences:
         # Pad/Truncate
         padded_seq = pad_sequence(sequence, WINDOW_SIZE)
         
@@ -58,34 +81,183 @@ def load_data(path):
                 
     return np.array(X), np.array(y)
 
-def create_model(num_classes):
+def load_sequences(path, smooth=False, max_len=None):
+    """
+    Unpadded variant of load_data for bucketed training: a list of (T, 63)
+    float32 arrays at their full length (or cut to max_len) and the labels.
+    """
+    sequences = _dynamic_sequences(path, smooth)
+    if sequences is None:
+        return [], np.array([])
+    X = [np.asarray(seq[:max_len], dtype=np.float32).reshape(-1, VECTOR_SIZE) for _, seq in sequences if seq]
+    y = [label for label, seq in sequences if seq]
+    return X, np.array(y)
+
+def bucket_batches(lengths, batch_size, boundaries=BUCKET_BOUNDARIES, rng=None):
+    """
+    Index batches that never mix length buckets. A length goes to the first
+    bucket whose boundary it does not exceed; the last bucket takes the rest.
+    With rng, bucket contents and batch order are shuffled; without, each
+    bucket is sorted by length so padding stays minimal.
+    """
+    lengths = np.asarray(lengths)
+    buckets = np.searchsorted(boundaries, lengths, side='left')
+    batches = []
+    for bucket in np.unique(buckets):
+        idx = np.flatnonzero(buckets == bucket)
+        idx = rng.permutation(idx) if rng is not None else idx[np.argsort(lengths[idx], kind='stable')]
+        batches.extend(idx[lo:lo + batch_size] for lo in range(0, len(idx), batch_size))
+    if rng is not None:
+        batches = [batches[i] for i in rng.permutation(len(batches))]
+    return batches
+
+def pad_batch(sequences, idx, augment=None):
+    """
+    (B, longest, 63) batch of sequences[idx] with the padded steps set to
+    MASK_VALUE. Padding repeats the last frame until after augment runs,
+    so time warp and frame dropout only ever see real poses.
+    """
+    lengths = np.array([len(sequences[i]) for i in idx])
+    longest = lengths.max()
+    X = np.empty((len(idx), longest, VECTOR_SIZE), dtype=np.float32)
+    for row, i in enumerate(idx):
+        X[row, :lengths[row]] = sequences[i]
+        X[row, lengths[row]:] = sequences[i][-1]
+    if augment is not None:
+        X = augment(X)
+    X[np.arange(longest) >= lengths[:, np.newaxis]] = MASK_VALUE
+    return X
+
+def bucketed_dataset(sequences, y, batch_size=BATCH_SIZE, boundaries=BUCKET_BOUNDARIES, seed=None,
+                     shuffle=True, augment=None):
+    """
+    tf.data pipeline of length-bucketed, zero-padded batches with a
+    variable time axis, reshuffled every epoch when shuffle is set.
+    """
+    import tensorflow as tf
+    lengths = [len(s) for s in sequences]
+    rng = np.random.default_rng(seed) if shuffle else None
+    num_batches = len(bucket_batches(lengths, batch_size, boundaries))
+
+    def generate():
+        for idx in bucket_batches(lengths, batch_size, boundaries, rng):
+            yield pad_batch(sequences, idx, augment), y[idx]
+
+    signature = (tf.TensorSpec((None, None, VECTOR_SIZE), tf.float32), tf.TensorSpec((None,), tf.int64))
+    dataset = tf.data.Dataset.from_generator(generate, output_signature=signature)
+    return dataset.apply(tf.data.experimental.assert_cardinality(num_batches)).prefetch(2)
+
+def predict_bucketed(model, sequences, batch_size=64, boundaries=BUCKET_BOUNDARIES):
+    """Class probabilities for variable-length sequences, in input order, predicted bucket by bucket."""
+    probs = None
+    for idx in bucket_batches([len(s) for s in sequences], batch_size, boundaries):
+        batch_probs = model.predict(pad_batch(sequences, idx), verbose=0)
+        if probs is None:
+            probs = np.zeros((len(sequences), batch_probs.shape[1]), dtype=np.float32)
+        probs[idx] = batch_probs
+    return probs
+
+def create_model(num_classes, filters=64, lstm_units=64, dense_units=32, dropout=0.3,
+                 learning_rate=0.001):
+    """
+    Conv1D + LSTM over a WINDOW_SIZE sequence. The defaults are the shipped
+    architecture; sweep.py varies them.
+    """
+    import tensorflow as tf
     model = tf.keras.Sequential([
         tf.keras.layers.Input(shape=(WINDOW_SIZE, VECTOR_SIZE)),
         # 1D CNN + LSTM or just LSTM/GRU
-        tf.keras.layers.Conv1D(filters=64, kernel_size=3, activation='relu'),
+        tf.keras.layers.Conv1D(filters=filters, kernel_size=3, activation='relu'),
         tf.keras.layers.MaxPooling1D(pool_size=2),
-        tf.keras.layers.LSTM(64, return_sequences=False),
-        tf.keras.layers.Dropout(0.3),
-        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.LSTM(lstm_units, return_sequences=False),
+        tf.keras.layers.Dropout(dropout),
+        tf.keras.layers.Dense(dense_units, activation='relu'),
         tf.keras.layers.Dense(num_classes, activation='softmax')
     ])
     
-    model.compile(optimizer='adam',
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
                   loss='sparse_categorical_crossentropy',
                   metrics=['accuracy'])
     return model
 
-def main():
-    parser = argparse.ArgumentParser(description='Train dynamic ASL model')
-    parser.add_argument('--data', type=str, default=DEFAULT_DATASET_PATH, help='Path to dataset JSON')
-    args = parser.parse_args()
+def create_masked_model(num_classes, frame_units=64, lstm_units=64, dense_units=32, dropout=0.3,
+                        learning_rate=0.001):
+    """
+    Variable-length variant of create_model for bucketed training: steps
+    equal to MASK_VALUE are skipped by the LSTM. Conv1D and pooling do not
+    carry a Keras mask, so a per-frame Dense layer takes their place.
+    Still accepts the WINDOW_SIZE windows the live runner sends.
+    """
+    import tensorflow as tf
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(None, VECTOR_SIZE)),
+        tf.keras.layers.Masking(mask_value=MASK_VALUE),
+        tf.keras.layers.Dense(frame_units, activation='relu'),
+        tf.keras.layers.LSTM(lstm_units, return_sequences=False),
+        tf.keras.layers.Dropout(dropout),
+        tf.keras.layers.Dense(dense_units, activation='relu'),
+        tf.keras.layers.Dense(num_classes, activation='softmax')
+    ])
 
-    print("Loading dynamic data...")
-    X, y = load_data(args.data)
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+                  loss='sparse_categorical_crossentropy',
+                  metrics=['accuracy'])
+    return model
+
+def train_bucketed(args, augmenter):
+    """
+    Masked training on full-length sequences grouped into length buckets,
+    instead of padding or cutting every clip to WINDOW_SIZE.
+    Returns (model, classes), or None when there is no data.
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    sequences, y = load_sequences(args.data, args.smooth, args.max_len)
+    if not sequences:
+        print("No dynamic data found.")
+        return None
+    boundaries = tuple(sorted(int(b) for b in args.buckets.split(',')))
+    lengths = np.array([len(s) for s in sequences])
+    print(f"Loaded {len(sequences)} sequences of {lengths.min()}-{lengths.max()} frames "
+          f"(buckets up to {', '.join(map(str, boundaries))})")
+    padded_steps = sum(len(idx) * lengths[idx].max() for idx in bucket_batches(lengths, BATCH_SIZE, boundaries))
+    cut = np.maximum(lengths - WINDOW_SIZE, 0).sum() / lengths.sum()
+    filler = np.maximum(WINDOW_SIZE - lengths, 0).sum() / lengths.sum()
+    print(f"Bucket padding: {padded_steps / lengths.sum() - 1:.1%} extra steps "
+          f"({WINDOW_SIZE}-frame windows: {cut:.1%} of frames cut, {filler:.1%} extra steps)")
+
+    le = LabelEncoder()
+    y_enc = le.fit_transform(y)
+    classes = le.classes_
+    print("Classes:", classes)
+
+    train_idx, test_idx = train_test_split(np.arange(len(sequences)), test_size=0.2, random_state=42)
+    train = bucketed_dataset([sequences[i] for i in train_idx], y_enc[train_idx], BATCH_SIZE, boundaries,
+                             seed=args.augment_seed, augment=augmenter)
+    test = bucketed_dataset([sequences[i] for i in test_idx], y_enc[test_idx], BATCH_SIZE, boundaries,
+                            shuffle=False)
+
+    if augmenter is not None:
+        print(f"Augmenting training batches with {', '.join(augmenter.ops)}")
+    model = create_masked_model(len(classes))
+    meta = {'classes': [str(c) for c in classes], 'bucketed': True}
+    fit_with_budget(model, args, CHECKPOINT_DIR, meta, train, epochs=args.epochs, validation_data=test)
+    loss, acc = model.evaluate(test)
+    print(f"Test Accuracy: {acc*100:.2f}%")
+    return model, classes
+
+def train_windows(args, augmenter):
+    """The shipped training: every clip padded or cut to WINDOW_SIZE. Returns (model, classes) or None."""
+    # Imported here so --help stays fast
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    X, y = load_data(args.data, args.smooth)
     
     if len(X) == 0:
         print("No dynamic data found.")
-        return
+        return None
 
     print(f"Loaded {len(X)} sequences.")
     
@@ -98,10 +270,50 @@ def main():
     X_train, X_test, y_train, y_test = train_test_split(X, y_enc, test_size=0.2, random_state=42)
     
     model = create_model(len(classes))
-    model.fit(X_train, y_train, epochs=50, batch_size=16, validation_data=(X_test, y_test))
+    meta = {'classes': [str(c) for c in classes], 'bucketed': False}
+    if augmenter is not None:
+        print(f"Augmenting training batches with {', '.join(augmenter.ops)}")
+        batches = augmented_batches(X_train, y_train, BATCH_SIZE, augmenter, args.augment_seed)
+        fit_with_budget(model, args, CHECKPOINT_DIR, meta, batches, steps_per_epoch=-(-len(X_train) // BATCH_SIZE),
+                        epochs=args.epochs, validation_data=(X_test, y_test))
+    else:
+        fit_with_budget(model, args, CHECKPOINT_DIR, meta, X_train, y_train, epochs=args.epochs,
+                        batch_size=BATCH_SIZE, validation_data=(X_test, y_test))
     
     loss, acc = model.evaluate(X_test, y_test)
     print(f"Test Accuracy: {acc*100:.2f}%")
+    return model, classes
+
+def main():
+    parser = argparse.ArgumentParser(description='Train dynamic ASL model')
+    parser.add_argument('--data', type=str, default=DEFAULT_DATASET_PATH, help='Path to dataset JSON')
+    parser.add_argument('--smooth', action='store_true', help='Train on One Euro smoothed landmarks, like the live app')
+    parser.add_argument('--validate', action='store_true', help='Validate the dataset first and stop if it fails')
+    parser.add_argument('--bucketed', action='store_true',
+                        help='Train a masked model on full-length sequences batched by length instead of fixed windows')
+    parser.add_argument('--buckets', type=str, default=','.join(map(str, BUCKET_BOUNDARIES)),
+                        help='Comma separated bucket boundaries in frames (bucketed mode)')
+    parser.add_argument('--max_len', type=int, default=None, help='Cut sequences to this many frames (bucketed mode)')
+    parser.add_argument('--epochs', type=int, default=EPOCHS, help='Max epochs')
+    add_augment_args(parser)
+    add_budget_args(parser)
+    args = parser.parse_args()
+    try:
+        augmenter = augmenter_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.validate and os.path.exists(args.data):
+        from validate_dataset import validate_path
+        if not validate_path(args.data):
+            print("Dataset failed validation; run validate_dataset.py with --report for details.")
+            return
+
+    print("Loading dynamic data...")
+    trained = train_bucketed(args, augmenter) if args.bucketed else train_windows(args, augmenter)
+    if trained is None:
+        return
+    model, classes = trained
     
     if not os.path.exists(MODEL_SAVE_PATH):
         os.makedirs(MODEL_SAVE_PATH)
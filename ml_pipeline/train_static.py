@@ -1,16 +1,28 @@
 import json
 import numpy as np
-import tensorflow as tf
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 import os
 
+import argparse
+from smoothing import smoothed_norm_samples
+from augmentation import add_augment_args, augmented_batches, augmenter_from_args
+from training_control import add_budget_args, fit_with_budget
+
 # Configuration
 DATASET_PATH = '../capture_data.json' # Placeholder
 MODEL_SAVE_PATH = 'static_model'
 VECTOR_SIZE = 63
+EPOCHS = 50
+INCREMENTAL_EPOCHS = 10
+LEARNING_RATE = 0.001
+REPLAY_FRACTION = 0.2
+BATCH_SIZE = 32
+CHECKPOINT_DIR = os.path.join(MODEL_SAVE_PATH, 'checkpoint')
 
-def load_data(path):
+def load_data(path, smooth=False):
+    """
+    One row per frame of every static sample. With smooth, the features are
+    recomputed from One Euro smoothed raw landmarks (see smoothing.py).
+    """
     if not os.path.exists(path):
         print(f"Dataset not found at {path}")
         return np.array([]), np.array([])
@@ -21,6 +33,13 @@ def load_data(path):
     X = []
     y = []
     
+    if smooth:
+        samples = [s for s in data['samples'] if s['type'] == 'static']
+        for sample, norm in zip(samples, smoothed_norm_samples(samples)):
+            X.extend(norm.reshape(-1, VECTOR_SIZE).tolist())
+            y.extend([sample['label']] * len(norm))
+        return np.array(X), np.array(y)
+    
     for sample in data['samples']:
         if sample['type'] != 'static':
             continue
@@ -41,23 +60,134 @@ def load_data(path):
                 
     return np.array(X), np.array(y)
 
-def create_model(num_classes):
-    model = tf.keras.Sequential([
-        tf.keras.layers.Dense(128, activation='relu', input_shape=(VECTOR_SIZE,)),
-        tf.keras.layers.Dropout(0.2),
-        tf.keras.layers.Dense(64, activation='relu'),
-        tf.keras.layers.Dropout(0.2),
-        tf.keras.layers.Dense(num_classes, activation='softmax')
-    ])
+def create_model(num_classes, hidden_units=(128, 64), dropout=0.2, learning_rate=LEARNING_RATE):
+    """
+    MLP over one 63-value landmark vector. The defaults are the shipped
+    architecture; sweep.py varies them.
+    """
+    import tensorflow as tf
+    layers = [tf.keras.layers.Input(shape=(VECTOR_SIZE,))]
+    for units in hidden_units:
+        layers.append(tf.keras.layers.Dense(units, activation='relu'))
+        layers.append(tf.keras.layers.Dropout(dropout))
+    layers.append(tf.keras.layers.Dense(num_classes, activation='softmax'))
+    model = tf.keras.Sequential(layers)
     
-    model.compile(optimizer='adam',
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
                   loss='sparse_categorical_crossentropy',
                   metrics=['accuracy'])
     return model
 
+def load_previous_model(model_dir):
+    """The saved model and its class list, or (None, None) if either is missing."""
+    model_path = os.path.join(model_dir, 'model.h5')
+    classes_path = os.path.join(model_dir, 'classes.json')
+    if not os.path.exists(model_path) or not os.path.exists(classes_path):
+        return None, None
+    with open(classes_path, 'r') as f:
+        classes = json.load(f)
+    import tensorflow as tf
+    return tf.keras.models.load_model(model_path), classes
+
+def merge_classes(old_classes, labels):
+    """Previous classes keep their ids; unseen labels are appended in sorted order."""
+    known = set(old_classes)
+    return list(old_classes) + sorted(str(label) for label in set(labels) - known)
+
+def expand_output_layer(model, num_classes, learning_rate=LEARNING_RATE):
+    """
+    Copy of a trained create_model() network with a softmax over num_classes.
+    Hidden layers and the existing output units keep their weights; only the
+    units for new classes start from fresh initialization.
+    """
+    import tensorflow as tf
+    dense = [layer for layer in model.layers if isinstance(layer, tf.keras.layers.Dense)]
+    dropout = [layer.rate for layer in model.layers if isinstance(layer, tf.keras.layers.Dropout)]
+    old_classes = dense[-1].units
+    if num_classes < old_classes:
+        raise ValueError(f"Cannot shrink the output layer from {old_classes} to {num_classes} classes")
+
+    new_model = create_model(num_classes,
+                             hidden_units=tuple(layer.units for layer in dense[:-1]),
+                             dropout=dropout[0] if dropout else 0.0,
+                             learning_rate=learning_rate)
+    new_dense = [layer for layer in new_model.layers if isinstance(layer, tf.keras.layers.Dense)]
+    for old, new in zip(dense[:-1], new_dense[:-1]):
+        new.set_weights(old.get_weights())
+
+    kernel, bias = dense[-1].get_weights()
+    new_kernel, new_bias = new_dense[-1].get_weights()
+    new_kernel[:, :old_classes] = kernel
+    new_bias[:old_classes] = bias
+    new_dense[-1].set_weights([new_kernel, new_bias])
+    return new_model
+
+def replay_sample(X, y, fraction, seed=42):
+    """Random fraction of the previous data, mixed in so old classes are not forgotten."""
+    if len(X) == 0 or fraction <= 0:
+        return X[:0], y[:0]
+    rng = np.random.default_rng(seed)
+    count = max(1, int(round(len(X) * min(fraction, 1.0))))
+    idx = rng.choice(len(X), size=count, replace=False)
+    return X[idx], y[idx]
+
+def prepare_incremental(args, X, y):
+    """
+    Warm-start from the saved model: returns (model, classes, X, y_enc) with
+    the new data plus a replay sample of the old, encoded with stable ids.
+    """
+    previous, old_classes = load_previous_model(MODEL_SAVE_PATH)
+    if previous is None:
+        print(f"No model.h5 + classes.json in {MODEL_SAVE_PATH}; run a full training first.")
+        return None
+
+    if args.replay_data:
+        X_old, y_old = load_data(args.replay_data, args.smooth)
+        X_old, y_old = replay_sample(X_old, y_old, args.replay_fraction)
+        print(f"Replaying {len(X_old)} samples from {args.replay_data}")
+        if len(X_old):
+            X = np.concatenate([X, X_old])
+            y = np.concatenate([y, y_old])
+    else:
+        print("No --replay_data given; previous classes may drift while fine-tuning.")
+
+    classes = merge_classes(old_classes, y)
+    added = classes[len(old_classes):]
+    print(f"Warm-starting from {len(old_classes)} classes" + (f", adding {added}" if added else ""))
+    class_to_id = {name: i for i, name in enumerate(classes)}
+    y_enc = np.array([class_to_id[label] for label in y])
+    model = expand_output_layer(previous, len(classes), args.learning_rate)
+    return model, classes, X, y_enc
+
 def main():
+    parser = argparse.ArgumentParser(description='Train static ASL model')
+    parser.add_argument('--data', type=str, default=DATASET_PATH, help='Path to dataset JSON')
+    parser.add_argument('--incremental', action='store_true', help=f"Fine-tune the model in {MODEL_SAVE_PATH} instead of training from scratch")
+    parser.add_argument('--replay_data', type=str, default=None, help='Previous dataset to replay from in incremental mode')
+    parser.add_argument('--replay_fraction', type=float, default=REPLAY_FRACTION, help='Fraction of the previous dataset to replay')
+    parser.add_argument('--smooth', action='store_true', help='Train on One Euro smoothed landmarks, like the live app')
+    parser.add_argument('--validate', action='store_true', help='Validate the dataset first and stop if it fails')
+    parser.add_argument('--epochs', type=int, default=None, help=f"Max epochs (default {EPOCHS}, {INCREMENTAL_EPOCHS} when incremental)")
+    parser.add_argument('--learning_rate', type=float, default=LEARNING_RATE, help='Adam learning rate')
+    add_augment_args(parser)
+    add_budget_args(parser)
+    args = parser.parse_args()
+    try:
+        augmenter = augmenter_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    # Imported after parsing so --help stays fast
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    if args.validate and os.path.exists(args.data):
+        from validate_dataset import validate_path
+        if not validate_path(args.data):
+            print("Dataset failed validation; run validate_dataset.py with --report for details.")
+            return
+
     print("Loading data...")
-    X, y = load_data(DATASET_PATH)
+    X, y = load_data(args.data, args.smooth)
     
     if len(X) == 0:
         print("No data found. Please capture data first.")
@@ -65,18 +195,34 @@ def main():
 
     print(f"Loaded {len(X)} samples.")
     
-    # Encode labels
-    le = LabelEncoder()
-    y_enc = le.fit_transform(y)
-    classes = le.classes_
+    if args.incremental:
+        prepared = prepare_incremental(args, X, y)
+        if prepared is None:
+            return
+        model, classes, X, y_enc = prepared
+        epochs = args.epochs or INCREMENTAL_EPOCHS
+    else:
+        # Encode labels
+        le = LabelEncoder()
+        y_enc = le.fit_transform(y)
+        classes = le.classes_
+        model = create_model(len(classes), learning_rate=args.learning_rate)
+        epochs = args.epochs or EPOCHS
     print("Classes:", classes)
     
     # Split
     X_train, X_test, y_train, y_test = train_test_split(X, y_enc, test_size=0.2, random_state=42)
     
-    # Train
-    model = create_model(len(classes))
-    model.fit(X_train, y_train, epochs=50, batch_size=32, validation_data=(X_test, y_test))
+    # Train; ends with the best weights by val_loss (see training_control.py)
+    meta = {'classes': [str(c) for c in classes], 'incremental': args.incremental}
+    if augmenter is not None:
+        print(f"Augmenting training batches with {', '.join(augmenter.ops)}")
+        batches = augmented_batches(X_train, y_train, BATCH_SIZE, augmenter, args.augment_seed)
+        fit_with_budget(model, args, CHECKPOINT_DIR, meta, batches, steps_per_epoch=-(-len(X_train) // BATCH_SIZE),
+                        epochs=epochs, validation_data=(X_test, y_test))
+    else:
+        fit_with_budget(model, args, CHECKPOINT_DIR, meta, X_train, y_train, epochs=epochs, batch_size=BATCH_SIZE,
+                        validation_data=(X_test, y_test))
     
     # Evaluate
     loss, acc = model.evaluate(X_test, y_test)
@@ -91,6 +237,11 @@ def main():
     # Save classes
     with open(f"{MODEL_SAVE_PATH}/classes.json", 'w') as f:
         json.dump(list(classes), f)
+
+    # TensorFlow-free copy for evaluate.py and inference_server.py (see numpy_mlp.py)
+    from numpy_mlp import export_mlp, weights_path
+    export_mlp(model, weights_path(MODEL_SAVE_PATH), classes)
+    print(f"NumPy weights written to {weights_path(MODEL_SAVE_PATH)}")
     
     # Export to TFJS
     # Note: Requires tensorflowjs pip package
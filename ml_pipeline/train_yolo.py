@@ -1,4 +1,3 @@
-from ultralytics import YOLO
 import os
 import argparse
 
@@ -7,6 +6,7 @@ def main():
     parser.add_argument('--data', type=str, default='yolo_dataset/dataset.yaml', help='Path to dataset.yaml')
     parser.add_argument('--epochs', type=int, default=10, help='Number of epochs')
     args = parser.parse_args()
+    from ultralytics import YOLO
 
     # Load pre-trained model
     model = YOLO('yolov8n.pt')
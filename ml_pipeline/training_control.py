@@ -0,0 +1,57 @@
+import os
+import shutil
+
+# Defaults shared by train_static.py and train_dynamic.py
+PATIENCE = 8           # epochs without a val_loss improvement before stopping
+LR_PATIENCE = 3        # epochs without improvement before the learning rate is cut
+LR_FACTOR = 0.5
+MIN_LR = 1e-5
+CHECKPOINT_EVERY = 1   # epochs between resumable checkpoints
+
+
+def add_budget_args(parser):
+    """Stopping, learning rate and checkpoint options shared by the training scripts."""
+    parser.add_argument('--max_minutes', type=float, default=None, help='Wall-clock budget; stops before an epoch would overrun it')
+    parser.add_argument('--patience', type=int, default=PATIENCE,
+                        help='Stop after this many epochs without val_loss improvement (0 to run every epoch)')
+    parser.add_argument('--lr_patience', type=int, default=LR_PATIENCE,
+                        help=f'Cut the learning rate by {LR_FACTOR} after this many epochs without improvement (0 to disable)')
+    parser.add_argument('--checkpoint_every', type=int, default=CHECKPOINT_EVERY, help='Epochs between resumable checkpoints')
+    parser.add_argument('--resume', action='store_true', help='Continue an interrupted run from its last checkpoint')
+
+
+def fit_with_budget(model, args, checkpoint_dir, meta, *fit_args, epochs, **fit_kwargs):
+    """
+    model.fit with early stopping, learning rate reduction, the time budget
+    and resumable checkpoints from add_budget_args. The best weights are in
+    the model afterwards; checkpoints are removed unless the run was
+    interrupted.
+    """
+    import tensorflow as tf
+    from keras_callbacks import STATE_FILE, Checkpointer, TimeBudget
+
+    callbacks = []
+    if args.patience:
+        callbacks.append(tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=args.patience, verbose=1))
+    if args.lr_patience:
+        callbacks.append(tf.keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=LR_FACTOR,
+                                                              patience=args.lr_patience, min_lr=MIN_LR, verbose=1))
+    if args.max_minutes:
+        callbacks.append(TimeBudget(args.max_minutes * 60))
+    checkpointer = Checkpointer(checkpoint_dir, args.checkpoint_every, tracked=list(callbacks), meta=meta)
+    callbacks.append(checkpointer)
+
+    initial_epoch = 0
+    if args.resume:
+        initial_epoch = checkpointer.resume(model)
+    elif os.path.exists(os.path.join(checkpoint_dir, STATE_FILE)):
+        print(f"Ignoring the checkpoint in {checkpoint_dir} (pass --resume to continue it)")
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+    try:
+        history = model.fit(*fit_args, epochs=epochs, initial_epoch=initial_epoch, callbacks=callbacks, **fit_kwargs)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun with --resume to continue from {checkpoint_dir}")
+        raise
+    checkpointer.finish()
+    return history
@@ -0,0 +1,41 @@
+import math
+import numpy as np
+
+
+def normalize_landmarks(landmarks):
+    """
+    Replicates the normalization logic from src/features/HandFeatures.ts
+    Scale based on Wrist (0) to Middle MCP (9) distance.
+    Origin at Wrist.
+    """
+    wrist = landmarks[0]
+    middle_mcp = landmarks[9]
+
+    dist = math.sqrt((wrist['x'] - middle_mcp['x'])**2 +
+                     (wrist['y'] - middle_mcp['y'])**2 +
+                     (wrist['z'] - middle_mcp['z'])**2)
+
+    if dist == 0:
+        return landmarks
+
+    norm_landmarks = []
+    for lm in landmarks:
+        norm_landmarks.append({
+            'x': (lm['x'] - wrist['x']) / dist,
+            'y': (lm['y'] - wrist['y']) / dist,
+            'z': (lm['z'] - wrist['z']) / dist
+        })
+    return norm_landmarks
+
+
+def normalize_landmarks_array(landmarks):
+    """
+    Vectorized normalize_landmarks for a (..., 21, 3) array.
+    Frames with zero hand scale are returned unchanged, like the dict version.
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    wrist = landmarks[..., 0:1, :]
+    dist = np.linalg.norm(landmarks[..., 9:10, :] - wrist, axis=-1, keepdims=True)
+    degenerate = dist == 0
+    norm = (landmarks - wrist) / np.where(degenerate, 1, dist)
+    return np.where(degenerate, landmarks, norm)
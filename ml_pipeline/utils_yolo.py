@@ -1,19 +1,14 @@
-def convert_to_yolo_format(landmarks, label_id):
+def landmarks_to_box(landmarks, padding=0.05):
     """
-    Converts MediaPipe landmarks to YOLO bounding box format (x_center, y_center, width, height)
-    normalized by image dimensions.
+    Padded bounding box of the landmarks as normalized
+    (x_center, y_center, width, height), clamped to the image.
     """
-    if not landmarks:
-        return None
-        
     x_coords = [lm['x'] for lm in landmarks]
     y_coords = [lm['y'] for lm in landmarks]
     
     xmin, xmax = min(x_coords), max(x_coords)
     ymin, ymax = min(y_coords), max(y_coords)
     
-    # Add some padding
-    padding = 0.05
     xmin = max(0, xmin - padding)
     xmax = min(1, xmax + padding)
     ymin = max(0, ymin - padding)
@@ -23,5 +18,16 @@ def convert_to_yolo_format(landmarks, label_id):
     height = ymax - ymin
     x_center = xmin + width / 2
     y_center = ymin + height / 2
-    
+    return x_center, y_center, width, height
+
+
+def convert_to_yolo_format(landmarks, label_id):
+    """
+    Converts MediaPipe landmarks to YOLO bounding box format (x_center, y_center, width, height)
+    normalized by image dimensions.
+    """
+    if not landmarks:
+        return None
+        
+    x_center, y_center, width, height = landmarks_to_box(landmarks)
     return f"{label_id} {x_center} {y_center} {width} {height}"
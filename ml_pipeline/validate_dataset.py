@@ -0,0 +1,325 @@
+import csv
+import json
+import os
+import sys
+import argparse
+import time
+from operator import itemgetter
+import numpy as np
+from dataset_io import (SAMPLE_TYPES, JsonlSampleWriter, iter_jsonl, read_binary_dataset,
+                        read_jsonl_meta, write_binary_dataset)
+
+# Configuration
+NUM_LANDMARKS = 21
+COORD_RANGE = (-0.5, 1.5)  # raw x/y are image-normalized; a little outside [0, 1] is normal
+Z_LIMIT = 2.0              # |raw z|, relative depth
+NORM_LIMIT = 20.0          # |norm| in hand-scale units
+MIN_HAND_SCALE = 1e-4      # wrist to middle MCP, image-normalized
+MAX_BAD_FRACTION = 0.01
+CHUNK_FRAMES = 16384       # frames per block in the range pass, keeps temporaries in cache
+
+# Frame checks: a failing frame is dropped from the cleaned output
+FRAME_CHECKS = ('landmark_count', 'norm_count', 'non_finite', 'out_of_range', 'zero_scale', 'score_range')
+# Sample checks: a failing sample is dropped from the cleaned output
+SAMPLE_CHECKS = ('bad_type', 'empty_label', 'duplicate_id', 'non_monotonic_t', 'no_valid_frames')
+
+_xyz = itemgetter('x', 'y', 'z')
+_NAN_FRAME = [[np.nan] * 3] * NUM_LANDMARKS
+
+
+def _points(landmarks):
+    """(count, 21 xyz rows or NaN rows). count is -1 for malformed landmark dicts."""
+    if not isinstance(landmarks, list):
+        return -1, _NAN_FRAME
+    if len(landmarks) != NUM_LANDMARKS:
+        return len(landmarks), _NAN_FRAME
+    try:
+        return NUM_LANDMARKS, list(map(_xyz, landmarks))
+    except (KeyError, TypeError):
+        return -1, _NAN_FRAME
+
+
+def flatten_samples(samples):
+    """
+    Capture-format samples -> the frame arrays validate_arrays() works on.
+    This is the only per-frame Python loop; everything after it is vectorized.
+    """
+    counts, raw, norm_counts, norm, t, score, lengths = [], [], [], [], [], [], []
+    for sample in samples:
+        frames = sample.get('frames') or []
+        lengths.append(len(frames))
+        for frame in frames:
+            count, points = _points(frame.get('landmarks'))
+            counts.append(count)
+            raw.append(points)
+            count, points = _points((frame.get('features') or {}).get('norm'))
+            norm_counts.append(count)
+            norm.append(points)
+            t.append(frame.get('t', np.nan))
+            score.append(frame.get('score', np.nan))
+
+    def as_float(values):
+        # None (JSON null) becomes NaN
+        return np.array(values, dtype=np.float64)
+
+    return {
+        'landmark_counts': np.array(counts, dtype=np.int32),
+        'landmarks': as_float(raw).reshape(-1, NUM_LANDMARKS, 3),
+        'norm_counts': np.array(norm_counts, dtype=np.int32),
+        'norm': as_float(norm).reshape(-1, NUM_LANDMARKS, 3),
+        't': as_float(t),
+        'score': as_float(score),
+        'sample_offsets': np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        'ids': [s.get('id') for s in samples],
+        'labels': [s.get('label') for s in samples],
+        'types': [s.get('type') for s in samples],
+    }
+
+
+def max_deviation(points, center, limit):
+    """
+    Per-frame max over all landmarks and coordinates of |p - center| / limit,
+    for (F, 21, 3) points and per-coordinate center/limit. Above 1 means out
+    of range; NaN and inf propagate, so one pass also finds non-finite frames.
+    """
+    flat = points.reshape(len(points), -1)
+    center = np.tile(np.asarray(center, dtype=flat.dtype), NUM_LANDMARKS)
+    scale = np.tile(1 / np.asarray(limit, dtype=flat.dtype), NUM_LANDMARKS)
+    out = np.empty(len(flat), dtype=flat.dtype)
+    for start in range(0, len(flat), CHUNK_FRAMES):
+        block = flat[start:start + CHUNK_FRAMES] - center
+        np.abs(block, out=block)
+        block *= scale
+        out[start:start + CHUNK_FRAMES] = block.max(axis=1, initial=0)
+    return out
+
+
+def validate_arrays(landmarks, t, score, sample_offsets, labels, types, ids=None,
+                    landmark_counts=None, norm=None, norm_counts=None):
+    """
+    Run every check over whole-dataset arrays.
+
+    landmarks (F, 21, 3) raw, t and score (F,), sample_offsets (S + 1,);
+    labels, types and ids are per sample. The optional counts and norm
+    arrays come from capture JSON (the binary format has neither).
+    Returns (frame_issues {check: (F,) bool}, sample_issues {check: (S,) bool},
+    label_type_conflicts {label: sorted types}).
+    """
+    landmarks = np.asarray(landmarks)
+    t = np.asarray(t, dtype=np.float64)
+    score = np.asarray(score, dtype=np.float64)
+    offsets = np.asarray(sample_offsets, dtype=np.int64)
+    num_frames, num_samples = len(landmarks), len(offsets) - 1
+    lengths = np.diff(offsets)
+    sample_of = np.repeat(np.arange(num_samples), lengths)
+
+    counted = (np.full(num_frames, NUM_LANDMARKS) if landmark_counts is None
+               else np.asarray(landmark_counts))
+    has_points = counted == NUM_LANDMARKS
+    half_range = (COORD_RANGE[1] - COORD_RANGE[0]) / 2
+    deviation = max_deviation(landmarks, [COORD_RANGE[0] + half_range] * 2 + [0], [half_range] * 2 + [Z_LIMIT])
+    finite = np.isfinite(deviation)
+    frame = {
+        'landmark_count': ~has_points,
+        'norm_count': np.zeros(num_frames, dtype=bool),
+        'non_finite': has_points & ~finite,
+    }
+    with np.errstate(invalid='ignore'):
+        out_of_range = deviation > 1
+        scale = np.linalg.norm(landmarks[:, 9] - landmarks[:, 0], axis=-1)
+        frame['zero_scale'] = has_points & finite & (scale < MIN_HAND_SCALE)
+        # A missing score (NaN; MS-ASL captures have none) is unknown, not bad
+        frame['score_range'] = np.isfinite(score) & ((score < 0) | (score > 1))
+        if norm is not None:
+            norm_ok = np.asarray(norm_counts) == NUM_LANDMARKS
+            norm_deviation = max_deviation(np.asarray(norm), [0, 0, 0], [NORM_LIMIT] * 3)
+            frame['norm_count'] = ~norm_ok
+            frame['non_finite'] |= norm_ok & ~np.isfinite(norm_deviation)
+            out_of_range |= norm_ok & (norm_deviation > 1)
+    frame['out_of_range'] = has_points & finite & out_of_range
+
+    bad_frame = np.zeros(num_frames, dtype=bool)
+    for check in FRAME_CHECKS:
+        bad_frame |= frame[check]
+    valid_per_sample = np.bincount(sample_of, weights=~bad_frame, minlength=num_samples)
+
+    # t must increase within a sample (NaN t also fails)
+    same_sample = sample_of[1:] == sample_of[:-1]
+    with np.errstate(invalid='ignore'):
+        backwards = same_sample & ~(np.diff(t) > 0)
+    non_monotonic = np.bincount(sample_of[1:][backwards], minlength=num_samples) > 0
+
+    types = np.array([str(x) for x in types], dtype=object)
+    labels = np.array(['' if x is None else str(x) for x in labels], dtype=object)
+    sample = {
+        'bad_type': ~np.isin(types, SAMPLE_TYPES),
+        'empty_label': labels == '',
+        'duplicate_id': np.zeros(num_samples, dtype=bool),
+        'non_monotonic_t': non_monotonic,
+        'no_valid_frames': valid_per_sample == 0,
+    }
+    if ids is not None and num_samples:
+        ids = np.array([str(x) for x in ids], dtype=object)
+        _, first = np.unique(ids, return_index=True)
+        duplicate = np.ones(num_samples, dtype=bool)
+        duplicate[first] = False  # the first occurrence is kept
+        sample['duplicate_id'] = duplicate
+
+    conflicts = {}
+    typed = ~sample['bad_type']
+    for label, kind in sorted(set(zip(labels[typed], types[typed]))):
+        conflicts.setdefault(label, []).append(kind)
+    conflicts = {label: kinds for label, kinds in conflicts.items() if len(kinds) > 1}
+    return frame, sample, conflicts
+
+
+def summarize(frame_issues, sample_issues, sample_offsets):
+    """Per-sample issue counts and the keep masks for the cleaned output."""
+    offsets = np.asarray(sample_offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    sample_of = np.repeat(np.arange(len(lengths)), lengths)
+    per_sample = {check: np.bincount(sample_of, weights=frame_issues[check], minlength=len(lengths)).astype(int)
+                  for check in FRAME_CHECKS}
+    bad_frame = np.zeros(len(sample_of), dtype=bool)
+    for check in FRAME_CHECKS:
+        bad_frame |= frame_issues[check]
+    bad_sample = np.zeros(len(lengths), dtype=bool)
+    for check in SAMPLE_CHECKS:
+        bad_sample |= sample_issues[check]
+    per_sample['bad_frames'] = np.bincount(sample_of, weights=bad_frame, minlength=len(lengths)).astype(int)
+    return per_sample, ~bad_frame, ~bad_sample
+
+
+def write_report(path, dataset, per_sample, sample_issues):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['index', 'id', 'label', 'type', 'frames', 'bad_frames'] +
+                        list(FRAME_CHECKS) + list(SAMPLE_CHECKS))
+        lengths = np.diff(dataset['sample_offsets'])
+        for i in range(len(lengths)):
+            writer.writerow([i, dataset['ids'][i], dataset['labels'][i], dataset['types'][i], int(lengths[i]),
+                             per_sample['bad_frames'][i]] +
+                            [per_sample[c][i] for c in FRAME_CHECKS] +
+                            [int(sample_issues[c][i]) for c in SAMPLE_CHECKS])
+
+
+def load_dataset(path):
+    """
+    (dataset arrays for validate_arrays, format, original) for a capture
+    .json, a streaming .jsonl or a binary .npz dataset.
+    """
+    if path.endswith('.npz'):
+        data = read_binary_dataset(path)
+        num_samples = len(data['labels'])
+        dataset = {
+            'landmarks': data['landmarks'], 't': data['t'], 'score': data['score'],
+            'sample_offsets': data['sample_offsets'],
+            'labels': [data['classes'][i] if 0 <= i < len(data['classes']) else None for i in data['labels']],
+            'types': [SAMPLE_TYPES[i] if i < len(SAMPLE_TYPES) else str(i) for i in data['sample_types']],
+            'ids': [str(i) for i in range(num_samples)],
+        }
+        return dataset, 'npz', data
+    if path.endswith('.jsonl'):
+        samples = [sample for _, sample in iter_jsonl(path)]
+        return flatten_samples(samples), 'jsonl', {'meta': read_jsonl_meta(path) or {}, 'samples': samples}
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return flatten_samples(data['samples']), 'json', data
+
+
+def write_cleaned(path, fmt, original, frame_keep, sample_keep):
+    """Write only the kept samples, each with only its kept frames, in the input format."""
+    if fmt == 'npz':
+        offsets = original['sample_offsets']
+        sample_of = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        keep = frame_keep & sample_keep[sample_of]
+        lengths = np.bincount(sample_of[keep], minlength=len(offsets) - 1)[sample_keep]
+        write_binary_dataset(path, original['landmarks'][keep], original['t'][keep], original['score'][keep],
+                             np.concatenate([[0], np.cumsum(lengths)]),
+                             original['labels'][sample_keep], original['sample_types'][sample_keep],
+                             original['classes'], original['meta'])
+        return int(sample_keep.sum())
+
+    samples, start = [], 0
+    for sample, keep_sample in zip(original['samples'], sample_keep):
+        frames = sample.get('frames') or []
+        if keep_sample:
+            kept = [f for f, ok in zip(frames, frame_keep[start:start + len(frames)]) if ok]
+            samples.append({**sample, 'frames': kept})
+        start += len(frames)
+    if fmt == 'jsonl':
+        with JsonlSampleWriter(path, original['meta']) as writer:
+            for sample in samples:
+                writer.write(sample)
+    else:
+        with open(path, 'w') as f:
+            json.dump({'meta': original.get('meta', {}), 'samples': samples}, f, separators=(',', ':'))
+    return len(samples)
+
+
+def validate_path(path, max_bad_fraction=MAX_BAD_FRACTION, report=None, output=None, verbose=True):
+    """
+    Validate a dataset file. Returns True when the bad frame and bad
+    sample fractions are both within max_bad_fraction.
+    """
+    start = time.perf_counter()
+    dataset, fmt, original = load_dataset(path)
+    loaded = time.perf_counter()
+    frame_issues, sample_issues, conflicts = validate_arrays(
+        dataset['landmarks'], dataset['t'], dataset['score'], dataset['sample_offsets'],
+        dataset['labels'], dataset['types'], dataset['ids'], dataset.get('landmark_counts'),
+        dataset.get('norm'), dataset.get('norm_counts'))
+    per_sample, frame_keep, sample_keep = summarize(frame_issues, sample_issues, dataset['sample_offsets'])
+    checked = time.perf_counter()
+
+    num_frames, num_samples = len(frame_keep), len(sample_keep)
+    bad_frames = int((~frame_keep).sum())
+    bad_samples = int((~sample_keep).sum())
+    ok = (bad_frames <= max_bad_fraction * num_frames) and (bad_samples <= max_bad_fraction * num_samples)
+
+    if verbose:
+        print(f"{path}: {num_samples} samples, {num_frames} frames "
+              f"(load {loaded - start:.2f}s, checks {checked - loaded:.2f}s)")
+        for check in FRAME_CHECKS:
+            count = int(frame_issues[check].sum())
+            if count:
+                print(f"  {check:<18}{count:>10} frames")
+        for check in SAMPLE_CHECKS:
+            count = int(sample_issues[check].sum())
+            if count:
+                print(f"  {check:<18}{count:>10} samples")
+        for label, kinds in conflicts.items():
+            print(f"  label '{label}' appears as {' and '.join(kinds)}")
+        print(f"  bad frames {bad_frames} ({bad_frames / max(num_frames, 1) * 100:.2f}%), "
+              f"bad samples {bad_samples} ({bad_samples / max(num_samples, 1) * 100:.2f}%): "
+              f"{'PASS' if ok else 'FAIL'}")
+
+    if report:
+        write_report(report, dataset, per_sample, sample_issues)
+        if verbose:
+            print(f"Per-sample report written to {report}")
+    if output:
+        kept = write_cleaned(output, fmt, original, frame_keep, sample_keep)
+        if verbose:
+            print(f"Cleaned dataset with {kept} samples written to {output}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate a capture dataset (.json, .jsonl or .npz)')
+    parser.add_argument('data', type=str, help='Dataset to check')
+    parser.add_argument('--report', type=str, default=None, help='Per-sample CSV report')
+    parser.add_argument('--output', type=str, default=None, help='Write a cleaned copy without bad frames and samples')
+    parser.add_argument('--max_bad_fraction', type=float, default=MAX_BAD_FRACTION,
+                        help='Fail (exit 1) when more frames or samples than this are bad')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.data):
+        print(f"Dataset not found at {args.data}")
+        sys.exit(1)
+    ok = validate_path(args.data, args.max_bad_fraction, args.report, args.output)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
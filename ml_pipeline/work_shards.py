@@ -0,0 +1,211 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from dataset_io import JsonlSampleWriter, iter_jsonl, read_jsonl_meta
+from extraction_sinks import safe_label
+from fetch_scheduler import video_id
+
+# Splitting an MS-ASL extraction across machines: each node runs
+# process_msasl_mass.py with --num_shards N --shard_index i into its own
+# output root, then merge_roots() (the merge-shards command) combines the
+# roots into one sharded_data tree.
+#
+# Every root has a manifest.jsonl: a {"meta": {"num_shards", "shard_index"}}
+# line, then one line per extracted sample (id, label, class_id, url,
+# start_time, end_time, key). Lines are only added once the sample's shard
+# has been synced, so the manifest never lists a sample that is not on disk.
+# A merged root's manifest has MERGED_META and records each sample's shard.
+MANIFEST_FILE = 'manifest.jsonl'
+MERGED_META = {'merged': True}
+
+
+def clip_key(item):
+    """Identity of an MS-ASL clip, independent of how its url is spelled."""
+    return f"{video_id(item['url'])}|{item['start_time']}|{item['end_time']}"
+
+
+def shard_of(item, num_shards):
+    """
+    Stable shard index of an MS-ASL sample. The hash is of the source video
+    (blake2b, not the salted built-in hash), so every machine agrees and all
+    clips of one video go to the same node, which fetches it only once.
+    """
+    digest = hashlib.blake2b(video_id(item['url']).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % num_shards
+
+
+def select_shard(samples, num_shards, shard_index):
+    """The samples that belong to shard_index, in their original order."""
+    if num_shards <= 1:
+        return list(samples)
+    return [item for item in samples if shard_of(item, num_shards) == shard_index]
+
+
+def add_shard_args(parser):
+    """--num_shards / --shard_index (dashed spellings accepted too)."""
+    parser.add_argument('--num_shards', '--num-shards', type=int, default=1,
+                        help='Split the clips across this many machines (limits apply within each shard)')
+    parser.add_argument('--shard_index', '--shard-index', type=int, default=0, help='Which shard this machine extracts (0-based)')
+
+
+def check_shard_args(args):
+    """Raises ValueError for an impossible --num_shards/--shard_index pair."""
+    if args.num_shards < 1:
+        raise ValueError("--num_shards must be at least 1")
+    if not 0 <= args.shard_index < args.num_shards:
+        raise ValueError(f"--shard_index must be between 0 and {args.num_shards - 1}")
+
+
+def default_output_root(base, args):
+    """base itself for an unsharded run, else base_<index>of<num> so shards never share a root."""
+    if args.num_shards <= 1:
+        return base
+    return f"{base}_{args.shard_index}of{args.num_shards}"
+
+
+def read_manifest(root):
+    """(meta, entries) of root's manifest; (None, []) if it has none."""
+    path = os.path.join(root, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None, []
+    return read_jsonl_meta(path), [entry for _, entry in iter_jsonl(path)]
+
+
+def shard_meta(args):
+    return {'num_shards': args.num_shards, 'shard_index': args.shard_index}
+
+
+class ManifestWriter(JsonlSampleWriter):
+    """
+    Appends entries to root's manifest. Reopening a root keeps its entries,
+    so an interrupted shard can be rerun and skip what it already has;
+    a root whose manifest has a different meta (another shard) is refused.
+    """
+
+    def __init__(self, root, meta):
+        path = os.path.join(root, MANIFEST_FILE)
+        existing = read_jsonl_meta(path) if os.path.exists(path) else None
+        if existing is not None and existing != meta:
+            raise ValueError(f"{root} already holds output for {existing}, not {meta}")
+        os.makedirs(root, exist_ok=True)
+        super().__init__(path, meta, append=True)
+
+
+def _unique_id(sample_id, shard_index, *taken):
+    """sample_id, or a shard-suffixed variant of it that is in none of the taken sets."""
+    candidate, n = sample_id, 0
+    while any(candidate in ids for ids in taken):
+        n += 1
+        candidate = f"{sample_id}_s{shard_index}" + (f"_{n}" if n > 1 else '')
+    return candidate
+
+
+def merge_roots(sources, dest, move=False):
+    """
+    Combine the sharded_data trees and manifests of sources into dest.
+
+    Samples are taken from each source's manifest. A clip that dest already
+    has (same key) is skipped; a sample id already used in dest for another
+    clip is renamed, together with its images and the id inside its JSON.
+    dest can be merged into again later. Returns a dict of counts and
+    warnings (mixed shard counts, missing or repeated shard indices,
+    manifest entries without a file).
+    """
+    stats = {'merged': 0, 'duplicates': 0, 'renamed': 0, 'missing': 0, 'warnings': []}
+    metas = []
+    for root in sources:
+        meta, _ = read_manifest(root)
+        if meta is None:
+            raise ValueError(f"No {MANIFEST_FILE} in {root}")
+        metas.append(meta)
+    counts = {meta['num_shards'] for meta in metas}
+    indices = [meta['shard_index'] for meta in metas]
+    if len(counts) > 1:
+        stats['warnings'].append(f"Sources were made with different shard counts: {sorted(counts)}")
+    elif counts:
+        missing = sorted(set(range(counts.pop())) - set(indices))
+        if missing:
+            stats['warnings'].append(f"Shards {missing} are not among the sources")
+    repeated = sorted({i for i in indices if indices.count(i) > 1})
+    if repeated:
+        stats['warnings'].append(f"Shards {repeated} appear more than once")
+
+    _, merged = read_manifest(dest)
+    keys = {entry['key'] for entry in merged}
+    taken = {entry['id'] for entry in merged}
+    out = ManifestWriter(dest, MERGED_META)
+    transfer = shutil.move if move else shutil.copy2
+    on_disk = {}
+    try:
+        for root, meta in zip(sources, metas):
+            for entry in read_manifest(root)[1]:
+                if entry['key'] in keys:
+                    stats['duplicates'] += 1
+                    continue
+                label_dir = safe_label(entry['label'])
+                src_json = os.path.join(root, label_dir, f"{entry['id']}.json")
+                if not os.path.exists(src_json):
+                    stats['missing'] += 1
+                    continue
+                dest_dir = os.path.join(dest, label_dir)
+                if dest_dir not in on_disk:
+                    # Samples already in dest without a manifest line still count
+                    os.makedirs(dest_dir, exist_ok=True)
+                    on_disk[dest_dir] = {name[:-len('.json')] for name in os.listdir(dest_dir) if name.endswith('.json')}
+                new_id = _unique_id(entry['id'], meta['shard_index'], taken, on_disk[dest_dir])
+                if new_id == entry['id']:
+                    transfer(src_json, os.path.join(dest_dir, f"{new_id}.json"))
+                else:
+                    with open(src_json, 'r') as f:
+                        sample = json.load(f)
+                    sample['id'] = new_id
+                    with open(os.path.join(dest_dir, f"{new_id}.json"), 'w') as f:
+                        json.dump(sample, f, separators=(',', ':'))
+                    if move:
+                        os.remove(src_json)
+                    stats['renamed'] += 1
+                _transfer_images(os.path.join(root, label_dir, 'images'), os.path.join(dest_dir, 'images'),
+                                 entry['id'], new_id, transfer)
+                out.write(dict(entry, id=new_id, shard_index=meta['shard_index']))
+                keys.add(entry['key'])
+                taken.add(new_id)
+                on_disk[dest_dir].add(new_id)
+                stats['merged'] += 1
+    finally:
+        out.close()
+    return stats
+
+
+def _transfer_images(src_dir, dest_dir, old_id, new_id, transfer):
+    """Images of a sample are named <sample_id>_<n>.jpg."""
+    if not os.path.isdir(src_dir):
+        return
+    prefix = f"{old_id}_"
+    names = [name for name in os.listdir(src_dir) if name.startswith(prefix) and name[len(prefix):-len('.jpg')].isdigit()]
+    if names:
+        os.makedirs(dest_dir, exist_ok=True)
+    for name in names:
+        transfer(os.path.join(src_dir, name), os.path.join(dest_dir, f"{new_id}_{name[len(prefix):]}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge the sharded_data roots of a multi-machine extraction')
+    parser.add_argument('sources', nargs='+', help='Output roots of the shards (each with a manifest.jsonl)')
+    parser.add_argument('--output', type=str, required=True, help='Merged sharded_data root (may already exist)')
+    parser.add_argument('--move', action='store_true', help='Move files instead of copying them')
+    args = parser.parse_args()
+
+    try:
+        stats = merge_roots(args.sources, args.output, args.move)
+    except ValueError as e:
+        parser.error(str(e))
+    for warning in stats['warnings']:
+        print(f"Warning: {warning}")
+    print(f"Merged {stats['merged']} samples into {args.output} ({stats['renamed']} renamed, "
+          f"{stats['duplicates']} duplicate clips skipped, {stats['missing']} missing files)")
+
+
+if __name__ == '__main__':
+    main()
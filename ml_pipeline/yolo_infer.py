@@ -0,0 +1,268 @@
+import os
+import argparse
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+import tracing
+from tracing import NULL_TRACER, tracer_from_args
+
+# Configuration
+DEFAULT_MODEL_PATH = 'yolo_model/best.pt'
+DEFAULT_OUTPUT_PATH = 'detections.npz'
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.avi', '.mov')
+BATCH_SIZE = 16
+IMGSZ = 640
+CONF = 0.25
+MAX_PENDING_BATCHES = 4
+
+_END = object()
+
+
+def list_videos(path):
+    """A single video, or every video under a directory (recursively), sorted."""
+    if os.path.isfile(path):
+        return [path]
+    found = []
+    for root, _, files in os.walk(path):
+        found.extend(os.path.join(root, f) for f in files if f.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(found)
+
+
+class BatchReader:
+    """
+    Decodes videos on a background thread into batches of batch_size
+    (video, frame, image) items.
+
+    Batches run across video boundaries so short clips still fill every
+    inference call; only the very last batch can be short. At most
+    max_pending batches are decoded ahead. frame_counts and fps are filled
+    in as each video finishes.
+    """
+
+    def __init__(self, paths, batch_size=BATCH_SIZE, frame_stride=1, max_pending=MAX_PENDING_BATCHES,
+                 tracer=NULL_TRACER):
+        self.paths = paths
+        self.batch_size = batch_size
+        self.frame_stride = frame_stride
+        self.tracer = tracer
+        self.frame_counts = [0] * len(paths)
+        self.fps = [0.0] * len(paths)
+        self.errors = []
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self):
+        batch = []
+        try:
+            for video, path in enumerate(self.paths):
+                cap = cv2.VideoCapture(path)
+                if not cap.isOpened():
+                    self.errors.append(path)
+                    continue
+                self.fps[video] = cap.get(cv2.CAP_PROP_FPS) or 0.0
+                idx = 0
+                while not self._stop.is_set():
+                    with self.tracer.span(tracing.DECODE):
+                        # Skipped frames are only grabbed, not decoded to BGR
+                        if idx % self.frame_stride:
+                            success, image = cap.grab(), None
+                        else:
+                            success, image = cap.read()
+                    if not success:
+                        break
+                    if image is not None:
+                        self.tracer.count(tracing.FRAMES_DECODED)
+                        batch.append((video, idx, image))
+                        if len(batch) == self.batch_size:
+                            if not self._put(batch):
+                                break
+                            batch = []
+                    idx += 1
+                cap.release()
+                self.frame_counts[video] = idx
+            if batch:
+                self._put(batch)
+        finally:
+            self._put(_END)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+            yield item
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def pad_batch(images, batch_size):
+    """Repeat the last image so every inference call has the same batch shape."""
+    return images + [images[-1]] * (batch_size - len(images))
+
+
+class UltralyticsDetector:
+    """
+    A trained or exported YOLO model (best.pt, .onnx, .engine, *_saved_model, ...).
+    Called with a list of BGR images; returns one (N, 6) array per image of
+    [class, confidence, x_center, y_center, width, height], box normalized.
+    """
+
+    def __init__(self, weights, imgsz=IMGSZ, conf=CONF, device=None, half=False):
+        from ultralytics import YOLO
+        self.model = YOLO(weights, task='detect')
+        self.imgsz = imgsz
+        self.conf = conf
+        self.device = device
+        self.half = half
+        names = self.model.names
+        self.names = [names[i] for i in sorted(names)] if isinstance(names, dict) else list(names)
+
+    def __call__(self, images):
+        results = self.model.predict(images, imgsz=self.imgsz, conf=self.conf, device=self.device,
+                                     half=self.half, batch=len(images), verbose=False)
+        detections = []
+        for result in results:
+            boxes = result.boxes
+            detections.append(np.column_stack([boxes.cls.cpu().numpy(), boxes.conf.cpu().numpy(),
+                                               boxes.xywhn.cpu().numpy()]).reshape(-1, 6))
+        return detections
+
+
+class DetectionWriter:
+    """
+    Collects per-frame detections as columns and saves them as one
+    compressed .npz: video, frame, cls, conf and box (xywh normalized)
+    per detection, plus the video list, frame counts and class names.
+    Frames without detections have no rows.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self.count = 0
+
+    def add(self, video, frame, detections):
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 6)
+        if len(detections):
+            self._chunks.append((video, frame, detections))
+            self.count += len(detections)
+
+    def columns(self):
+        if not self._chunks:
+            return {'video': np.zeros(0, np.int32), 'frame': np.zeros(0, np.int32),
+                    'cls': np.zeros(0, np.int16), 'conf': np.zeros(0, np.float16),
+                    'box': np.zeros((0, 4), np.float16)}
+        rows = np.concatenate([d for _, _, d in self._chunks])
+        lengths = [len(d) for _, _, d in self._chunks]
+        return {
+            'video': np.repeat([v for v, _, _ in self._chunks], lengths).astype(np.int32),
+            'frame': np.repeat([f for _, f, _ in self._chunks], lengths).astype(np.int32),
+            'cls': rows[:, 0].astype(np.int16),
+            'conf': rows[:, 1].astype(np.float16),
+            'box': rows[:, 2:].astype(np.float16),
+        }
+
+    def save(self, path, videos, frame_counts, fps, names):
+        np.savez_compressed(path, videos=np.array(videos, dtype=str),
+                            frame_counts=np.array(frame_counts, dtype=np.int32),
+                            fps=np.array(fps, dtype=np.float32),
+                            names=np.array(names, dtype=str), **self.columns())
+
+
+def load_detections(path):
+    """The saved columns as a dict of arrays (videos and names as lists of str)."""
+    with np.load(path) as data:
+        result = {k: data[k] for k in data.files}
+    result['videos'] = result['videos'].tolist()
+    result['names'] = result['names'].tolist()
+    return result
+
+
+def run(paths, detect_fn, batch_size=BATCH_SIZE, frame_stride=1, tracer=NULL_TRACER):
+    """Detect every (strided) frame of the videos; returns the DetectionWriter and the finished BatchReader."""
+    reader = BatchReader(paths, batch_size, frame_stride, tracer=tracer)
+    writer = DetectionWriter()
+    try:
+        for batch in reader:
+            images = pad_batch([image for _, _, image in batch], batch_size)
+            with tracer.span(tracing.DETECT):
+                detections = detect_fn(images)
+            tracer.count(tracing.FRAMES_DETECTED, len(batch))
+            for (video, frame, _), frame_detections in zip(batch, detections):
+                writer.add(video, frame, frame_detections)
+    finally:
+        reader.close()
+    return writer, reader
+
+
+def print_video_summary(columns, videos, frame_counts, names, frame_stride):
+    print(f"\n  {'video':<40}{'frames':>8}{'with det':>10}  top class")
+    for v, path in enumerate(videos):
+        mine = columns['video'] == v
+        with_det = len(np.unique(columns['frame'][mine]))
+        classes, counts = np.unique(columns['cls'][mine], return_counts=True)
+        top = names[classes[counts.argmax()]] if len(classes) and classes[counts.argmax()] < len(names) else '-'
+        scored = -(-frame_counts[v] // frame_stride)
+        print(f"  {os.path.basename(path)[:39]:<40}{scored:>8}{with_det:>10}  {top}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched YOLO detection over local videos')
+    parser.add_argument('videos', type=str, help='Video file or directory of videos')
+    parser.add_argument('--model', type=str, default=DEFAULT_MODEL_PATH, help='best.pt or an exported model')
+    parser.add_argument('--output', type=str, default=DEFAULT_OUTPUT_PATH, help='Compressed .npz of detections')
+    parser.add_argument('--batch_size', type=int, default=BATCH_SIZE, help='Frames per inference call (fixed)')
+    parser.add_argument('--imgsz', type=int, default=IMGSZ, help='Inference image size')
+    parser.add_argument('--conf', type=float, default=CONF, help='Minimum detection confidence')
+    parser.add_argument('--device', type=str, default=None, help="Device, e.g. 'cpu' or '0'")
+    parser.add_argument('--half', action='store_true', help='FP16 inference (GPU)')
+    parser.add_argument('--frame_stride', type=int, default=1, help='Detect every Nth frame')
+    parser.add_argument('--trace', type=str, default=None, help='Write a Chrome trace-event JSON of all stages here')
+    args = parser.parse_args()
+
+    paths = list_videos(args.videos)
+    if not paths:
+        print(f"No videos found at {args.videos}")
+        return
+    tracer = tracer_from_args(args.trace)
+
+    print(f"Loading model from {args.model}...")
+    detector = UltralyticsDetector(args.model, args.imgsz, args.conf, args.device, args.half)
+    detector(pad_batch([np.zeros((args.imgsz, args.imgsz, 3), dtype=np.uint8)], args.batch_size))  # warm up
+
+    print(f"Running on {len(paths)} videos in batches of {args.batch_size}...")
+    start = time.perf_counter()
+    writer, reader = run(paths, detector, args.batch_size, args.frame_stride, tracer)
+    elapsed = time.perf_counter() - start
+
+    for path in reader.errors:
+        print(f"  could not open {path}")
+    writer.save(args.output, paths, reader.frame_counts, reader.fps, detector.names)
+    print_video_summary(writer.columns(), paths, reader.frame_counts, detector.names, args.frame_stride)
+
+    frames = tracer.counters.get(tracing.FRAMES_DETECTED, 0)
+    print(f"\n{frames} frames, {writer.count} detections in {elapsed:.1f}s "
+          f"({frames / max(elapsed, 1e-9):.1f} frames/sec)")
+    tracer.print_report()
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"Chrome trace written to {args.trace}")
+    print(f"Detections written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()